@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory used by the price histories kept by the HistoryCache.
+
+Minute bars of several markets are stored as float64 dataframes, as the
+interfaces download them, and with each compact encoding. The time taken to
+encode the bars and to decode them back to float64 is measured as well.
+
+Usage: python -m benchmarks.history_memory [MARKETS] [BARS]
+"""
+import sys
+import timeit
+from typing import Any, Callable
+
+import numpy
+import pandas
+
+from tradingbot.components.broker import EncodedPrices, PriceEncoding
+
+
+def make_bars(bars: int, seed: int) -> pandas.DataFrame:
+    """
+    Return minute bars of the trading hours, with prices of two decimals
+    """
+    rng = numpy.random.default_rng(seed)
+    days = pandas.bdate_range("2015-01-01", periods=bars // 510 + 1)
+    minutes = pandas.timedelta_range("08:00:00", periods=510, freq="min")
+    index = (days.values[:, None] + minutes.values[None, :]).ravel()[:bars]
+    close = numpy.round(1000 + rng.standard_normal(bars).cumsum(), 2)
+    return pandas.DataFrame(
+        {
+            "High": numpy.round(close + rng.random(bars), 2),
+            "Low": numpy.round(close - rng.random(bars), 2),
+            "Close": close,
+            "Volume": rng.integers(0, 10**6, bars),
+        },
+        index=pandas.DatetimeIndex(index),
+    )
+
+
+def best_of(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=1, repeat=3)) * 1000
+
+
+def main() -> None:
+    markets = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    frames = [make_bars(bars, seed) for seed in range(markets)]
+    baseline = sum(int(f.memory_usage(deep=True).sum()) for f in frames)
+    print("{} markets of {} minute bars".format(markets, bars))
+    print("{:>8}: {:10.1f} MB".format("float64", baseline / 2**20))
+    for encoding in [PriceEncoding.FLOAT32, PriceEncoding.TICKS]:
+        encoded = [EncodedPrices(f, encoding) for f in frames]
+        size = sum(e.nbytes for e in encoded)
+        encode = best_of(lambda: EncodedPrices(frames[0], encoding))
+        decode = best_of(lambda: encoded[0].decode())
+        print(
+            "{:>8}: {:10.1f} MB ({:.1f}x smaller),"
+            " encode {:.1f} ms, decode {:.1f} ms per market".format(
+                encoding.value,
+                size / 2**20,
+                baseline / size,
+                encode,
+                decode,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
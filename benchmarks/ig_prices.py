@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark the decoding of large IG prices responses.
+
+The JSON decoding and the conversion of the decoded bars into a MarketHistory
+are measured separately, so that each step is compared using the same input:
+
+    - decode: standard library json against orjson (when installed)
+    - fill: the previous Python lists and column by column DataFrame build
+      against parse_ig_prices and the array-backed MarketHistory
+
+Usage: python -m benchmarks.ig_prices [BARS]
+"""
+import json
+import sys
+import timeit
+from typing import Any, Callable, Dict
+
+import pandas
+
+from tradingbot.components.broker import json_loads, parse_ig_prices
+from tradingbot.interfaces import Market, MarketHistory
+
+MOCK_PRICES = "test/test_data/ig/mock_historic_price.json"
+
+
+def make_payload(bars: int) -> bytes:
+    with open(MOCK_PRICES, "r") as f:
+        data = json.load(f)
+    template = data["prices"]
+    data["prices"] = [template[i % len(template)] for i in range(bars)]
+    return json.dumps(data).encode()
+
+
+def fill_with_lists(data: Dict[str, Any]) -> None:
+    dates = []
+    highs = []
+    lows = []
+    closes = []
+    volumes = []
+    for price in data["prices"]:
+        dates.append(price["snapshotTimeUTC"])
+        highs.append(price["highPrice"]["bid"])
+        lows.append(price["lowPrice"]["bid"])
+        closes.append(price["closePrice"]["bid"])
+        volumes.append(float(price["lastTradedVolume"]))
+    # Previous MarketHistory implementation
+    df = pandas.DataFrame(columns=["date", "high", "low", "close", "volume"])
+    df["date"] = dates
+    df["high"] = highs
+    df["low"] = lows
+    df["close"] = closes
+    df["volume"] = volumes
+
+
+def fill_with_arrays(data: Dict[str, Any]) -> None:
+    p = parse_ig_prices(data)
+    MarketHistory(Market(), p.dates, p.high, p.low, p.close, p.volume)
+
+
+def best_of(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=1, repeat=7)) * 1000
+
+
+def main() -> None:
+    bars = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    payload = make_payload(bars)
+    data = json.loads(payload)
+    print("IG prices response: {} bars, {} KB".format(bars, len(payload) // 1024))
+    print("decode")
+    print("{:>12}: {:8.2f} ms".format("json", best_of(lambda: json.loads(payload))))
+    print(
+        "{:>12}: {:8.2f} ms".format("json_loads", best_of(lambda: json_loads(payload)))
+    )
+    print("fill")
+    lists = best_of(lambda: fill_with_lists(data))
+    arrays = best_of(lambda: fill_with_arrays(data))
+    print("{:>12}: {:8.2f} ms".format("lists", lists))
+    print("{:>12}: {:8.2f} ms ({:.1f}x)".format("arrays", arrays, lists / arrays))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark a full speed spin over many markets against the local IG stand-in.
+
+A spin fetches the snapshot and the daily prices of every market of the
+watchlist through the AsyncBroker, so that the concurrency of the transport,
+the single flight coalescing and the parsing are measured together without
+touching the real IG API.
+
+Usage: python -m benchmarks.ig_spin [EPICS] [LATENCY] [THROTTLE_RATE]
+"""
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import toml
+
+from benchmarks.ig_stub_server import IGStubServer
+from tradingbot.components import Configuration, Interval
+from tradingbot.components.broker import AsyncBroker, BrokerFactory, InterfaceNames
+
+CONFIG = Path("test/test_data/trading_bot.toml")
+BARS = 100
+
+
+def make_config(url: str) -> Configuration:
+    config = toml.load(CONFIG)
+    config["stocks_interface"]["active"] = InterfaceNames.IG_INDEX.value
+    config["account_interface"]["active"] = InterfaceNames.IG_INDEX.value
+    config["stocks_interface"]["ig_interface"]["api_base_url"] = url
+    return Configuration(config)
+
+
+async def spin(broker: AsyncBroker, epics: List[str]) -> Tuple[int, int]:
+    async def fetch(epic: str) -> bool:
+        try:
+            market = await broker.get_market_info(epic)
+            await broker.get_prices(market, Interval.DAY, BARS)
+            return True
+        except Exception:
+            return False
+
+    results = await asyncio.gather(*(fetch(epic) for epic in epics))
+    return sum(results), len(results) - sum(results)
+
+
+def main() -> None:
+    epics = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    throttle_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    # Injected errors are counted, not logged
+    logging.disable(logging.CRITICAL)
+    with IGStubServer(epics, latency, throttle_rate=throttle_rate) as server:
+        broker = AsyncBroker(BrokerFactory(make_config(server.url)))
+        print(
+            "IG stand-in: {} epics, {:.0f} ms latency, {:.0%} throttled".format(
+                epics, latency * 1000, throttle_rate
+            )
+        )
+        start = time.perf_counter()
+        done, failed = asyncio.run(spin(broker, server.epics))
+        elapsed = time.perf_counter() - start
+        requests = sum(server.requests.values())
+        print("{:>12}: {:8.2f} s".format("spin", elapsed))
+        print("{:>12}: {:8d} ({} failed)".format("markets", done, failed))
+        print("{:>12}: {:8.1f} /s".format("requests", requests / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Local stand-in of the IG REST API for load and integration testing.
+
+It serves the endpoints used by IGInterface (session, accounts, positions,
+markets, prices, confirms, marketnavigation and watchlists) with synthetic
+data generated for any amount of epics, so that full speed spins can be run
+offline without spending the IG allowances. Latency, errors and throttling
+responses can be injected in any request but the authentication ones.
+
+Point the bot to it setting "api_base_url" in the ig_interface section of
+the configuration to the url printed at startup.
+
+Usage: python -m benchmarks.ig_stub_server [--epics N] [--port PORT]
+           [--latency SECONDS] [--error-rate RATE] [--throttle-rate RATE]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Amount of markets of each synthetic market navigation node
+NODE_SIZE = 100
+API_PATH = "/gateway/deal"
+
+
+class IGStubServer:
+    """
+    Synthetic IG REST API served on localhost from a background thread.
+    Prices of each epic are generated from a random walk seeded by the epic,
+    so that the same request always returns the same data
+    """
+
+    epics: List[str]
+    latency: float
+    error_rate: float
+    throttle_rate: float
+    watchlist_name: str
+    requests: Counter
+
+    def __init__(
+        self,
+        epics: int = 1000,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        watchlist_name: str = "trading_bot",
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """
+        - **epics**: amount of synthetic markets
+        - **latency**: seconds waited before answering each request
+        - **error_rate**: probability of answering a request with a 500 error
+        - **throttle_rate**: probability of answering a request with a 429 error
+        - **watchlist_name**: name of the watchlist containing all the markets
+        - **seed**: seed of the injected errors
+        - **host**, **port**: address to listen to, port 0 picks a free one
+        """
+        self.epics = ["KA.D.SYN{:05d}.DAILY.IP".format(i) for i in range(epics)]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.watchlist_name = watchlist_name
+        self.requests = Counter()
+        self._epic_set = set(self.epics)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        self._confirms: Dict[str, Dict[str, Any]] = {}
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        setattr(self._server, "stub", self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}{}".format(host, port, API_PATH)
+
+    def start(self) -> "IGStubServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            args=(0.05,),
+            name="IGStubServer",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "IGStubServer":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def open_position(self, epic: str, direction: str = "BUY") -> str:
+        """
+        Open a position on the given epic and return its deal id
+        """
+        deal_id = uuid.uuid4().hex[:15].upper()
+        level = self._snapshot(epic)[0]
+        with self._lock:
+            self._positions[deal_id] = {
+                "position": {
+                    "dealId": deal_id,
+                    "size": 1.0,
+                    "createdDateUTC": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S"),
+                    "direction": direction,
+                    "level": level,
+                    "limitLevel": level * 1.1,
+                    "stopLevel": level * 0.9,
+                    "currency": "GBP",
+                },
+                "market": {"epic": epic, "expiry": "DFB"},
+            }
+        return deal_id
+
+    # Request handling
+
+    def handle(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, str], Any]:
+        """
+        Return status code, extra headers and json body of the response
+        """
+        url = urlparse(path)
+        parts = [p for p in url.path.replace(API_PATH, "", 1).split("/") if p]
+        endpoint = "/".join(parts[:2]) if parts[:1] == ["positions"] else parts[0]
+        self.requests[endpoint] += 1
+        if endpoint == "session":
+            return self._session(method)
+        if self.latency > 0:
+            time.sleep(self.latency)
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429, {}, {"errorCode": "error.public-api.exceeded-api-key-allowance"}
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, {}, {"errorCode": "error.stub.injected"}
+        if endpoint == "accounts":
+            return 200, {}, self._accounts()
+        if endpoint == "positions":
+            with self._lock:
+                return 200, {}, {"positions": list(self._positions.values())}
+        if endpoint == "positions/otc" and method == "POST":
+            payload = json.loads(body or b"{}")
+            if headers.get("_method") == "DELETE":
+                return self._close(payload)
+            return self._open(payload)
+        if endpoint == "markets" and len(parts) == 2:
+            return self._market(parts[1])
+        if endpoint == "markets":
+            term = parse_qs(url.query).get("searchTerm", [""])[0].upper()
+            found = [{"epic": e} for e in self.epics if term in e][:NODE_SIZE]
+            return 200, {}, {"markets": found}
+        if endpoint == "prices" and len(parts) >= 4:
+            return self._prices(parts[1], int(parts[-1]))
+        if endpoint == "confirms" and len(parts) == 2:
+            with self._lock:
+                confirm = self._confirms.get(parts[1])
+            if confirm is None:
+                return 404, {}, {"errorCode": "error.confirms.deal-not-found"}
+            return 200, {}, confirm
+        if endpoint == "marketnavigation":
+            return 200, {}, self._navigate(parts[1] if len(parts) > 1 else "")
+        if endpoint == "watchlists":
+            return self._watchlist(parts[1] if len(parts) > 1 else "")
+        return 404, {}, {"errorCode": "error.stub.unknown-endpoint"}
+
+    def _session(self, method: str) -> Tuple[int, Dict[str, str], Any]:
+        if method == "POST":
+            tokens = {"CST": "stub", "X-SECURITY-TOKEN": "stub"}
+            return 200, tokens, {"currentAccountId": "STUB"}
+        return 200, {}, {}
+
+    def _accounts(self) -> Dict[str, Any]:
+        with self._lock:
+            deposit = 100.0 * len(self._positions)
+        return {
+            "accounts": [
+                {
+                    "accountId": "STUB",
+                    "accountType": "SPREADBET",
+                    "balance": {"balance": 10000.0, "deposit": deposit},
+                    "currency": "GBP",
+                }
+            ]
+        }
+
+    def _snapshot(self, epic: str) -> Tuple[float, float, float, float]:
+        """Return bid, offer, high and low of the epic"""
+        rnd = random.Random(epic)
+        bid = round(rnd.uniform(10, 5000), 2)
+        spread = round(bid * 0.002, 2)
+        return bid, bid + spread, round(bid * 1.02, 2), round(bid * 0.98, 2)
+
+    def _market(self, epic: str) -> Tuple[int, Dict[str, str], Any]:
+        if epic not in self._epic_set:
+            return (
+                404,
+                {},
+                {"errorCode": "error.service.marketdata.instrument.epic.unavailable"},
+            )
+        bid, offer, high, low = self._snapshot(epic)
+        distance = {"unit": "POINTS", "value": round(bid * 0.01, 2)}
+        return (
+            200,
+            {},
+            {
+                "instrument": {
+                    "epic": epic,
+                    "marketId": "{}-UK".format(epic.split(".")[2]),
+                    "name": "Synthetic {}".format(epic.split(".")[2]),
+                    "expiry": "DFB",
+                },
+                "snapshot": {"bid": bid, "offer": offer, "high": high, "low": low},
+                "dealingRules": {
+                    "minNormalStopOrLimitDistance": distance,
+                    "minControlledRiskStopDistance": distance,
+                },
+            },
+        )
+
+    def _prices(self, epic: str, bars: int) -> Tuple[int, Dict[str, str], Any]:
+        if epic not in self._epic_set:
+            return (
+                404,
+                {},
+                {"errorCode": "error.service.marketdata.instrument.epic.unavailable"},
+            )
+        rnd = random.Random(epic)
+        price = self._snapshot(epic)[0]
+        start = datetime(2020, 1, 1)
+        prices = []
+        for i in range(bars):
+            close = max(price * (1 + rnd.gauss(0, 0.02)), 0.01)
+            high = max(price, close) * (1 + abs(rnd.gauss(0, 0.005)))
+            low = min(price, close) * (1 - abs(rnd.gauss(0, 0.005)))
+            date = start + timedelta(days=i)
+            prices.append(
+                {
+                    "snapshotTime": date.strftime("%Y/%m/%d %H:%M:%S"),
+                    "snapshotTimeUTC": date.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "openPrice": _bid_ask(price),
+                    "closePrice": _bid_ask(close),
+                    "highPrice": _bid_ask(high),
+                    "lowPrice": _bid_ask(low),
+                    "lastTradedVolume": rnd.randint(1000, 1000000),
+                }
+            )
+            price = close
+        allowance = {
+            "remainingAllowance": 10000,
+            "totalAllowance": 10000,
+            "allowanceExpiry": 604800,
+        }
+        return (
+            200,
+            {},
+            {"prices": prices, "instrumentType": "SHARES", "allowance": allowance},
+        )
+
+    def _open(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str], Any]:
+        epic = payload.get("epic")
+        if epic not in self._epic_set:
+            return self._reject(epic, payload.get("direction"), "MARKET_NOT_BORROWABLE")
+        deal_id = self.open_position(epic, payload.get("direction", "BUY"))
+        return self._accept(deal_id, epic, payload.get("direction"))
+
+    def _close(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str], Any]:
+        deal_id = payload.get("dealId")
+        with self._lock:
+            position = self._positions.pop(deal_id, None)
+        if position is None:
+            return self._reject(None, payload.get("direction"), "POSITION_NOT_FOUND")
+        return self._accept(
+            deal_id, position["market"]["epic"], payload.get("direction")
+        )
+
+    def _accept(
+        self, deal_id: str, epic: str, direction: Optional[str]
+    ) -> Tuple[int, Dict[str, str], Any]:
+        return self._confirm(deal_id, epic, direction, "ACCEPTED", "SUCCESS")
+
+    def _reject(
+        self, epic: Optional[str], direction: Optional[str], reason: str
+    ) -> Tuple[int, Dict[str, str], Any]:
+        return self._confirm(None, epic, direction, "REJECTED", reason)
+
+    def _confirm(
+        self,
+        deal_id: Optional[str],
+        epic: Optional[str],
+        direction: Optional[str],
+        status: str,
+        reason: str,
+    ) -> Tuple[int, Dict[str, str], Any]:
+        deal_ref = uuid.uuid4().hex[:14].upper()
+        with self._lock:
+            self._confirms[deal_ref] = {
+                "dealReference": deal_ref,
+                "dealId": deal_id,
+                "epic": epic,
+                "direction": direction,
+                "dealStatus": status,
+                "reason": reason,
+            }
+        return 200, {}, {"dealReference": deal_ref}
+
+    def _navigate(self, node_id: str) -> Dict[str, Any]:
+        chunks = range(0, len(self.epics), NODE_SIZE)
+        if not node_id.startswith("stub-"):
+            nodes = [
+                {"id": "stub-{}".format(i // NODE_SIZE), "name": "Synthetic"}
+                for i in chunks
+            ]
+            return {"nodes": nodes, "markets": []}
+        chunk = int(node_id.replace("stub-", "", 1))
+        first = chunk * NODE_SIZE
+        epics = self.epics[first:][:NODE_SIZE]
+        markets = [{"epic": e} for e in epics]
+        return {"nodes": [], "markets": markets}
+
+    def _watchlist(self, watchlist_id: str) -> Tuple[int, Dict[str, str], Any]:
+        if watchlist_id == "":
+            watchlists = [{"id": "stub", "name": self.watchlist_name}]
+            return 200, {}, {"watchlists": watchlists}
+        if watchlist_id == "stub":
+            return 200, {}, {"markets": [{"epic": e} for e in self.epics]}
+        return 404, {}, {"errorCode": "error.watchlists.not-found"}
+
+
+def _bid_ask(price: float) -> Dict[str, Any]:
+    return {
+        "bid": round(price, 2),
+        "ask": round(price * 1.002, 2),
+        "lastTraded": None,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid the delayed ACK stalls
+    disable_nagle_algorithm = True
+
+    def _serve(self) -> None:
+        stub: IGStubServer = getattr(self.server, "stub")
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length > 0 else b""
+        status, headers, data = stub.handle(
+            self.command, self.path, dict(self.headers), body
+        )
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _serve
+    do_POST = _serve
+    do_PUT = _serve
+    do_DELETE = _serve
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in of the IG REST API")
+    parser.add_argument("--epics", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = IGStubServer(
+        args.epics,
+        args.latency,
+        args.error_rate,
+        args.throttle_rate,
+        port=args.port,
+    )
+    print("IG stub serving {} epics at {}".format(args.epics, server.url))
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy indicator kernels against the pandas computations they
+replace.
+
+Each indicator is computed on the bars fetched by the strategies and on a
+long series, timing the best of several runs. The indicators of a universe
+of markets are then computed market by market and in a single batch.
+
+Usage: python -m benchmarks.indicators [BARS] [MARKETS]
+"""
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy
+import pandas
+
+from tradingbot.indicators import atr, bollinger, ema, macd, rolling_std, sma
+from tradingbot.interfaces import HistoryBatch, Market, MarketHistory
+
+Bars = Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+
+
+def make_bars(bars: int) -> Bars:
+    rng = numpy.random.default_rng(1)
+    close = 1000 + rng.standard_normal(bars).cumsum()
+    return close + rng.random(bars), close - rng.random(bars), close
+
+
+def pandas_macd(close: numpy.ndarray) -> Any:
+    px = pandas.DataFrame({"close": close})
+    line = px["close"].ewm(span=12).mean() - px["close"].ewm(span=26).mean()
+    signal = line.rolling(9).mean()
+    return line, signal, line - signal
+
+
+def pandas_bollinger(close: numpy.ndarray) -> Any:
+    px = pandas.Series(close)
+    ma = px.rolling(window=20).mean()
+    std = px.rolling(window=20).std()
+    return ma, ma + std * 2, ma - std * 2
+
+
+def pandas_atr(high: numpy.ndarray, low: numpy.ndarray, close: numpy.ndarray) -> Any:
+    px = pandas.DataFrame({"high": high, "low": low, "close": close})
+    previous = px["close"].shift()
+    tr = pandas.concat(
+        [
+            px["high"] - px["low"],
+            (px["high"] - previous).abs(),
+            (px["low"] - previous).abs(),
+        ],
+        axis=1,
+    ).max(axis=1)
+    return tr.ewm(alpha=1 / 14, adjust=False).mean()
+
+
+def cases(bars: Bars) -> Dict[str, Tuple[Callable[[], Any], Callable[[], Any]]]:
+    high, low, close = bars
+    series = pandas.Series(close)
+    return {
+        "ema": (lambda: series.ewm(span=26).mean(), lambda: ema(close, 26)),
+        "sma": (lambda: series.rolling(20).mean(), lambda: sma(close, 20)),
+        "std": (lambda: series.rolling(20).std(), lambda: rolling_std(close, 20)),
+        "macd": (lambda: pandas_macd(close), lambda: macd(close)),
+        "bollinger": (lambda: pandas_bollinger(close), lambda: bollinger(close, 20)),
+        "atr": (lambda: pandas_atr(*bars), lambda: atr(*bars)),
+    }
+
+
+def make_histories(markets: int) -> List[MarketHistory]:
+    """
+    Return the histories of the markets, of 60 to 100 daily bars
+    """
+    histories = []
+    for i in range(markets):
+        high, low, close = make_bars(100)
+        bars = 60 + i % 41
+        dates = numpy.arange(bars) + numpy.datetime64("2020-01-01", "D")
+        histories.append(
+            MarketHistory(
+                Market(epic="EPIC{}".format(i)),
+                dates,
+                high[-bars:],
+                low[-bars:],
+                close[-bars:],
+                numpy.ones(bars),
+            )
+        )
+    return histories
+
+
+def universe(histories: List[MarketHistory]) -> None:
+    batch = HistoryBatch(histories)
+    print("{} markets".format(len(histories)))
+    cases = {
+        "macd": (
+            lambda: [pandas_macd(h.close) for h in histories],
+            lambda: [macd(h.close) for h in histories],
+            lambda: HistoryBatch(histories).macd(),
+        ),
+        "bollinger": (
+            lambda: [pandas_bollinger(h.close) for h in histories],
+            lambda: [bollinger(h.close, 20) for h in histories],
+            lambda: batch.bollinger(20),
+        ),
+        "atr": (
+            lambda: [pandas_atr(h.high, h.low, h.close) for h in histories],
+            lambda: [atr(h.high, h.low, h.close) for h in histories],
+            lambda: batch.atr(),
+        ),
+    }
+    for name, (reference, kernel, batched) in cases.items():
+        print(
+            "{:>10}: pandas {:8.1f} ms, numpy {:8.1f} ms, batch {:8.1f} ms".format(
+                name,
+                best_of(reference, 1) / 1000,
+                best_of(kernel, 1) / 1000,
+                best_of(batched, 1) / 1000,
+            )
+        )
+
+
+def best_of(func: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 10**6
+
+
+def main() -> None:
+    long_bars = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for bars in [100, long_bars]:
+        number = max(1, 100000 // bars)
+        print("{} bars".format(bars))
+        for name, (reference, kernel) in cases(make_bars(bars)).items():
+            pandas_time = best_of(reference, number)
+            numpy_time = best_of(kernel, number)
+            print(
+                "{:>10}: pandas {:10.1f} us, numpy {:10.1f} us ({:.1f}x)".format(
+                    name, pandas_time, numpy_time, pandas_time / numpy_time
+                )
+            )
+    universe(make_histories(int(sys.argv[2]) if len(sys.argv) > 2 else 500))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import json
 import re
 from enum import Enum
 
+from govuk_bank_holidays.bank_holidays import BankHolidays
+
 from tradingbot.components.broker import IG_API_URL
 
 # Set global variables used in fixtures
@@ -17,6 +19,7 @@ class AV_API_URL(Enum):
     BASE_URI = "https://www.alphavantage.co/query?"
     MACD_EXT = "MACDEXT"
     TS_DAILY = "TIME_SERIES_DAILY"
+    TS_INTRADAY = "TIME_SERIES_INTRADAY"
 
 
 class YF_API_URL(Enum):
@@ -71,6 +74,17 @@ def ig_request_open_positions(mock, data="mock_positions.json", fail=False):
     )
 
 
+def ig_request_open_positions_closed(mock, data="mock_positions.json"):
+    """Mock open positions call returning no positions after the first call"""
+    mock.get(
+        "{}/{}".format(IG_BASE_URI, IG_API_URL.POSITIONS.value),
+        [
+            {"json": read_json("{}/{}".format(TEST_DATA_IG, data))},
+            {"json": {"positions": []}},
+        ],
+    )
+
+
 def ig_request_market_info(mock, args="", data="mock_market_info.json", fail=False):
     """Mock market info call"""
     mock.get(
@@ -187,6 +201,23 @@ def av_request_prices(mock, args="", data="mock_av_daily.json", fail=False):
     )
 
 
+def av_request_intraday(mock, args="", data="mock_av_intraday_60min.json", fail=False):
+    """Mock AV intraday prices"""
+    mock.get(
+        re.compile(
+            re.escape(
+                "{}function={}&symbol={}".format(
+                    AV_API_URL.BASE_URI.value, AV_API_URL.TS_INTRADAY.value, args
+                )
+            )
+        ),
+        json=data
+        if isinstance(data, dict)
+        else read_json("{}/{}".format(TEST_DATA_AV, data)),
+        status_code=401 if fail else 200,
+    )
+
+
 ###################################################################
 # Yahoo Finance mock requests
 ###################################################################
@@ -201,3 +232,13 @@ def yf_request_prices(mock, args="", data="mock_history_day_max.json", fail=Fals
         else read_json("{}/{}".format(TEST_DATA_YF, data)),
         status_code=401 if fail else 200,
     )
+
+
+###################################################################
+# Other mock requests
+###################################################################
+
+
+def bank_holidays_request(mock):
+    """Mock the UK bank holidays with the copy shipped with the library"""
+    mock.get(BankHolidays.source_url, json=BankHolidays.load_backup_data())
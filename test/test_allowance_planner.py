@@ -0,0 +1,121 @@
+import pytest
+
+from tradingbot.components.broker import AllowancePlanner
+
+
+class MockClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return MockClock()
+
+
+@pytest.fixture
+def planner(clock):
+    # One spin per hour, allowance resets in 10 hours
+    p = AllowancePlanner(3600, reserve=100, clock=clock)
+    p.update(
+        {
+            "remainingAllowance": 1100,
+            "totalAllowance": 10000,
+            "allowanceExpiry": 36000,
+        }
+    )
+    return p
+
+
+def test_unknown_allowance_always_fetch(clock):
+    p = AllowancePlanner(3600, clock=clock)
+    assert p.spin_budget() is None
+    assert p.should_fetch("mock", 1000000, True)
+
+
+def test_spin_budget(planner):
+    # (1100 - 100) / 10 spins
+    assert planner.spin_budget() == 100
+    assert planner.seconds_to_reset() == 36000
+
+
+def test_fallback_to_cache_when_budget_spent(planner):
+    assert planner.should_fetch("A", 60, True)
+    planner.record_fetch("A", 60)
+    assert not planner.should_fetch("B", 60, True)
+    # Without cached data the request goes through without touching the reserve
+    assert planner.should_fetch("B", 60, False)
+    assert planner.should_fetch("B", 1000, False)
+    assert not planner.should_fetch("B", 1001, False)
+
+
+def test_held_markets_can_use_the_reserve(planner):
+    planner.set_held_epics(["HELD"])
+    assert planner.should_fetch("HELD", 1100, False)
+    assert not planner.should_fetch("OTHER", 1100, False)
+
+
+def test_held_and_priority_markets(planner):
+    planner.set_held_epics(["HELD"])
+    planner.set_priority("NEAR", 1.0)
+    planner.record_fetch("HELD", 80)
+    planner.record_fetch("NEAR", 80)
+    # Over the spin budget but still within the allowance
+    assert planner.should_fetch("HELD", 80, True)
+    assert planner.should_fetch("NEAR", 80, True)
+    assert not planner.should_fetch("OTHER", 10, True)
+    planner.set_priority("NEAR", 0)
+    assert not planner.should_fetch("NEAR", 80, True)
+
+
+def test_priority_markets_budget_is_reserved(planner, clock):
+    planner.set_held_epics(["HELD"])
+    planner.record_fetch("HELD", 50)
+    # New spin: the held market has not been refreshed yet
+    clock.now += 3600
+    planner.start_spin()
+    # (1100 - 100) / 9 spins left
+    assert planner.spin_budget() == 111
+    assert planner.should_fetch("OTHER", 61, True)
+    assert not planner.should_fetch("OTHER", 62, True)
+
+
+def test_new_spin_resets_spent_budget(planner, clock):
+    planner.record_fetch("A", 100)
+    assert not planner.should_fetch("B", 10, True)
+    # Time passing alone does not start a new spin
+    clock.now += 3600
+    assert not planner.should_fetch("B", 10, True)
+    planner.start_spin()
+    assert planner.should_fetch("B", 10, True)
+
+
+def test_spins_counted_on_market_hours(clock):
+    # Only 2 hours of open market before the reset
+    p = AllowancePlanner(
+        3600, reserve=100, clock=clock, market_seconds=lambda seconds: 7200
+    )
+    p.update(
+        {"remainingAllowance": 1100, "totalAllowance": 10000, "allowanceExpiry": 36000}
+    )
+    assert p.spin_budget() == 500
+
+
+def test_allowance_reset(planner, clock):
+    planner.update(
+        {"remainingAllowance": 0, "totalAllowance": 10000, "allowanceExpiry": 60}
+    )
+    assert not planner.should_fetch("A", 10, False)
+    clock.now += 61
+    assert planner.remaining == 0
+    assert planner.should_fetch("A", 10, False)
+    assert planner.remaining == 10000
+
+
+def test_cache(planner):
+    assert planner.cached(("A", "DAY", 10)) is None
+    planner.store(("A", "DAY", 10), "mock")
+    assert planner.cached(("A", "DAY", 10)) == "mock"
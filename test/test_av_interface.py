@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import pytest
+import toml
+from common.MockRequests import av_request_prices, bank_holidays_request, read_json
+
+from tradingbot.components import Configuration, Interval, MovingAverageType, Utils
+from tradingbot.components.broker import AVInterface, AVInterval, InterfaceNames
+from tradingbot.interfaces import Market, MarketHistory, MarketMACD
+
+
+@pytest.fixture
+def config():
+    with open("test/test_data/trading_bot.toml", "r") as f:
+        config = toml.load(f)
+        config["stocks_interface"]["active"] = InterfaceNames.ALPHA_VANTAGE.value
+        config["stocks_interface"][InterfaceNames.ALPHA_VANTAGE.value][
+            "api_timeout"
+        ] = 0
+        return Configuration(config)
+
+
+@pytest.fixture
+def av(requests_mock, config):
+    av_request_prices(requests_mock)
+    bank_holidays_request(requests_mock)
+    return AVInterface(config)
+
+
+def make_market(market_id):
+    market = Market()
+    market.epic = "KA.D.{}.DAILY.IP".format(market_id)
+    market.id = market_id
+    return market
+
+
+def compact_daily():
+    data = read_json("test/test_data/alpha_vantage/mock_av_daily.json")
+    series = data["Time Series (Daily)"]
+    latest = dict(series["2019-09-16"])
+    latest["4. close"] = "137.0000"
+    data["Time Series (Daily)"] = {
+        "2019-09-17": latest,
+        "2019-09-16": series["2019-09-16"],
+    }
+    return data
+
+
+def output_sizes(requests_mock):
+    return [
+        r.qs["outputsize"][0]
+        for r in requests_mock.request_history
+        if "outputsize" in r.qs
+    ]
+
+
+def test_daily_full_download_is_cached(av, requests_mock):
+    market = make_market("CACHED")
+    first = av.daily(market.id)
+    second = av.daily(market.id)
+    assert output_sizes(requests_mock) == ["full"]
+    assert first.equals(second)
+    # Oldest datapoint first
+    assert first.index[0] < first.index[-1]
+
+
+def test_daily_compact_update(av, requests_mock):
+    market = make_market("COMPACT")
+    full = av.daily(market.id)
+    # Expire the cached series and serve the latest datapoints only
+    av._expires_at[
+        (av._format_market_id(market.id), AVInterval.DAILY.value)
+    ] = datetime.min
+    av_request_prices(requests_mock, data=compact_daily())
+
+    hist = av.get_prices(market, Interval.DAY, 10)
+    assert output_sizes(requests_mock) == ["full", "compact"]
+    assert isinstance(hist, MarketHistory)
+    assert len(hist.dataframe) == len(full) + 1
+    assert hist.dataframe[MarketHistory.CLOSE_COLUMN].iloc[-1] == 137.0
+    assert hist.latest(1).close.tolist() == [137.0]
+
+
+def test_expiry(av):
+    now = datetime.now()
+    expiry = av._expiry(AVInterval.MIN_5)
+    assert now < expiry <= datetime.now() + timedelta(minutes=5)
+    expiry = av._expiry(AVInterval.DAILY)
+    assert expiry > now
+    assert (expiry.hour, expiry.minute) == (16, 30)
+
+
+def test_macd_computed_locally(av, requests_mock):
+    market = make_market("MACD")
+    macd = av.get_macd(market, Interval.DAY, 30)
+    # Only the time series has been requested
+    assert [
+        r.qs["function"][0] for r in requests_mock.request_history if "function" in r.qs
+    ] == ["time_series_daily"]
+    assert isinstance(macd, MarketMACD)
+    assert not macd.dataframe[MarketMACD.MACD_COLUMN].isna().any()
+    dates = macd.dataframe[MarketMACD.DATE_COLUMN]
+    assert dates.iloc[0] < dates.iloc[-1]
+
+    closes = av.daily(market.id)["4. close"].values
+    expected = Utils.macdext_df_from_list(
+        closes,
+        fast_ma=MovingAverageType.WMA,
+        slow_ma=MovingAverageType.EMA,
+        signal_ma=MovingAverageType.SMA,
+    )
+    assert macd.dataframe[MarketMACD.HIST_COLUMN].iloc[-1] == expected["Hist"].iloc[-1]
+    assert len(macd.dataframe) == len(closes) - 33
@@ -1,14 +1,19 @@
+import asyncio
+
 import pytest
 import toml
 from common.MockRequests import (
+    av_request_intraday,
     av_request_macd_ext,
     av_request_prices,
+    bank_holidays_request,
     ig_request_account_details,
     ig_request_confirm_trade,
     ig_request_login,
     ig_request_market_info,
     ig_request_navigate_market,
     ig_request_open_positions,
+    ig_request_open_positions_closed,
     ig_request_prices,
     ig_request_search_market,
     ig_request_set_account,
@@ -18,7 +23,12 @@ from common.MockRequests import (
 )
 
 from tradingbot.components import Configuration, Interval, TradeDirection
-from tradingbot.components.broker import Broker, BrokerFactory, InterfaceNames
+from tradingbot.components.broker import (
+    AsyncBroker,
+    Broker,
+    BrokerFactory,
+    InterfaceNames,
+)
 from tradingbot.interfaces import Market, MarketHistory, MarketMACD, Position
 
 
@@ -27,6 +37,7 @@ from tradingbot.interfaces import Market, MarketHistory, MarketMACD, Position
         InterfaceNames.IG_INDEX.value,
         InterfaceNames.ALPHA_VANTAGE.value,
         InterfaceNames.YAHOO_FINANCE.value,
+        InterfaceNames.COMPOSITE.value,
     ]
 )
 def config(request):
@@ -68,6 +79,8 @@ def mock_http_calls(requests_mock):
     ig_request_watchlist(requests_mock)
     ig_request_watchlist(requests_mock, args="12345678", data="mock_watchlist.json")
     av_request_prices(requests_mock)
+    av_request_intraday(requests_mock)
+    bank_holidays_request(requests_mock)
     av_request_macd_ext(requests_mock)
     yf_request_prices(requests_mock)
 
@@ -108,10 +121,21 @@ def test_get_account_used_perc(broker):
     assert perc == 62.138354775208285
 
 
-def test_close_all_positions(broker):
+def test_close_all_positions(broker, requests_mock):
+    # Positions are reported as still open
+    assert not broker.close_all_positions()
+    ig_request_open_positions_closed(requests_mock)
     assert broker.close_all_positions()
 
 
+def test_flatten_positions(broker, requests_mock):
+    ig_request_open_positions_closed(requests_mock)
+    report = broker.flatten_positions()
+    assert report.success()
+    assert len(report.closed) > 0
+    assert all(attempts == 1 for attempts in report.attempts.values())
+
+
 def test_close_position(broker):
     pos = broker.get_open_positions()
     for p in pos:
@@ -166,3 +190,79 @@ def test_get_macd(broker):
     assert len(macd.dataframe[MarketMACD.SIGNAL_COLUMN]) > 0
     assert MarketMACD.HIST_COLUMN in macd.dataframe
     assert len(macd.dataframe[MarketMACD.HIST_COLUMN]) > 0
+
+
+def test_async_broker_concurrent_requests(broker):
+    async_broker = broker.async_broker
+    assert isinstance(async_broker, AsyncBroker)
+
+    async def fetch_all():
+        market = await async_broker.get_market_info("mock")
+        return await asyncio.gather(
+            *[async_broker.get_prices(market, Interval.DAY, 10) for _ in range(4)],
+            async_broker.get_open_positions(),
+        )
+
+    *histories, positions = asyncio.run(fetch_all())
+    assert len(histories) == 4
+    for hist in histories:
+        assert isinstance(hist, MarketHistory)
+        assert len(hist.dataframe) > 0
+    assert isinstance(positions[0], Position)
+
+
+def test_sync_broker_wraps_async_broker(broker):
+    # Sync and async facades share the same interface singletons
+    assert broker.stocks_ifc is broker.async_broker.stocks_ifc.ifc
+    assert broker.account_ifc is broker.async_broker.account_ifc.ifc
+
+    async def blocking_call_from_coroutine():
+        return broker.get_open_positions()
+
+    # Blocking calls are allowed from other event loops
+    assert len(asyncio.run(blocking_call_from_coroutine())) > 0
+
+
+def test_broker_coalesces_identical_requests(broker):
+    async_broker = broker.async_broker
+    before = broker.coalescing_stats().get("get_market_info", (0, 0))
+
+    async def fetch_all():
+        return await asyncio.gather(
+            *[async_broker.get_market_info("mock") for _ in range(5)]
+        )
+
+    markets = asyncio.run(fetch_all())
+    assert all(m is markets[0] for m in markets)
+    calls, coalesced = broker.coalescing_stats()["get_market_info"]
+    assert calls - before[0] == 5
+    assert coalesced - before[1] == 4
+
+
+def test_get_prices_batch(broker):
+    first = broker.get_market_info("mock")
+    second = broker.get_market_info("mock")
+    second.epic = "{}.2".format(first.epic)
+    second.id = "{}2".format(first.id)
+    histories = broker.get_prices_batch([first, second], Interval.DAY, 10)
+    assert set(histories.keys()) == {first.epic, second.epic}
+    for epic, hist in histories.items():
+        assert isinstance(hist, MarketHistory)
+        assert hist.market.epic == epic
+        assert len(hist.dataframe[MarketHistory.CLOSE_COLUMN]) > 0
+    assert list(broker.get_prices_batch([first], Interval.DAY, 10)) == [first.epic]
+    assert broker.get_prices_batch([], Interval.DAY, 10) == {}
+
+
+def test_metrics(broker):
+    broker.dump_metrics()
+    broker.get_market_info("mock")
+    metrics = broker.metrics()
+    assert metrics["Broker.get_market_info"]["calls"] == 1
+    assert metrics["IGInterface.get_market_info"]["calls"] == 1
+    http = [name for name in metrics if name.startswith("GET ")]
+    assert any("/markets/" in name for name in http)
+    assert all(metrics[name]["bytes_received"] > 0 for name in http)
+    report = broker.dump_metrics()
+    assert "Broker.get_market_info" in report
+    assert broker.metrics() == {}
@@ -0,0 +1,89 @@
+import gzip
+import json
+
+import pytest
+import requests
+
+from benchmarks.ig_stub_server import IGStubServer
+from tradingbot.components.broker import Cassette, CassetteMode, HttpTransport
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """
+    Record some traffic with the IG stand-in server and return the cassette
+    path and the recorded responses
+    """
+    filepath = tmp_path / "cassette.jsonl.gz"
+    with IGStubServer(epics=10) as server:
+        transport = HttpTransport(2, Cassette(CassetteMode.RECORD, filepath))
+        epic = server.epics[3]
+        responses = [
+            transport.post(
+                "{}/session".format(server.url), data='{"password": "secret"}'
+            ),
+            transport.get("{}/markets/{}".format(server.url, epic)),
+            transport.get("{}/prices/{}/DAY/5".format(server.url, epic)),
+            transport.get("{}/markets?searchTerm=SYN0000".format(server.url)),
+            transport.get("{}/markets/UNKNOWN".format(server.url)),
+        ]
+        transport.close()
+        yield filepath, server.url, responses
+
+
+def test_record(recorded):
+    filepath, url, responses = recorded
+    with gzip.open(filepath, "rt") as f:
+        entries = [json.loads(line) for line in f]
+    assert [e["url"] for e in entries] == [r.url for r in responses]
+    assert all(e["elapsed"] > 0 for e in entries)
+    assert entries[0]["headers"]["CST"] == "stub"
+    # Request bodies are not stored
+    assert "secret" not in filepath.read_bytes().decode("latin-1")
+    assert "secret" not in json.dumps(entries)
+
+
+def test_replay(recorded):
+    filepath, url, responses = recorded
+    sleeps = []
+    cassette = Cassette(CassetteMode.REPLAY, filepath, 0.5, sleep=sleeps.append)
+    transport = HttpTransport(2, cassette)
+    replayed = [
+        transport.post("{}/session".format(url), data='{"password": "secret"}'),
+        transport.get(responses[1].url),
+        transport.get(responses[2].url),
+        transport.get(responses[3].url),
+        transport.get(responses[4].url),
+    ]
+    for original, response in zip(responses, replayed):
+        assert response.status_code == original.status_code
+        assert response.content == original.content
+        assert response.json() == original.json()
+    assert replayed[0].headers["CST"] == "stub"
+    assert replayed[4].status_code == 404
+    with gzip.open(filepath, "rt") as f:
+        elapsed = [json.loads(line)["elapsed"] for line in f]
+    assert sleeps == pytest.approx([e * 0.5 for e in elapsed])
+    # Exhausted requests repeat the last response
+    assert transport.get(responses[1].url).content == responses[1].content
+    # Same path with a different query
+    search = transport.get("{}/markets?searchTerm=OTHER".format(url))
+    assert search.content == responses[3].content
+    with pytest.raises(requests.ConnectionError):
+        transport.get("{}/accounts".format(url))
+    transport.close()
+
+
+def test_replay_without_latency(recorded):
+    filepath, url, responses = recorded
+    sleeps = []
+    cassette = Cassette(CassetteMode.REPLAY, filepath, 0, sleep=sleeps.append)
+    transport = HttpTransport(2, cassette)
+    assert transport.get(responses[2].url).json() == responses[2].json()
+    assert sleeps == []
+    transport.close()
+
+
+def test_off_mode(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(CassetteMode.OFF, tmp_path / "cassette.jsonl.gz")
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from tradingbot.components import Interval
+from tradingbot.components.broker import AsyncCompositeStocksInterface
+from tradingbot.interfaces import Market
+
+
+class MockStocksInterface:
+    """Answer with its name after "delay" seconds or raise if "fail" is set"""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.ifc = None
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+        self.spins = 0
+
+    async def get_prices(self, market, interval, data_range):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError("{} failed".format(self.name))
+        return self.name
+
+    def start_spin(self):
+        self.spins += 1
+
+
+class MockClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_composite(*providers, clock=None):
+    return AsyncCompositeStocksInterface(
+        {p.name: p for p in providers},
+        hedge_delay=0.05,
+        failure_cooldown=60,
+        **({} if clock is None else {"clock": clock}),
+    )
+
+
+def get_prices(composite):
+    return asyncio.run(composite.get_prices(Market(), Interval.DAY, 10))
+
+
+def test_composite_needs_providers():
+    with pytest.raises(ValueError):
+        make_composite()
+
+
+def test_primary_provider():
+    primary = MockStocksInterface("primary")
+    secondary = MockStocksInterface("secondary")
+    composite = make_composite(primary, secondary)
+    assert get_prices(composite) == "primary"
+    assert (primary.calls, secondary.calls) == (1, 0)
+    assert composite.stats[0].latency is not None
+    assert composite.hedged == 0
+    composite.start_spin()
+    assert primary.spins == secondary.spins == 1
+
+
+def test_failover():
+    clock = MockClock()
+    primary = MockStocksInterface("primary", fail=True)
+    secondary = MockStocksInterface("secondary")
+    composite = make_composite(primary, secondary, clock=clock)
+    assert get_prices(composite) == "secondary"
+    assert composite.stats[0].errors == 1
+    # The failed provider is avoided until the cooldown expires
+    assert composite.ranking() == [1, 0]
+    assert get_prices(composite) == "secondary"
+    assert primary.calls == 1
+    assert not composite.stats[0].is_healthy(clock.now)
+    clock.now = 61
+    assert composite.stats[0].is_healthy(clock.now)
+
+
+def test_all_providers_fail():
+    composite = make_composite(
+        MockStocksInterface("primary", fail=True),
+        MockStocksInterface("secondary", fail=True),
+    )
+    with pytest.raises(RuntimeError, match="secondary failed"):
+        get_prices(composite)
+    assert [s.errors for s in composite.stats] == [1, 1]
+
+
+def test_hedged_request():
+    primary = MockStocksInterface("primary", delay=0.5)
+    secondary = MockStocksInterface("secondary", delay=0.0)
+    composite = make_composite(primary, secondary)
+    assert get_prices(composite) == "secondary"
+    assert composite.hedged == 1
+    assert primary.cancelled == 1
+    # The slow provider is ranked after the one that answered
+    assert composite.stats[0].latency > composite.stats[1].latency
+    assert composite.ranking() == [1, 0]
+    assert get_prices(composite) == "secondary"
+    assert composite.hedged == 1
@@ -65,6 +65,9 @@ def test_value_getters():
     assert config.is_logging_enabled()
     assert "/tmp/trading_bot" in config.get_log_filepath()
     assert "{timestamp}" not in config.get_log_filepath()
+    assert config.get_cassette_mode() == "off"
+    assert config.get_cassette_filepath() == "/tmp/trading_bot_cassette.jsonl.gz"
+    assert config.get_cassette_latency_scale() == 1.0
     assert not config.is_logging_debug_enabled()
     assert config.get_active_market_source() == "watchlist"
     assert config.get_market_source_values() == ["list", "api", "watchlist"]
@@ -75,6 +78,7 @@ def test_value_getters():
         "yfinance",
         "alpha_vantage",
         "ig_interface",
+        "composite",
     ]
     assert config.get_ig_order_type() == "MARKET"
     assert config.get_ig_order_size() == 1
@@ -85,9 +89,18 @@ def test_value_getters():
     assert config.get_ig_use_demo_account()
     assert not config.get_ig_controlled_risk()
     assert config.get_ig_api_timeout() == 0
+    assert config.get_ig_api_base_url() == ""
     assert not config.is_paper_trading_enabled()
+    assert config.get_paper_account_balance() == 10000.0
+    assert config.get_paper_account_margin_factor() == 0.2
+    assert config.get_paper_account_state_filepath() == ""
+    assert config.get_indicators_state_filepath() == ""
     assert config.get_alphavantage_api_timeout() == 12
+    assert config.get_history_encoding() == "float64"
     assert config.get_yfinance_api_timeout() == 0.5
+    assert config.get_composite_providers() == ["yfinance", "alpha_vantage"]
+    assert config.get_composite_hedge_delay() == 2.0
+    assert config.get_composite_failure_cooldown() == 60
     assert config.get_active_account_interface() == "ig_interface"
     assert config.get_account_interface_values() == ["ig_interface"]
     assert config.get_active_strategy() == "simple_macd"
@@ -0,0 +1,75 @@
+import numpy
+import pytest
+
+from tradingbot.components import Utils
+from tradingbot.indicators import atr, bollinger
+from tradingbot.interfaces import HistoryBatch, Market, MarketHistory
+
+
+def make_history(epic, bars, seed):
+    rng = numpy.random.default_rng(seed)
+    close = 100 + rng.standard_normal(bars).cumsum()
+    dates = numpy.arange(bars) + numpy.datetime64("2020-01-01", "D")
+    return MarketHistory(
+        Market(epic=epic),
+        dates,
+        close + rng.random(bars),
+        close - rng.random(bars),
+        close,
+        rng.integers(1, 1000, bars),
+    )
+
+
+@pytest.fixture
+def histories():
+    return [make_history("EPIC{}".format(i), 40 + i * 15, i) for i in range(5)]
+
+
+def test_stacking(histories):
+    batch = HistoryBatch(histories)
+    assert len(batch) == 5
+    assert batch.bars == 100
+    assert batch.close.shape == (5, 100)
+    assert batch.lengths.tolist() == [40, 55, 70, 85, 100]
+    # The shorter histories are padded before their first bar
+    assert numpy.isnan(batch.close[0, :60]).all()
+    assert numpy.isnat(batch.dates[0, :60]).all()
+    history = batch.history("EPIC0")
+    assert history.market is histories[0].market
+    assert numpy.array_equal(history.dates, histories[0].dates)
+    assert numpy.array_equal(history.close, histories[0].close)
+    assert numpy.shares_memory(history.close, batch.close)
+    assert "EPIC0" in batch
+    with pytest.raises(KeyError):
+        batch.history("UNKNOWN")
+    # Only the most recent bars are kept
+    batch = HistoryBatch(histories, bars=50)
+    assert batch.lengths.tolist() == [40, 50, 50, 50, 50]
+    assert numpy.array_equal(batch.history("EPIC4").close, histories[4].close[-50:])
+
+
+def test_indicators_match_single_market(histories):
+    batch = HistoryBatch(histories)
+    macds = batch.macd()
+    bands = batch.bollinger(20)
+    ranges = batch.atr(14)
+    for history in histories:
+        epic = history.market.epic
+        expected = Utils.macd_df_from_list(history.close)
+        macd = macds[epic]
+        assert macd.market is history.market
+        assert numpy.array_equal(macd.dates, history.dates)
+        assert numpy.allclose(macd.macd, expected["MACD"])
+        assert numpy.allclose(macd.signal, expected["Signal"], equal_nan=True)
+        assert numpy.allclose(macd.hist, expected["Hist"], equal_nan=True)
+        for band, single in zip(bands[epic], bollinger(history.close, 20)):
+            assert numpy.allclose(band, single, equal_nan=True)
+        single = atr(history.high, history.low, history.close, 14)
+        assert numpy.allclose(ranges[epic], single, equal_nan=True)
+
+
+def test_empty_batch():
+    batch = HistoryBatch([])
+    assert len(batch) == 0
+    assert batch.macd() == {}
+    assert batch.atr() == {}
@@ -0,0 +1,111 @@
+import numpy
+import pandas
+import pytest
+
+from tradingbot.components.broker import HistoryCache
+from tradingbot.interfaces import Market
+
+KEY = ("mock", "1d")
+
+
+def make_frame(start, periods, close=1.0):
+    index = pandas.date_range(start, periods=periods, freq="D")
+    return pandas.DataFrame({"Close": [close] * periods}, index=index)
+
+
+@pytest.fixture
+def cache():
+    return HistoryCache(max_rows=20, clock=lambda: 42.0)
+
+
+def test_empty_cache(cache):
+    assert cache.get(KEY) is None
+    assert cache.last_date(KEY) is None
+    assert not cache.covers(KEY, None)
+    assert cache.updated_at(KEY) is None
+
+
+def test_merge_replaces_overlapping_rows(cache):
+    start = pandas.Timestamp("2020-01-01")
+    cache.merge(KEY, make_frame(start, 10), start)
+    update = pandas.Timestamp("2020-01-10")
+    frame = cache.merge(KEY, make_frame(update, 3, close=2.0), update)
+
+    assert len(frame) == 12
+    assert frame.index.is_monotonic_increasing
+    assert frame.loc["2020-01-09", "Close"] == 1.0
+    assert frame.loc["2020-01-10", "Close"] == 2.0
+    assert cache.last_date(KEY) == pandas.Timestamp("2020-01-12")
+    # The overlapping update keeps the history complete from the first download
+    assert cache.covers(KEY, start)
+    assert not cache.covers(KEY, pandas.Timestamp("2019-12-31"))
+    assert not cache.covers(KEY, None)
+    assert cache.updated_at(KEY) == 42.0
+
+
+def test_merge_with_gap_restarts_coverage(cache):
+    start = pandas.Timestamp("2020-01-01")
+    cache.merge(KEY, make_frame(start, 5), start)
+    later = pandas.Timestamp("2020-01-10")
+    cache.merge(KEY, make_frame(later, 5), later)
+    assert not cache.covers(KEY, start)
+    assert cache.covers(KEY, later)
+
+
+def test_full_history_covers_any_window(cache):
+    cache.merge(KEY, make_frame("2020-01-01", 5), None)
+    assert cache.covers(KEY, None)
+    assert cache.covers(KEY, pandas.Timestamp("1900-01-01"))
+
+
+def test_max_rows(cache):
+    cache.merge(KEY, make_frame("2020-01-01", 30), None)
+    frame = cache.get(KEY)
+    assert len(frame) == 20
+    assert frame.index[0] == pandas.Timestamp("2020-01-11")
+    assert not cache.covers(KEY, None)
+    assert cache.covers(KEY, pandas.Timestamp("2020-01-11"))
+    cache.clear()
+    assert cache.get(KEY) is None
+
+
+def make_prices(start, periods, close=1.0):
+    frame = make_frame(start, periods, close)
+    for column in ["High", "Low", "Volume"]:
+        frame[column] = frame["Close"]
+    return frame
+
+
+def test_history_window():
+    cache = HistoryCache(columns=["High", "Low", "Close", "Volume"], window_capacity=8)
+    market = Market()
+    assert cache.history(KEY, market, 5) is None
+    cache.merge(KEY, make_prices("2020-01-01", 10), None)
+    history = cache.history(KEY, market, 5)
+    assert history.market is market
+    assert len(history) == 5
+    assert history.dates[-1] == numpy.datetime64("2020-01-10")
+    # The merged rows are appended to the window in place
+    update = pandas.Timestamp("2020-01-10")
+    cache.merge(KEY, make_prices(update, 2, close=2.0), update)
+    updated = cache.history(KEY, market, 5)
+    assert updated.close.base is history.close.base
+    assert updated.close.tolist() == [1.0, 1.0, 1.0, 2.0, 2.0]
+    assert updated.dates[-1] == numpy.datetime64("2020-01-11")
+    # Rows older than the window are copied from the stored dataframe
+    whole = cache.history(KEY, market, None)
+    assert len(whole) == 11
+    assert whole.close.base is not history.close.base
+    assert len(cache.history(KEY, market, 9)) == 9
+    # A backfill of older rows fills the window again
+    backfill = pandas.Timestamp("2020-01-05")
+    cache.merge(KEY, make_prices(backfill, 2, close=3.0), backfill)
+    assert cache.history(KEY, market, 8).close.tolist() == [1.0, 3.0, 3.0] + [
+        1.0
+    ] * 3 + [2.0, 2.0]
+
+
+def test_history_requires_columns(cache):
+    cache.merge(KEY, make_frame("2020-01-01", 5), None)
+    with pytest.raises(ValueError):
+        cache.history(KEY, Market(), 5)
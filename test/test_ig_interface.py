@@ -1,3 +1,4 @@
+import numpy
 import pytest
 import toml
 from common.MockRequests import (
@@ -14,8 +15,9 @@ from common.MockRequests import (
     ig_request_watchlist,
 )
 
-from tradingbot.components import Configuration, Interval, TradeDirection
-from tradingbot.components.broker import IGInterface, InterfaceNames
+from tradingbot.components import Configuration, Interval, TradeDirection, Utils
+from tradingbot.components.broker import AllowancePlanner, IGInterface, InterfaceNames
+from tradingbot.indicators import IndicatorEngine
 from tradingbot.interfaces import Market, MarketHistory, Position
 
 
@@ -149,6 +151,26 @@ def test_get_prices_fail(ig, requests_mock):
         _ = ig.get_prices(ig.get_market_info("mock"), Interval.HOUR, 10)
 
 
+def test_get_prices_allowance_planner(ig, requests_mock):
+    ig_request_market_info(requests_mock)
+    ig_request_prices(requests_mock)
+    ig.allowance_planner = AllowancePlanner(3600)
+    try:
+        market = ig.get_market_info("mock")
+        p = ig.get_prices(market, Interval.HOUR, 10)
+        # Allowance from the mock response: 9950 left, reset in ~168 hours
+        assert ig.allowance_planner.remaining == 9950
+        assert ig.allowance_planner.spin_budget() == 59
+        p_cached = ig.get_prices(market, Interval.HOUR, 50)
+        assert p_cached is not p
+        # Budget is spent, so the cached history is returned
+        assert ig.get_prices(market, Interval.HOUR, 10) is p
+        ig_request_prices(requests_mock, fail=True)
+        assert ig.get_prices(market, Interval.HOUR, 10) is p
+    finally:
+        ig.allowance_planner = None
+
+
 def test_trade(ig, requests_mock):
     ig_request_trade(requests_mock)
     ig_request_confirm_trade(requests_mock)
@@ -163,6 +185,26 @@ def test_trade_fail(ig, requests_mock):
     assert result is False
 
 
+def test_submit_order(ig, requests_mock):
+    ig_request_trade(requests_mock, data={"dealReference": "REF"})
+    assert ig.submit_order("mock", TradeDirection.BUY, 0, 0) == "REF"
+    # The confirmation is not requested
+    assert requests_mock.request_history[-1].method == "POST"
+
+    ig_request_trade(requests_mock, fail=True)
+    assert ig.submit_order("mock", TradeDirection.BUY, 0, 0) is None
+
+
+def test_get_deal_confirmation(ig, requests_mock):
+    ig_request_confirm_trade(requests_mock)
+    confirmation = ig.get_deal_confirmation("123456789")
+    assert confirmation["reason"] == "SUCCESS"
+
+    ig_request_confirm_trade(requests_mock, fail=True)
+    with pytest.raises(RuntimeError):
+        ig.get_deal_confirmation("123456789")
+
+
 def test_confirm_order(ig, requests_mock):
     ig_request_confirm_trade(requests_mock)
     result = ig.confirm_order("123456789")
@@ -311,3 +353,18 @@ def test_get_watchlist_markets(ig, requests_mock):
     )
     data = ig.get_markets_from_watchlist("wrong_name")
     assert len(data) == 0
+
+
+def test_get_macd(ig, requests_mock):
+    ig_request_market_info(requests_mock)
+    ig_request_prices(requests_mock)
+    ig.indicators = IndicatorEngine()
+    market = ig.get_market_info("mock")
+    macd = ig.get_macd(market, Interval.DAY, 26)
+    prices = ig.get_prices(market, Interval.DAY, 26)
+    expected = Utils.macd_df_from_list(prices.close)
+    assert numpy.array_equal(macd.dates, prices.dates)
+    assert numpy.allclose(macd.hist, expected["Hist"], equal_nan=True)
+    # The same bars are not computed again
+    again = ig.get_macd(market, Interval.DAY, 26)
+    assert numpy.allclose(again.macd, macd.macd)
@@ -0,0 +1,66 @@
+import json
+
+import numpy
+import pytest
+
+from tradingbot.components.broker import IGPriceType, parse_ig_prices
+
+MOCK_PRICES = "test/test_data/ig/mock_historic_price.json"
+
+
+@pytest.fixture
+def payload():
+    with open(MOCK_PRICES, "rb") as f:
+        return f.read()
+
+
+def test_parse_ig_prices(payload):
+    prices = parse_ig_prices(payload)
+    raw = json.loads(payload)["prices"]
+    assert len(prices.dates) == len(raw)
+    assert prices.dates.dtype == numpy.dtype("datetime64[s]")
+    assert prices.dates[0] == numpy.datetime64(raw[0]["snapshotTimeUTC"])
+    for array in [prices.high, prices.low, prices.close, prices.volume]:
+        assert array.dtype == numpy.float64
+        assert len(array) == len(raw)
+    assert prices.high[0] == raw[0]["highPrice"]["bid"]
+    assert prices.low[-1] == raw[-1]["lowPrice"]["bid"]
+    assert prices.close[3] == raw[3]["closePrice"]["bid"]
+    assert prices.volume[5] == raw[5]["lastTradedVolume"]
+    assert prices.allowance["remainingAllowance"] == 9950
+
+
+def test_parse_ig_prices_price_type(payload):
+    raw = json.loads(payload)["prices"][0]["closePrice"]
+    ask = parse_ig_prices(payload, IGPriceType.ASK)
+    assert ask.close[0] == raw["ask"]
+    mid = parse_ig_prices(payload, IGPriceType.MID)
+    assert mid.close[0] == (raw["ask"] + raw["bid"]) / 2
+
+
+def test_parse_ig_prices_missing_values():
+    data = {
+        "prices": [
+            {
+                "snapshotTimeUTC": "2018-09-02T23:00:00",
+                "highPrice": {"bid": None, "ask": 10.0},
+                "lowPrice": {"bid": 1.0, "ask": None},
+                "closePrice": {"bid": 2.0, "ask": 4.0},
+                "lastTradedVolume": None,
+            }
+        ],
+        "allowance": {"remainingAllowance": 10, "allowanceExpiry": 10},
+    }
+    prices = parse_ig_prices(json.dumps(data).encode(), IGPriceType.MID)
+    assert numpy.isnan(prices.high[0])
+    assert numpy.isnan(prices.low[0])
+    assert prices.close[0] == 3.0
+    assert numpy.isnan(prices.volume[0])
+    assert prices.allowance["remainingAllowance"] == 10
+    # Already decoded json objects are accepted too
+    assert parse_ig_prices(data).low[0] == 1.0
+
+
+def test_parse_ig_prices_error():
+    with pytest.raises(RuntimeError):
+        parse_ig_prices(b'{"errorCode": "error.public-api.exceeded-account-allowance"}')
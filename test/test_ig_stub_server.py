@@ -0,0 +1,81 @@
+import pytest
+import toml
+
+from benchmarks.ig_stub_server import IGStubServer
+from tradingbot.components import Configuration, Interval, TradeDirection
+from tradingbot.components.broker import IGInterface, InterfaceNames
+from tradingbot.components.utils import SynchSingleton
+
+
+@pytest.fixture
+def server():
+    with IGStubServer(epics=250) as server:
+        yield server
+
+
+@pytest.fixture
+def ig(server, monkeypatch):
+    """
+    Returns a new IGInterface connected to the stub server, restoring the
+    IGInterface singleton used by the other tests afterwards
+    """
+    with open("test/test_data/trading_bot.toml", "r") as f:
+        config = toml.load(f)
+    config["stocks_interface"]["active"] = InterfaceNames.IG_INDEX.value
+    config["account_interface"]["active"] = InterfaceNames.IG_INDEX.value
+    config["stocks_interface"]["ig_interface"]["api_base_url"] = server.url
+    monkeypatch.delitem(SynchSingleton._instances, IGInterface, raising=False)
+    ig = IGInterface(Configuration(config))
+    monkeypatch.delitem(SynchSingleton._instances, IGInterface)
+    return ig
+
+
+def test_market_data(server, ig):
+    assert ig.api_base_url == server.url
+    assert ig.authenticated_headers["CST"] == "stub"
+    epic = server.epics[42]
+    market = ig.get_market_info(epic)
+    assert market.epic == epic
+    assert market.offer > market.bid
+    history = ig.get_prices(market, Interval.DAY, 30)
+    assert len(history.dataframe) == 30
+    # Synthetic prices are deterministic
+    assert ig.get_prices(market, Interval.DAY, 30).dataframe.equals(history.dataframe)
+    assert [m.epic for m in ig.search_market("SYN0004")] == server.epics[40:50]
+    assert ig.get_account_used_perc() == 0
+
+
+def test_navigation_and_watchlist(server, ig):
+    root = ig.navigate_market_node("")
+    assert len(root["nodes"]) == 3
+    node = ig.navigate_market_node(root["nodes"][2]["id"])
+    assert [m["epic"] for m in node["markets"]] == server.epics[200:]
+    markets = ig.get_markets_from_watchlist("trading_bot")
+    assert [m.epic for m in markets] == server.epics
+    assert ig.get_markets_from_watchlist("missing") == []
+
+
+def test_trading(server, ig):
+    epic = server.epics[0]
+    assert ig.trade(epic, TradeDirection.BUY, 110, 90)
+    positions = ig.get_open_positions()
+    assert [p.epic for p in positions] == [epic]
+    assert ig.get_account_used_perc() > 0
+    assert not ig.trade("UNKNOWN", TradeDirection.SELL, 90, 110)
+    assert ig.close_position(positions[0])
+    assert ig.get_open_positions() == []
+    assert server.requests["positions/otc"] == 3
+    assert server.requests["confirms"] == 3
+
+
+def test_injected_errors(server, ig):
+    market = ig.get_market_info(server.epics[0])
+    server.throttle_rate = 1.0
+    with pytest.raises(RuntimeError):
+        ig.get_prices(market, Interval.DAY, 10)
+    server.throttle_rate = 0.0
+    server.error_rate = 1.0
+    with pytest.raises(RuntimeError):
+        ig.get_market_info(server.epics[0])
+    # Authentication is never failed on purpose
+    assert ig.authenticate()
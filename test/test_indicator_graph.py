@@ -0,0 +1,98 @@
+import numpy
+import pytest
+
+from tradingbot.indicators import (
+    IndicatorGraph,
+    Node,
+    atr,
+    bollinger,
+    macd,
+    rolling_std,
+    vwap,
+)
+from tradingbot.interfaces import Market, MarketHistory
+
+
+def make_history(bars, epic="EPIC", seed=1):
+    rng = numpy.random.default_rng(seed)
+    close = 100 + rng.standard_normal(bars).cumsum()
+    dates = numpy.arange(bars) + numpy.datetime64("2020-01-01", "D")
+    return MarketHistory(
+        Market(epic=epic),
+        dates,
+        close + rng.random(bars),
+        close - rng.random(bars),
+        close,
+        rng.integers(1, 1000, bars),
+    )
+
+
+def test_shared_nodes():
+    graph = IndicatorGraph()
+    line, signal, _ = graph.request("macd")
+    variant = graph.request("macd", signal=5)
+    # close, the two EMAs and the MACD line are shared
+    assert len(graph.nodes) == 8
+    assert variant[0] is line
+    assert variant[1] != signal
+    assert graph.request("ema", span=26) is line.inputs[1]
+    assert graph.request("macd", fast=12, slow=26, signal=9)[0] is line
+    assert repr(line) == "subtract(ema(close, 12), ema(close, 26))"
+    graph.request("bollinger", window=20)
+    graph.request("bollinger", window=20, k=3)
+    assert len(graph.nodes) == 8 + 5 + 3
+    with pytest.raises(ValueError):
+        graph.request("unknown")
+    assert Node("sma", (Node("close"),), (20,)) in graph.nodes
+
+
+def test_values():
+    history = make_history(200)
+    high, low, close = history.high, history.low, history.close
+    graph = IndicatorGraph()
+    for result, expected in [
+        (graph.compute(history, "macd", fast=5), macd(close, 5)),
+        (graph.compute(history, "bollinger", window=10), bollinger(close, 10)),
+        (
+            graph.compute(history, "std", window=10, ddof=0),
+            (rolling_std(close, 10, 0),),
+        ),
+        (graph.compute(history, "atr"), (atr(high, low, close),)),
+        (
+            graph.compute(history, "vwap", period=5),
+            (vwap(high, low, close, history.volume, 5),),
+        ),
+    ]:
+        result = result if isinstance(result, tuple) else (result,)
+        for value, single in zip(result, expected):
+            assert numpy.allclose(value, single, equal_nan=True)
+            assert not value.flags.writeable
+
+
+def test_evaluated_once_per_bar():
+    history = make_history(100)
+    graph = IndicatorGraph()
+    first = graph.compute(history, "macd")
+    assert graph.evaluations == 5
+    graph.compute(history, "macd", signal=5)
+    assert graph.evaluations == 7
+    again = graph.compute(history, "macd")
+    graph.compute(history, "ema", span=26)
+    assert graph.evaluations == 7
+    assert all(a is b for a, b in zip(first, again))
+    # Shorter histories up to the same bar are cached alongside
+    graph.compute(history.latest(50), "macd")
+    assert graph.evaluations == 12
+    graph.compute(history, "macd")
+    assert graph.evaluations == 12
+    # Other markets have their own values
+    graph.compute(make_history(100, "OTHER", 2), "macd")
+    assert graph.evaluations == 17
+    # A new bar replaces the cached values of the market
+    graph.compute(make_history(101), "macd")
+    assert graph.evaluations == 22
+    graph.compute(history, "macd")
+    assert graph.evaluations == 27
+    graph.clear()
+    graph.compute(history, "macd")
+    assert graph.evaluations == 32
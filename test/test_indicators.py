@@ -0,0 +1,120 @@
+import numpy
+import pandas
+import pytest
+
+from tradingbot.components import Utils
+from tradingbot.indicators import ATR, EMA, MACD, SMA, VWAP, IndicatorEngine, RollingStd
+from tradingbot.interfaces import Market, MarketHistory
+
+
+def make_history(bars, epic="EPIC", seed=1):
+    rng = numpy.random.default_rng(seed)
+    close = 100 + rng.standard_normal(bars).cumsum()
+    dates = numpy.arange(bars) + numpy.datetime64("2020-01-01", "D")
+    return MarketHistory(
+        Market(epic=epic),
+        dates,
+        close + rng.random(bars),
+        close - rng.random(bars),
+        close,
+        rng.integers(1, 1000, bars),
+    )
+
+
+def feed(indicator, history):
+    return [
+        indicator.update(
+            history.high[i], history.low[i], history.close[i], history.volume[i]
+        )
+        for i in range(len(history))
+    ]
+
+
+def test_moving_averages_match_pandas():
+    history = make_history(300)
+    close = pandas.Series(history.close)
+    assert numpy.allclose(feed(EMA(26), history), close.ewm(span=26).mean())
+    expected = close.rolling(20).mean()
+    assert numpy.allclose(feed(SMA(20), history), expected, equal_nan=True)
+    expected = close.rolling(20).std()
+    assert numpy.allclose(feed(RollingStd(20), history), expected, equal_nan=True)
+    expected = close.rolling(20).std(ddof=0)
+    std = RollingStd(20, ddof=0)
+    assert numpy.allclose(feed(std, history), expected, equal_nan=True)
+
+
+def test_macd_matches_utils():
+    history = make_history(200)
+    expected = Utils.macd_df_from_list(history.close)
+    values = numpy.array(feed(MACD(), history))
+    assert numpy.allclose(values[:, 0], expected["MACD"])
+    assert numpy.allclose(values[:, 1], expected["Signal"], equal_nan=True)
+    assert numpy.allclose(values[:, 2], expected["Hist"], equal_nan=True)
+
+
+def test_atr_and_vwap():
+    history = make_history(100)
+    high, low, close = history.high, history.low, history.close
+    tr = numpy.maximum(
+        high[1:] - low[1:],
+        numpy.maximum(abs(high[1:] - close[:-1]), abs(low[1:] - close[:-1])),
+    )
+    tr = numpy.insert(tr, 0, high[0] - low[0])
+    atr = [tr[:14].mean()]
+    for value in tr[14:]:
+        atr.append((atr[-1] * 13 + value) / 14)
+    values = feed(ATR(14), history)
+    assert numpy.isnan(values[:13]).all()
+    assert numpy.allclose(values[13:], atr)
+
+    typical = (high + low + close) / 3
+    vwap = feed(VWAP(10), history)
+    expected = (typical * history.volume)[-10:].sum() / history.volume[-10:].sum()
+    assert vwap[-1] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "make", [lambda: EMA(12), lambda: RollingStd(5), MACD, ATR, lambda: VWAP(5)]
+)
+def test_replace_and_state(make):
+    history = make_history(60)
+    expected = feed(make(), history)
+    indicator = make()
+    feed(indicator, history.latest(60).between(end="2020-02-19"))
+    # The last bar is first seen in progress, then replaced by the final one
+    indicator.update(1.0, 1.0, 1.0, 1.0)
+    i = len(history) - 10
+    value = indicator.update(
+        history.high[i], history.low[i], history.close[i], history.volume[i], True
+    )
+    assert numpy.allclose(value, expected[i], equal_nan=True)
+    # The restored state carries on as the original indicator
+    restored = make()
+    restored.load_state(indicator.state())
+    for candidate in [indicator, restored]:
+        values = feed(candidate, history.latest(9))
+        assert numpy.allclose(values[-1], expected[-1], equal_nan=True)
+
+
+def test_engine(tmp_path):
+    history = make_history(100)
+    filepath = tmp_path / "indicators.json"
+    engine = IndicatorEngine(filepath, keep=50)
+    whole = IndicatorEngine(keep=50)
+    expected = whole.update(history, "DAY", "macd")
+    # Bars are fed as they come, with overlapping histories
+    engine.update(history.latest(100).between(end="2020-02-20"), "DAY", "macd")
+    engine.save()
+    engine = IndicatorEngine(filepath, keep=50)
+    assert engine.update(history.latest(60), "DAY", "macd") == pytest.approx(expected)
+    dates, values = engine.series(history.latest(5), "DAY", "macd")
+    assert len(dates) == len(values) == 50
+    assert dates[-1] == history.dates[-1]
+    assert numpy.allclose(values, whole.series(history, "DAY", "macd")[1])
+    # Parameters and markets have their own indicators
+    fast = engine.update(history, "DAY", "macd", fast=5)
+    assert fast != pytest.approx(expected)
+    other = make_history(100, "OTHER", seed=2)
+    assert engine.update(other, "DAY", "macd") != pytest.approx(expected)
+    with pytest.raises(ValueError):
+        engine.update(history, "DAY", "unknown")
@@ -0,0 +1,132 @@
+import numpy
+import pandas
+import pytest
+
+from tradingbot.indicators import (
+    ATR,
+    VWAP,
+    atr,
+    bollinger,
+    crossover,
+    ema,
+    macd,
+    rolling_std,
+    seeded_ema,
+    sma,
+    true_range,
+    vwap,
+)
+
+
+@pytest.fixture
+def bars():
+    rng = numpy.random.default_rng(7)
+    close = 1000 + rng.standard_normal(2000).cumsum()
+    high = close + rng.random(2000)
+    low = close - rng.random(2000)
+    volume = rng.integers(1, 1000, 2000).astype(float)
+    return high, low, close, volume
+
+
+@pytest.mark.parametrize("span", [1, 2, 12, 26, 200])
+def test_ema(bars, span):
+    close = bars[2]
+    expected = pandas.Series(close).ewm(span=span).mean()
+    assert numpy.allclose(ema(close, span), expected)
+    # Leading NaN values are skipped as pandas does
+    padded = numpy.concatenate([numpy.full(5, numpy.nan), close[:100]])
+    expected = pandas.Series(padded).ewm(span=span).mean()
+    assert numpy.allclose(ema(padded, span), expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [1, 5, 20, 500])
+def test_sma_and_std(bars, window):
+    close = pandas.Series(bars[2])
+    rolling = close.rolling(window)
+    assert numpy.allclose(sma(close, window), rolling.mean(), equal_nan=True)
+    for ddof in [0, 1]:
+        expected = rolling.std(ddof=ddof)
+        result = rolling_std(close, window, ddof)
+        assert numpy.allclose(result, expected, equal_nan=True)
+
+
+def test_short_series():
+    assert numpy.isnan(sma([1.0, 2.0], 5)).all()
+    assert numpy.isnan(rolling_std([1.0, 2.0], 5)).all()
+    assert ema([], 5).shape == (0,)
+    assert seeded_ema([], 5).shape == (0,)
+    with pytest.raises(ValueError):
+        sma([1.0, 2.0], 0)
+
+
+def test_seeded_ema(bars):
+    close = numpy.concatenate([[numpy.nan] * 3, bars[2][:300]])
+    # Reference loop of the AlphaVantage definition
+    expected = numpy.full(len(close), numpy.nan)
+    expected[12] = close[3:13].mean()
+    for i in range(13, len(close)):
+        expected[i] = expected[i - 1] + 2 / 11 * (close[i] - expected[i - 1])
+    assert numpy.allclose(seeded_ema(close, 10), expected, equal_nan=True)
+
+
+def test_macd(bars):
+    close = pandas.Series(bars[2])
+    line = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+    signal = line.rolling(9).mean()
+    result = macd(close.values)
+    assert numpy.allclose(result[0], line)
+    assert numpy.allclose(result[1], signal, equal_nan=True)
+    assert numpy.allclose(result[2], line - signal, equal_nan=True)
+
+
+def test_bollinger(bars):
+    close = pandas.Series(bars[2])
+    ma = close.rolling(20).mean()
+    std = close.rolling(20).std()
+    average, upper, lower = bollinger(close.values, 20)
+    assert numpy.allclose(average, ma, equal_nan=True)
+    assert numpy.allclose(upper, ma + std * 2, equal_nan=True)
+    assert numpy.allclose(lower, ma - std * 2, equal_nan=True)
+
+
+def test_true_range_and_atr(bars):
+    high, low, close, volume = bars
+    frame = pandas.DataFrame({"high": high, "low": low, "close": close})
+    previous = frame["close"].shift()
+    expected = pandas.concat(
+        [
+            frame["high"] - frame["low"],
+            (frame["high"] - previous).abs(),
+            (frame["low"] - previous).abs(),
+        ],
+        axis=1,
+    ).max(axis=1)
+    assert numpy.allclose(true_range(high, low, close), expected)
+    indicator = ATR(14)
+    values = [indicator.update(*bar) for bar in zip(high, low, close, volume)]
+    assert numpy.allclose(atr(high, low, close, 14), values, equal_nan=True)
+
+
+def test_vwap(bars):
+    high, low, close, volume = bars
+    indicator = VWAP(30)
+    values = [indicator.update(*bar) for bar in zip(high, low, close, volume)]
+    assert numpy.allclose(vwap(high, low, close, volume, 30), values)
+    assert numpy.isnan(vwap([1.0], [1.0], [1.0], [0.0], 5)).all()
+
+
+def test_crossover():
+    first = numpy.array([1.0, 2.0, 3.0, 3.0, 1.0, numpy.nan, 3.0, 1.0])
+    second = numpy.full(len(first), 2.0)
+    assert crossover(first, second).tolist() == [0, 0, 1, 0, -1, 0, 0, -1]
+    assert crossover(first, 2.0).tolist() == [0, 0, 1, 0, -1, 0, 0, -1]
+
+
+def test_along_last_axis(bars):
+    close = numpy.stack([bars[2][:500], bars[2][500:1000]])
+    for kernel in [ema, sma, rolling_std, seeded_ema]:
+        result = kernel(close, 20)
+        assert result.shape == close.shape
+        for row in range(2):
+            expected = kernel(close[row], 20)
+            assert numpy.allclose(result[row], expected, equal_nan=True)
@@ -0,0 +1,82 @@
+import asyncio
+
+from tradingbot.components import TradeDirection
+from tradingbot.components.broker import KillSwitch
+from tradingbot.interfaces import Position
+
+
+def make_position(deal_id):
+    return Position(
+        deal_id=deal_id,
+        size=1,
+        create_date="",
+        direction=TradeDirection.BUY,
+        level=1,
+        limit=1,
+        stop=1,
+        currency="GBP",
+        epic="EPIC_{}".format(deal_id),
+        market_id=deal_id,
+    )
+
+
+class MockAccountInterface:
+    """Each close takes 0.1 seconds, positions in "stuck" are never closed"""
+
+    def __init__(self, deal_ids, stuck=(), fail_first=()):
+        self.open = {d: make_position(d) for d in deal_ids}
+        self.stuck = set(stuck)
+        self.fail_first = set(fail_first)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_open_positions(self):
+        return list(self.open.values())
+
+    async def submit_close(self, position):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.1)
+        self.in_flight -= 1
+        if position.deal_id in self.fail_first:
+            self.fail_first.remove(position.deal_id)
+            return None
+        if position.deal_id not in self.stuck:
+            self.open.pop(position.deal_id, None)
+        return "REF_{}".format(position.deal_id)
+
+
+def make_kill_switch(ifc, parallel=10):
+    return KillSwitch(ifc, parallel, max_retries=3, poll_interval=0.01, timeout=0.05)
+
+
+def test_closes_are_concurrent():
+    ifc = MockAccountInterface([str(i) for i in range(10)])
+    report = asyncio.run(make_kill_switch(ifc).run())
+    assert report.success()
+    assert len(report.closed) == 10
+    assert ifc.max_in_flight == 10
+    # Proportional to the slowest close, not to the sum of them
+    assert report.elapsed < 0.5
+
+
+def test_bounded_parallelism():
+    ifc = MockAccountInterface([str(i) for i in range(6)])
+    report = asyncio.run(make_kill_switch(ifc, parallel=2).run())
+    assert report.success()
+    assert ifc.max_in_flight == 2
+
+
+def test_retries_and_still_open_report():
+    ifc = MockAccountInterface(["A", "B", "C"], stuck=["C"], fail_first=["B"])
+    report = asyncio.run(make_kill_switch(ifc).run())
+    assert not report.success()
+    assert [p.deal_id for p in report.still_open] == ["C"]
+    assert sorted(p.deal_id for p in report.closed) == ["A", "B"]
+    assert report.attempts == {"A": 1, "B": 2, "C": 3}
+
+
+def test_no_positions():
+    report = asyncio.run(make_kill_switch(MockAccountInterface([])).run())
+    assert report.success()
+    assert report.closed == []
@@ -0,0 +1,45 @@
+import copy
+import pickle
+
+import pytest
+
+from tradingbot.components import TradeDirection
+from tradingbot.interfaces import Market, Position
+
+
+def test_market_slots():
+    market = Market()
+    assert market.epic == "unknown"
+    assert market.bid == 0.0
+    assert not hasattr(market, "__dict__")
+    with pytest.raises(AttributeError):
+        market.spread = 1.0
+
+
+def test_market_replace():
+    market = Market(epic="EPIC", id="ID", bid=1.0, offer=2.0)
+    moved = market.replace(bid=3.0, offer=4.0)
+    assert (moved.epic, moved.id, moved.bid, moved.offer) == ("EPIC", "ID", 3.0, 4.0)
+    assert (market.bid, market.offer) == (1.0, 2.0)
+    assert copy.copy(market).to_dict() == market.to_dict()
+    assert pickle.loads(pickle.dumps(market)).to_dict() == market.to_dict()
+
+
+def test_position_slots():
+    position = Position(
+        deal_id="123",
+        size=1,
+        create_date="2020-01-01T00:00:00",
+        direction=TradeDirection.BUY,
+        level=100.0,
+        limit=110.0,
+        stop=90.0,
+        currency="GBP",
+        epic="EPIC",
+        market_id="ID",
+    )
+    assert not hasattr(position, "__dict__")
+    assert position.to_dict()["direction"] is TradeDirection.BUY
+    assert Position(**position.to_dict()).to_dict() == position.to_dict()
+    closer = position.replace(stop=95.0)
+    assert (closer.stop, closer.deal_id, position.stop) == (95.0, "123", 90.0)
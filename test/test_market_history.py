@@ -0,0 +1,90 @@
+import numpy
+
+from tradingbot.interfaces import Market, MarketHistory, MarketMACD
+
+
+def test_market_history_columns():
+    high = numpy.array([3.0, 4.0, 5.0])
+    history = MarketHistory(
+        Market(),
+        ["2020-01-01", "2020-01-02", "2020-01-03"],
+        high,
+        [1, 2, 3],
+        [2.0, 3.0, 4.0],
+        numpy.array([10, 20, 30]),
+    )
+    assert len(history) == 3
+    # float64 arrays are not copied
+    assert history.high is high
+    assert history.low.dtype == numpy.float64
+    assert history.volume.dtype == numpy.float64
+    assert history.dates.dtype.kind == "M"
+    assert history.dates[0] == numpy.datetime64("2020-01-01")
+    assert all(c.flags["C_CONTIGUOUS"] for c in [history.high, history.low])
+
+
+def test_market_history_lazy_dataframe():
+    close = numpy.arange(5, dtype=numpy.float64)
+    history = MarketHistory(Market(), numpy.arange(5), close, close, close, close)
+    assert history._dataframe is None
+    df = history.dataframe
+    assert history.dataframe is df
+    assert list(df.columns) == ["date", "high", "low", "close", "volume"]
+    assert df[MarketHistory.CLOSE_COLUMN].tolist() == close.tolist()
+    # Positional indexes are kept as they are
+    assert df[MarketHistory.DATE_COLUMN].tolist() == list(range(5))
+
+
+def test_reversed_columns_are_contiguous():
+    values = numpy.arange(4, dtype=numpy.float64)
+    history = MarketHistory(
+        Market(), numpy.arange(4), values[::-1], values, values, values
+    )
+    assert history.high.flags["C_CONTIGUOUS"]
+    assert history.high.tolist() == [3.0, 2.0, 1.0, 0.0]
+
+
+def test_market_macd():
+    macd = MarketMACD(Market(), list(range(3)), [1, 2, 3], [0, 0, 0], [1, 2, 3])
+    assert len(macd) == 3
+    assert macd.hist.tolist() == [1.0, 2.0, 3.0]
+    assert macd._dataframe is None
+    assert list(macd.dataframe.columns) == ["Date", "MACD", "Signal", "Hist"]
+    assert macd.dataframe[MarketMACD.HIST_COLUMN].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_rows_are_chronological():
+    dates = ["2020-01-03", "2020-01-02", "2020-01-01"]
+    history = MarketHistory(Market(), dates, [3, 2, 1], [3, 2, 1], [3, 2, 1], [3, 2, 1])
+    assert history.dates[0] == numpy.datetime64("2020-01-01")
+    assert history.close.tolist() == [1.0, 2.0, 3.0]
+    assert history.dataframe[MarketHistory.CLOSE_COLUMN].iloc[-1] == 3.0
+    macd = MarketMACD(Market(), [2, 1, 0], [3, 2, 1], [0, 0, 0], [3, 2, 1])
+    assert macd.hist.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_latest_and_between_are_views():
+    dates = numpy.arange("2020-01-01", "2020-01-11", dtype="datetime64[D]")
+    close = numpy.arange(10, dtype=numpy.float64)
+    history = MarketHistory(Market(), dates, close, close, close, close)
+    latest = history.latest(3)
+    assert latest.close.tolist() == [7.0, 8.0, 9.0]
+    assert numpy.shares_memory(latest.close, history.close)
+    assert latest.close.flags["C_CONTIGUOUS"]
+    assert len(history.latest(20)) == 10
+    assert len(history.latest(0)) == 0
+    assert history.latest(2).dataframe[MarketHistory.CLOSE_COLUMN].tolist() == [
+        8.0,
+        9.0,
+    ]
+    # Both the ends are included
+    window = history.between("2020-01-03", "2020-01-05")
+    assert window.close.tolist() == [2.0, 3.0, 4.0]
+    assert numpy.shares_memory(window.high, history.high)
+    assert history.between(end="2020-01-02").close.tolist() == [0.0, 1.0]
+    assert history.between(start="2020-01-09 12:00").close.tolist() == [9.0]
+    assert len(history.between("2020-02-01")) == 0
+    assert len(history.between("2020-01-05", "2020-01-03")) == 0
+    macd = MarketMACD(Market(), numpy.arange(5), close[:5], close[:5], close[:5])
+    assert macd.latest(2).hist.tolist() == [3.0, 4.0]
+    assert macd.between(1, 2).hist.tolist() == [1.0, 2.0]
@@ -0,0 +1,51 @@
+import numpy
+import pytest
+
+from tradingbot.interfaces import Market, MarketSnapshotTable
+
+
+def make_market(i):
+    return Market(
+        epic="EPIC{}".format(i),
+        id="ID{}".format(i),
+        name="Market {}".format(i),
+        bid=100.0 + i,
+        offer=101.0 + i,
+        high=110.0 + i,
+        low=90.0 + i,
+        stop_distance_min=i / 10,
+        expiry="DFB",
+    )
+
+
+def test_from_markets_and_back():
+    markets = [make_market(i) for i in range(5)]
+    table = MarketSnapshotTable.from_markets(markets)
+    assert len(table) == 5
+    assert table.epics == [m.epic for m in markets]
+    assert table.bid.tolist() == [m.bid for m in markets]
+    assert table.stop_distance_min.dtype == numpy.float64
+    assert numpy.allclose(table.spread(), 1.0)
+    assert table.mid()[2] == 102.5
+    assert [m.to_dict() for m in table.to_markets()] == [m.to_dict() for m in markets]
+    assert table.market("EPIC3").to_dict() == markets[3].to_dict()
+    assert "EPIC3" in table
+    assert "OTHER" not in table
+    with pytest.raises(KeyError):
+        table.market("OTHER")
+
+
+def test_update_and_grow():
+    table = MarketSnapshotTable(capacity=2)
+    for i in range(10):
+        assert table.update(make_market(i)) == i
+    assert len(table) == 10
+    assert table.low.tolist() == [90.0 + i for i in range(10)]
+    # A new snapshot of a stored market replaces its row
+    assert table.update(make_market(4).replace(bid=1.0, name="Renamed")) == 4
+    assert len(table) == 10
+    assert table.bid[4] == 1.0
+    assert table.market("EPIC4").name == "Renamed"
+    assert table.row("EPIC4") == 4
+    # Columns are views of the stored rows
+    assert table.offer.base is table.high.base
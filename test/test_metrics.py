@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+import requests
+
+from benchmarks.ig_stub_server import IGStubServer
+from tradingbot.components.broker import (
+    BrokerMetrics,
+    Histogram,
+    HttpTransport,
+    SingleFlight,
+)
+
+
+def test_histogram():
+    histogram = Histogram()
+    assert histogram.percentile(50) == 0
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+    assert histogram.count == 100
+    assert histogram.mean() == pytest.approx(0.0505)
+    assert histogram.max == 0.1
+    # Upper bounds of the buckets containing the percentiles
+    assert histogram.percentile(50) == pytest.approx(0.064)
+    assert histogram.percentile(10) == pytest.approx(0.016)
+    assert histogram.percentile(100) == 0.1
+    histogram.observe(1000)
+    assert histogram.percentile(100) == 1000
+
+
+def test_http_endpoint():
+    name = BrokerMetrics.http_endpoint(
+        "GET", "https://demo-api.ig.com/gateway/deal/prices/KA.D.VOD.DAILY.IP/DAY/30"
+    )
+    assert name == "GET demo-api.ig.com/gateway/deal/prices/*/*/*"
+    name = BrokerMetrics.http_endpoint(
+        "POST", "https://demo-api.ig.com/gateway/deal/positions/otc"
+    )
+    assert name == "POST demo-api.ig.com/gateway/deal/positions/otc"
+
+
+def test_broker_metrics():
+    metrics = BrokerMetrics()
+    assert metrics.get("endpoint") is None
+    metrics.observe("endpoint", 0.01, bytes_sent=10, bytes_received=100)
+    metrics.observe("endpoint", 0.03, error=True)
+    metrics.add_retry("endpoint")
+    metrics.add_coalesced("endpoint")
+    metrics.add_rate_limit_wait("endpoint", 0.5)
+    m = metrics.get("endpoint")
+    assert m["calls"] == 2
+    assert m["errors"] == 1
+    assert m["max"] == 0.03
+    assert m["bytes_sent"] == 10
+    assert m["bytes_received"] == 100
+    assert m["retries"] == 1
+    assert m["coalesced"] == 1
+    assert m["rate_limit_wait"] == 0.5
+    assert list(metrics.snapshot()) == ["endpoint"]
+    assert "endpoint" in metrics.report()
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_transport_metrics():
+    with IGStubServer(epics=5) as server:
+        transport = HttpTransport(2)
+        transport.get("{}/markets/{}".format(server.url, server.epics[0]))
+        transport.get("{}/markets/UNKNOWN".format(server.url))
+        transport.post("{}/positions/otc".format(server.url), data="{}")
+        host = server.url.split("/")[2]
+    # Nothing listens on port 1
+    with pytest.raises(requests.ConnectionError):
+        transport.get("http://127.0.0.1:1/gateway/deal/accounts")
+    snapshot = transport.metrics.snapshot()
+    markets = snapshot["GET {}/gateway/deal/markets/*".format(host)]
+    assert markets["calls"] == 2
+    assert markets["errors"] == 1
+    assert markets["bytes_received"] > 0
+    otc = snapshot["POST {}/gateway/deal/positions/otc".format(host)]
+    assert otc["bytes_sent"] == 2
+    assert snapshot["GET 127.0.0.1:1/gateway/deal/accounts"]["errors"] == 1
+    transport.close()
+
+
+def test_single_flight_metrics():
+    metrics = BrokerMetrics()
+    single_flight = SingleFlight(metrics)
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def fail():
+        raise RuntimeError("failure")
+
+    async def run():
+        await asyncio.gather(*[single_flight.do("op", 1, call) for _ in range(3)])
+        with pytest.raises(RuntimeError):
+            await single_flight.do("fail", 1, fail)
+
+    asyncio.run(run())
+    assert metrics.get("Broker.op")["calls"] == 1
+    assert metrics.get("Broker.op")["coalesced"] == 2
+    assert metrics.get("Broker.fail")["errors"] == 1
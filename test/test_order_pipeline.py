@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from tradingbot.components import TradeDirection
+from tradingbot.components.broker import OrderPipeline, PositionBook
+from tradingbot.interfaces import Position
+
+
+class MockAccountInterface:
+    """Deals are confirmed after a delay, in reverse order of submission"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.submitted = []
+        self.polls = 0
+
+    async def submit_order(self, epic, direction, limit, stop):
+        if epic == "FAIL":
+            return None
+        self.submitted.append(epic)
+        return "REF_{}".format(epic)
+
+    async def get_deal_confirmation(self, deal_ref):
+        self.polls += 1
+        epic = deal_ref[4:]
+        await asyncio.sleep(self.delays.get(epic, 0))
+        if epic == "MISSING":
+            raise RuntimeError("error.confirms.deal-not-found")
+        reason = "REJECTED" if epic == "REJECT" else "SUCCESS"
+        return {"dealId": "ID_{}".format(epic), "reason": reason}
+
+
+@pytest.fixture
+def position_book():
+    return PositionBook()
+
+
+def make_pipeline(ifc, book, timeout=5):
+    pipeline = OrderPipeline(ifc, poll_interval=0.01, timeout=timeout)
+    pipeline.add_listener(book.on_deal_result)
+    return pipeline
+
+
+def test_deals_are_submitted_without_waiting_confirmation(position_book):
+    ifc = MockAccountInterface({"A": 0.2, "B": 0.2, "C": 0.2})
+    pipeline = make_pipeline(ifc, position_book)
+
+    async def run():
+        refs = [
+            await pipeline.submit(epic, TradeDirection.BUY, 1, 1)
+            for epic in ["A", "B", "C"]
+        ]
+        # All the deals are out, none confirmed yet
+        assert ifc.submitted == ["A", "B", "C"]
+        assert set(pipeline.pending.keys()) == set(refs)
+        assert pipeline.is_pending("A")
+        return await pipeline.join()
+
+    loop = asyncio.new_event_loop()
+    start = loop.time()
+    results = loop.run_until_complete(run())
+    elapsed = loop.time() - start
+    loop.close()
+    # Confirmations are resolved concurrently
+    assert elapsed < 0.5
+    assert len(results) == 3
+    assert all(r.accepted for r in results)
+    assert pipeline.pending == {}
+    assert not pipeline.is_pending("A")
+    assert len(pipeline.latencies) == 3
+    assert all(latency >= 0.2 for latency in pipeline.latencies)
+    assert position_book.has_position("A")
+    assert position_book.has_deal("B")
+
+
+def test_rejected_and_failed_deals(position_book):
+    ifc = MockAccountInterface({})
+    pipeline = make_pipeline(ifc, position_book)
+
+    async def run():
+        assert await pipeline.submit("FAIL", TradeDirection.BUY, 1, 1) is None
+        await pipeline.submit("REJECT", TradeDirection.SELL, 1, 1)
+        return await pipeline.join()
+
+    results = asyncio.run(run())
+    assert len(results) == 1
+    assert not results[0].accepted
+    assert results[0].reason == "REJECTED"
+    assert not position_book.has_position("REJECT")
+
+
+def test_confirmation_timeout(position_book):
+    ifc = MockAccountInterface({})
+    pipeline = make_pipeline(ifc, position_book, timeout=0.05)
+
+    async def run():
+        await pipeline.submit("MISSING", TradeDirection.BUY, 1, 1)
+        return await pipeline.join()
+
+    results = asyncio.run(run())
+    assert results[0].reason == "CONFIRMATION_TIMEOUT"
+    # The confirmation is polled until the timeout
+    assert ifc.polls > 1
+
+
+def test_position_book_snapshot():
+    now = [0.0]
+    book = PositionBook(clock=lambda: now[0])
+    pipeline = make_pipeline(MockAccountInterface({}), book)
+
+    async def run():
+        await pipeline.submit("A", TradeDirection.BUY, 1, 1)
+        await pipeline.join()
+
+    now[0] = 10
+    asyncio.run(run())
+    assert book.has_deal("A")
+    # A snapshot requested before the confirmation does not include the deal
+    book.update([], requested_at=5)
+    assert book.has_deal("A")
+    position = Position(
+        deal_id="ID_A",
+        size=1,
+        create_date="",
+        direction=TradeDirection.BUY,
+        level=1,
+        limit=1,
+        stop=1,
+        currency="GBP",
+        epic="A",
+        market_id="A",
+    )
+    book.update([position], requested_at=11)
+    assert not book.has_deal("A")
+    assert book.has_position("A")
+    assert book.positions() == [position]
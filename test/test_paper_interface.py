@@ -0,0 +1,139 @@
+import copy
+
+import pytest
+import toml
+
+from benchmarks.ig_stub_server import IGStubServer
+from tradingbot.components import Configuration, TradeDirection
+from tradingbot.components.broker import (
+    AsyncPaperInterface,
+    Broker,
+    BrokerFactory,
+    IGInterface,
+    InterfaceNames,
+    PaperInterface,
+)
+from tradingbot.components.utils import SynchSingleton
+
+
+@pytest.fixture
+def server():
+    with IGStubServer(epics=10) as server:
+        yield server
+
+
+@pytest.fixture
+def config(server, tmp_path):
+    with open("test/test_data/trading_bot.toml", "r") as f:
+        config = toml.load(f)
+    config["paper_trading"] = True
+    config["stocks_interface"]["active"] = InterfaceNames.IG_INDEX.value
+    config["stocks_interface"]["ig_interface"]["api_base_url"] = server.url
+    config["paper_account"]["state_filepath"] = str(tmp_path / "paper.json")
+    return Configuration(config)
+
+
+@pytest.fixture
+def make_paper(config, monkeypatch):
+    """
+    Returns a function creating a new PaperInterface on top of the stub
+    server, restoring the interface singletons used by the other tests
+    """
+
+    def make():
+        for cls in [IGInterface, PaperInterface]:
+            monkeypatch.delitem(SynchSingleton._instances, cls, raising=False)
+        return PaperInterface(config)
+
+    yield make
+    for cls in [IGInterface, PaperInterface]:
+        monkeypatch.delitem(SynchSingleton._instances, cls, raising=False)
+
+
+def test_trade_and_close(server, make_paper):
+    paper = make_paper()
+    epic = server.epics[1]
+    market = paper.get_market_info(epic)
+    assert paper.trade(epic, TradeDirection.BUY, market.offer * 2, market.bid / 2)
+    positions = paper.get_open_positions()
+    assert len(positions) == 1
+    assert positions[0].level == market.offer
+    assert paper.get_positions_map() == {"{}-BUY".format(epic): 1}
+    assert paper.get_account_balances() == (10000.0, pytest.approx(market.offer * 0.2))
+    assert paper.get_account_used_perc() > 0
+    assert paper.close_position(positions[0])
+    assert paper.get_open_positions() == []
+    # The spread is lost buying at the offer and selling at the bid
+    balance, deposit = paper.get_account_balances()
+    assert balance == pytest.approx(10000.0 + market.bid - market.offer)
+    assert deposit == 0
+    assert not paper.close_position(positions[0])
+    assert not paper.trade("UNKNOWN", TradeDirection.SELL, 1, 2)
+    # No account request reaches the API
+    assert server.requests["positions"] == 0
+    assert server.requests["positions/otc"] == 0
+    assert server.requests["accounts"] == 0
+
+
+def test_stops_and_limits(server, make_paper):
+    paper = make_paper()
+    epic = server.epics[2]
+    market = paper.get_market_info(epic)
+    paper.trade(epic, TradeDirection.BUY, market.offer + 10, market.bid - 10)
+    paper.trade(epic, TradeDirection.SELL, market.bid - 5, market.offer + 20)
+    moved = copy.copy(market)
+    moved.bid = market.bid - 12
+    moved.offer = market.offer - 12
+    paper.update_market(moved)
+    # The stop of the buy position and the limit of the sell one are hit
+    assert paper.get_open_positions() == []
+    balance, _ = paper.get_account_balances()
+    expected = (
+        10000.0 + (market.bid - 10 - market.offer) + (market.bid - market.bid + 5)
+    )
+    assert balance == pytest.approx(expected)
+
+
+def test_close_all_positions(server, make_paper):
+    paper = make_paper()
+    for epic in server.epics[:3]:
+        assert paper.trade(epic, TradeDirection.SELL, 1, 100000)
+    assert len(paper.get_open_positions()) == 3
+    assert paper.close_all_positions()
+    assert paper.get_open_positions() == []
+
+
+def test_persistence(server, make_paper):
+    paper = make_paper()
+    epic = server.epics[3]
+    paper.trade(epic, TradeDirection.BUY, 100000, 1)
+    paper.close_position(paper.get_open_positions()[0])
+    paper.trade(epic, TradeDirection.SELL, 1, 100000)
+    balance = paper.get_account_balances()[0]
+    restored = make_paper()
+    assert restored is not paper
+    assert restored.get_account_balances()[0] == balance
+    positions = restored.get_open_positions()
+    assert len(positions) == 1
+    assert positions[0].direction is TradeDirection.SELL
+    assert positions[0].epic == epic
+    # New deals do not reuse the restored deal ids
+    restored.trade(epic, TradeDirection.SELL, 1, 100000)
+    deal_ids = [p.deal_id for p in restored.get_open_positions()]
+    assert len(set(deal_ids)) == 2
+
+
+def test_broker_uses_paper_account(server, config, make_paper):
+    paper = make_paper()
+    factory = BrokerFactory(config)
+    assert factory.make_account_interface_from_config() is paper
+    assert isinstance(
+        factory.make_async_account_interface_from_config(), AsyncPaperInterface
+    )
+    broker = Broker(factory)
+    epic = server.epics[4]
+    assert broker.submit_trade(epic, TradeDirection.BUY, 100000, 1) is not None
+    broker.wait_for_confirmations()
+    assert [p.epic for p in broker.get_open_positions()] == [epic]
+    assert broker.close_all_positions()
+    assert broker.get_open_positions() == []
@@ -0,0 +1,91 @@
+import numpy
+import pandas
+import pytest
+
+from tradingbot.components.broker import (
+    EncodedColumn,
+    EncodedPrices,
+    HistoryCache,
+    PriceEncoding,
+)
+
+
+def make_prices(periods, freq="min"):
+    index = pandas.bdate_range("2020-01-01", periods=periods, freq=freq)
+    rng = numpy.random.default_rng(1)
+    close = numpy.round(100 + rng.standard_normal(periods).cumsum(), 2)
+    return pandas.DataFrame(
+        {
+            "High": numpy.round(close + 0.25, 2),
+            "Low": numpy.round(close - 0.5, 2),
+            "Close": close,
+            "Volume": rng.integers(0, 10**6, periods),
+        },
+        index=index,
+    )
+
+
+def test_ticks_are_exact():
+    frame = make_prices(1000)
+    # Remove a bar and add a weekend gap
+    frame = frame.drop(frame.index[10])
+    frame.index = frame.index.where(
+        frame.index < frame.index[500], frame.index + pandas.Timedelta(days=2)
+    )
+    encoded = EncodedPrices(frame, PriceEncoding.TICKS)
+    decoded = encoded.decode()
+    assert len(encoded) == len(frame)
+    assert decoded.index.equals(frame.index)
+    assert list(decoded.columns) == list(frame.columns)
+    assert all(decoded.dtypes == numpy.float64)
+    assert numpy.array_equal(decoded.values, frame.values.astype(numpy.float64))
+    assert encoded.last_date() == frame.index[-1]
+    # 4 bytes per date delta and price, instead of 8 for each value and date
+    assert encoded.nbytes < frame.memory_usage(deep=True).sum() / 2
+    tail = encoded.decode(len(frame) - 3)
+    assert tail.equals(decoded.iloc[-3:])
+
+
+def test_float32():
+    frame = make_prices(100)
+    frame["Close"] = frame["Close"] / 3
+    encoded = EncodedPrices(frame, PriceEncoding.FLOAT32)
+    decoded = encoded.decode()
+    assert numpy.allclose(decoded["Close"], frame["Close"], rtol=1e-6)
+    # Volumes are whole numbers and kept as integers
+    assert numpy.array_equal(decoded["Volume"], frame["Volume"])
+
+
+def test_columns():
+    values = numpy.array([1.5, numpy.nan, 2.25, 3e9])
+    column = EncodedColumn(values, PriceEncoding.TICKS)
+    assert column.decimals == 2
+    assert column.data.dtype == numpy.int64
+    assert numpy.array_equal(column.decode(), values, equal_nan=True)
+    # Too many decimals for the ticks
+    values = numpy.array([1 / 3, 2.0])
+    column = EncodedColumn(values, PriceEncoding.TICKS)
+    assert column.decimals is None
+    assert numpy.array_equal(column.decode(), values)
+    column = EncodedColumn(numpy.array([1.0, 2.0]), PriceEncoding.FLOAT64)
+    assert column.data.dtype == numpy.float64
+    empty = EncodedPrices(make_prices(0), PriceEncoding.TICKS)
+    assert len(empty.decode()) == 0
+    assert empty.last_date() is None
+
+
+@pytest.mark.parametrize("encoding", [PriceEncoding.TICKS, PriceEncoding.FLOAT32])
+def test_encoded_history_cache(encoding):
+    columns = ["High", "Low", "Close", "Volume"]
+    plain = HistoryCache(max_rows=500, columns=columns)
+    cache = HistoryCache(max_rows=500, columns=columns, encoding=encoding)
+    frame = make_prices(600, freq="D")
+    for c in [plain, cache]:
+        c.merge("key", frame.iloc[:400], None)
+        c.merge("key", frame.iloc[399:], frame.index[399])
+    assert cache.last_date("key") == plain.last_date("key")
+    assert cache.covers("key", frame.index[100])
+    assert numpy.allclose(cache.get("key"), plain.get("key"))
+    expected = plain.history("key", None, 300).close
+    assert numpy.allclose(cache.history("key", None, 300).close, expected)
+    assert numpy.allclose(cache.history("key", None, 10).close, expected[-10:])
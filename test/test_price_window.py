@@ -0,0 +1,69 @@
+import numpy
+import pytest
+
+from tradingbot.interfaces import Market, MarketHistory, PriceWindow
+
+
+def bars(start, periods):
+    dates = numpy.arange(periods) + numpy.datetime64(start, "D")
+    values = numpy.arange(periods, dtype=numpy.float64)
+    return dates, values, values - 1, values, values * 10
+
+
+def test_empty_window():
+    window = PriceWindow(4)
+    assert len(window) == 0
+    assert window.last_date() is None
+    history = window.history(Market())
+    assert isinstance(history, MarketHistory)
+    assert len(history) == 0
+    with pytest.raises(ValueError):
+        PriceWindow(0)
+
+
+def test_append_wraps_around():
+    window = PriceWindow(4)
+    window.extend(*bars("2020-01-01", 3))
+    assert window.history(Market()).close.tolist() == [0.0, 1.0, 2.0]
+    window.extend(*bars("2020-01-04", 3))
+    assert len(window) == 4
+    history = window.history(Market())
+    # The columns restart from 0 in the second batch of bars
+    assert history.close.tolist() == [2.0, 0.0, 1.0, 2.0]
+    assert history.dates[0] == numpy.datetime64("2020-01-03")
+    assert history.dates[-1] == numpy.datetime64("2020-01-06")
+    assert history.volume.tolist() == [20.0, 0.0, 10.0, 20.0]
+    assert window.history(Market(), 2).low.tolist() == [0.0, 1.0]
+    assert len(window.history(Market(), 10)) == 4
+    assert window.last_date() == numpy.datetime64("2020-01-06")
+
+
+def test_views_are_not_copied():
+    window = PriceWindow(8)
+    window.extend(*bars("2020-01-01", 20))
+    first = window.history(Market(), 3)
+    assert all(
+        c.flags["C_CONTIGUOUS"] and c.dtype == numpy.float64
+        for c in [first.high, first.low, first.close, first.volume]
+    )
+    window.append("2020-01-21", 1.0, 1.0, 100.0, 1.0)
+    second = window.history(Market(), 3)
+    # Both the views share the buffer of the window
+    assert first.close.base is second.close.base
+    # The older view is still valid after an append
+    assert first.close.tolist() == [17.0, 18.0, 19.0]
+    assert second.close.tolist() == [18.0, 19.0, 100.0]
+
+
+def test_append_same_date_replaces_last_bar():
+    window = PriceWindow(3)
+    window.append("2020-01-01", 1.0, 1.0, 1.0, 1.0)
+    window.append("2020-01-02", 2.0, 2.0, 2.0, 2.0)
+    window.append("2020-01-02", 3.0, 3.0, 3.0, 3.0)
+    assert window.history(Market()).close.tolist() == [1.0, 3.0]
+    with pytest.raises(ValueError):
+        window.append("2019-12-31", 0.0, 0.0, 0.0, 0.0)
+    window.clear()
+    assert len(window) == 0
+    window.append("2019-12-31", 0.0, 0.0, 0.0, 0.0)
+    assert window.history(Market()).close.tolist() == [0.0]
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+from tradingbot.components.broker import RateLimiter
+
+
+def test_first_call_does_not_wait():
+    limiter = RateLimiter(10)
+    assert limiter.acquire() == 0.0
+
+
+def test_calls_are_paced():
+    limiter = RateLimiter(0.05)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.1
+
+
+def test_interval_override():
+    limiter = RateLimiter(10)
+    limiter.acquire(0)
+    assert limiter.acquire(0) == 0.0
+
+
+def test_concurrent_callers_get_distinct_slots():
+    limiter = RateLimiter(0.02)
+    waits = []
+    lock = threading.Lock()
+
+    def call():
+        wait = limiter.acquire()
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Every caller got its own slot: one did not wait, the last waited ~4 slots
+    waits.sort()
+    assert waits[0] == 0.0
+    assert waits[-1] >= 0.06
+
+
+def test_acquire_async_does_not_block_the_loop():
+    limiter = RateLimiter(0.05)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.gather(*[limiter.acquire_async() for _ in range(3)])
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 5
+
+
+def test_held_slot_is_used_by_the_blocking_call():
+    limiter = RateLimiter(0.1)
+
+    async def run():
+        async with limiter.hold():
+            # The slot awaited on the loop is handed over to the first acquire()
+            first = limiter.acquire()
+            second = limiter.acquire()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == 0.0
+    assert second > 0.05
+
+
+def test_burst():
+    limiter = RateLimiter(10, burst=3)
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # The budget is spent: the next call would wait for a new slot
+    assert limiter._reserve(None) > 9
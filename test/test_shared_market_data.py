@@ -0,0 +1,80 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy
+import pytest
+
+from tradingbot.components import SharedMarketData, SharedMarketDataReader
+from tradingbot.interfaces import Market, MarketHistory, MarketSnapshotTable
+
+
+def make_history(epic, bars):
+    dates = numpy.arange("2020-01-01", bars, dtype="datetime64[D]")
+    close = numpy.arange(bars, dtype=numpy.float64)
+    return MarketHistory(Market(epic=epic), dates, close + 1, close - 1, close, close)
+
+
+def close_sum(catalogue, key):
+    with SharedMarketDataReader(catalogue) as reader:
+        history = reader.history(key)
+        total = float(history.close.sum())
+        del history
+    return total
+
+
+@pytest.fixture
+def published():
+    with SharedMarketData() as data:
+        data.publish_history("EPIC1", make_history("EPIC1", 1000))
+        table = MarketSnapshotTable.from_markets(
+            [Market(epic="EPIC{}".format(i), bid=i, offer=i + 1) for i in range(3)]
+        )
+        data.publish_snapshots("universe", table)
+        yield data
+
+
+def test_read_history(published):
+    with SharedMarketDataReader(published.catalogue) as reader:
+        history = reader.history("EPIC1")
+        expected = make_history("EPIC1", 1000)
+        assert history.market.epic == "EPIC1"
+        assert numpy.array_equal(history.dates, expected.dates)
+        assert numpy.array_equal(history.high, expected.high)
+        assert history.close.flags["C_CONTIGUOUS"]
+        assert not history.close.flags["WRITEABLE"]
+        with pytest.raises(ValueError):
+            history.close[0] = 1.0
+        assert history.latest(2).close.tolist() == [998.0, 999.0]
+        market = Market(epic="EPIC1", bid=5.0)
+        assert reader.history("EPIC1", market).market is market
+        with pytest.raises(ValueError):
+            reader.history("universe")
+        del history
+
+
+def test_read_snapshots(published):
+    with SharedMarketDataReader(published.catalogue) as reader:
+        table = reader.snapshots("universe")
+        assert table.epics == ["EPIC0", "EPIC1", "EPIC2"]
+        assert table.bid.tolist() == [0.0, 1.0, 2.0]
+        assert table.spread().tolist() == [1.0, 1.0, 1.0]
+        assert table.market("EPIC2").offer == 3.0
+        del table
+
+
+def test_worker_process(published):
+    context = multiprocessing.get_context()
+    with context.Pool(2) as pool:
+        totals = pool.starmap(close_sum, [(published.catalogue, "EPIC1")] * 2)
+    assert totals == [sum(range(1000))] * 2
+
+
+def test_remove(published):
+    name = published.catalogue["EPIC1"]["segment"]
+    published.publish_history("EPIC1", make_history("EPIC1", 10))
+    assert published.catalogue["EPIC1"]["segment"] != name
+    # The replaced segment has been removed
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+    published.close()
+    assert published.catalogue == {}
@@ -4,6 +4,7 @@ import pytest
 from common.MockRequests import (
     av_request_macd_ext,
     av_request_prices,
+    bank_holidays_request,
     ig_request_account_details,
     ig_request_confirm_trade,
     ig_request_login,
@@ -46,6 +47,7 @@ def mock_http_calls(requests_mock):
     ig_request_watchlist(requests_mock)
     ig_request_watchlist(requests_mock, args="12345678", data="mock_watchlist.json")
     av_request_prices(requests_mock)
+    bank_holidays_request(requests_mock)
     av_request_macd_ext(requests_mock)
 
 
@@ -63,7 +65,10 @@ def broker(config, mock_http_calls):
     """
     Initialise the strategy with mock services
     """
-    return Broker(BrokerFactory(config))
+    broker = Broker(BrokerFactory(config))
+    # Each test serves different prices for the same market
+    broker.stocks_ifc._history_cache.clear()
+    return broker
 
 
 def create_mock_market(broker):
@@ -19,6 +19,7 @@ from common.MockRequests import (
 
 from tradingbot.components import Configuration, TradeDirection
 from tradingbot.components.broker import Broker, BrokerFactory
+from tradingbot.interfaces import MarketMACD
 from tradingbot.strategies import SimpleMACD
 
 
@@ -59,11 +60,19 @@ def config():
 
 
 @pytest.fixture
-def broker(config, mock_http_calls):
+def broker(config, mock_http_calls, monkeypatch):
     """
     Initialise the strategy with mock services
     """
-    return Broker(BrokerFactory(config))
+    broker = Broker(BrokerFactory(config))
+    # Serve the MACD from the mocked indicator endpoint. The interface is a
+    # singleton, so patch the configuration it has been created with
+    monkeypatch.setitem(
+        broker.stocks_ifc._config.config["stocks_interface"]["alpha_vantage"],
+        "local_indicators",
+        False,
+    )
+    return broker
 
 
 def create_mock_market(broker):
@@ -159,6 +168,34 @@ def test_get_trade_direction_from_signals(config, broker, requests_mock):
     assert tradeDir == TradeDirection.BUY
 
 
+def test_signal_proximity(config, broker):
+    strategy = SimpleMACD(config, broker)
+    market = create_mock_market(broker)
+    # Histogram crossing zero on the most recent bar
+    hist = [float("nan"), 4.0, 3.0, 2.0, 1.0, 0.1]
+    dates = list(range(len(hist)))
+    macd = MarketMACD(market, dates, hist, [0.0] * len(hist), hist)
+    assert strategy.signal_proximity(macd.dataframe) == 1.0
+    # Same data with the newest bar at the top
+    macd = MarketMACD(market, dates[::-1], hist[::-1], [0.0] * len(hist), hist[::-1])
+    assert strategy.signal_proximity(macd.dataframe) == 1.0
+    # Histogram moving away from zero
+    hist = [0.1, 1.0, 2.0, 3.0, 4.0]
+    macd = MarketMACD(market, list(range(5)), hist, [0.0] * 5, hist)
+    assert strategy.signal_proximity(macd.dataframe) == 0.0
+
+
+def test_find_trade_signal_sets_market_priority(config, broker, requests_mock):
+    av_request_macd_ext(requests_mock, data="mock_macd_ext_hold.json")
+    strategy = SimpleMACD(config, broker)
+    market = create_mock_market(broker)
+    data = strategy.fetch_datapoints(market)
+    calls = []
+    broker.set_market_priority = lambda epic, priority: calls.append((epic, priority))
+    strategy.find_trade_signal(market, data)
+    assert calls == [(market.epic, strategy.signal_proximity(data.dataframe))]
+
+
 # TODO
 # def test_backtest(config, broker, requests_mock):
 #     ig_request_market_info(requests_mock)
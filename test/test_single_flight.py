@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from tradingbot.components.broker import SingleFlight
+
+
+class Backend:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch(self, value):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if value == "error":
+            raise RuntimeError("error")
+        return [value]
+
+
+def test_identical_calls_are_coalesced():
+    flight = SingleFlight()
+    backend = Backend()
+
+    async def run():
+        return await asyncio.gather(
+            *[flight.do("fetch", "A", lambda: backend.fetch("A")) for _ in range(5)],
+            flight.do("fetch", "B", lambda: backend.fetch("B")),
+        )
+
+    results = asyncio.run(run())
+    assert backend.calls == 2
+    assert results[:5] == [["A"]] * 5
+    # The same result object is shared
+    assert all(r is results[0] for r in results[:5])
+    assert results[5] == ["B"]
+    assert flight.stats() == {"fetch": (6, 4)}
+
+
+def test_completed_calls_are_not_cached():
+    flight = SingleFlight()
+    backend = Backend()
+
+    async def run():
+        await flight.do("fetch", "A", lambda: backend.fetch("A"))
+        await flight.do("fetch", "A", lambda: backend.fetch("A"))
+
+    asyncio.run(run())
+    assert backend.calls == 2
+    assert flight.stats() == {"fetch": (2, 0)}
+
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+    backend = Backend()
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                flight.do("fetch", "E", lambda: backend.fetch("error"))
+                for _ in range(3)
+            ],
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert backend.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    flight = SingleFlight()
+    backend = Backend()
+
+    async def run():
+        first = asyncio.ensure_future(
+            flight.do("fetch", "A", lambda: backend.fetch("A"))
+        )
+        second = asyncio.ensure_future(
+            flight.do("fetch", "A", lambda: backend.fetch("A"))
+        )
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == ["A"]
+    assert backend.calls == 1
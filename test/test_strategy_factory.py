@@ -32,3 +32,10 @@ def test_make_strategy(config, broker):
 
     strategy = sf.make_strategy("weighted_avg_peak")
     assert isinstance(strategy, WeightedAvgPeak)
+
+
+def test_strategies_share_indicators(config, broker):
+    sf = StrategyFactory(config, broker)
+    first = sf.make_strategy("simple_macd")
+    second = sf.make_strategy("simple_boll_bands")
+    assert first.indicators is second.indicators is sf.indicators
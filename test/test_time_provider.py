@@ -56,3 +56,28 @@ def test_wait_for():
     new = datetime.now()
     delta = new - now
     assert delta.seconds == 3
+
+
+def test_get_open_market_seconds():
+    tp = TimeProvider()
+    # Monday to the following Monday, no bank holidays
+    monday = datetime(2023, 10, 2)
+    seconds = tp.get_open_market_seconds(monday, monday + timedelta(days=7))
+    assert seconds == 5 * 8.5 * 3600
+    # Within the trading hours of a single day
+    seconds = tp.get_open_market_seconds(
+        monday.replace(hour=15), monday.replace(hour=18)
+    )
+    assert seconds == 1.5 * 3600
+    # Weekend
+    saturday = datetime(2023, 10, 7)
+    assert tp.get_open_market_seconds(saturday, saturday + timedelta(days=2)) == 0
+
+
+def test_get_next_market_close():
+    tp = TimeProvider()
+    # Friday before and after the market close
+    friday = datetime(2019, 9, 13, 10, 0)
+    assert tp.get_next_market_close(friday) == datetime(2019, 9, 13, 16, 30)
+    evening = friday.replace(hour=17)
+    assert tp.get_next_market_close(evening) == datetime(2019, 9, 16, 16, 30)
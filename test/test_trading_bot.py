@@ -79,3 +79,13 @@ def test_trading_bot(mock_http_calls):
         tb.process_market_source()
     tb.close_open_positions()
     # TODO assert somehow that the http calls have been done
+
+
+def test_trading_bot_single_pass(mock_http_calls, requests_mock):
+    """
+    Test a single iteration of the asyncio main loop
+    """
+    config = Path("test/test_data/trading_bot.toml")
+    tb = TradingBot(MockTimeProvider(), config_filepath=config)
+    tb.start(single_pass=True)
+    assert any("positions" in r.url for r in requests_mock.request_history)
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from pathlib import Path
+
+from tradingbot.components import Configuration
+from tradingbot.components.broker import HttpTransport, RateLimiter, shared_transport
+
+
+def test_shared_transport():
+    config = Configuration.from_filepath(Path("test/test_data/trading_bot.toml"))
+    transport = shared_transport(config)
+    assert isinstance(transport, HttpTransport)
+    assert transport is shared_transport(config)
+    assert transport.pool_size == config.get_max_concurrent_requests()
+
+
+def test_rate_limiter_per_api():
+    transport = HttpTransport(2)
+    limiter = transport.rate_limiter("api")
+    assert isinstance(limiter, RateLimiter)
+    assert transport.rate_limiter("api") is limiter
+    assert transport.rate_limiter("other") is not limiter
+    transport.close()
+
+
+def test_requests(requests_mock):
+    requests_mock.get("http://mock/get", text="get")
+    requests_mock.post("http://mock/post", text="post")
+    requests_mock.put("http://mock/put", text="put")
+    transport = HttpTransport(2)
+    assert transport.get("http://mock/get").text == "get"
+    assert transport.post("http://mock/post", data="{}").text == "post"
+    assert transport.put("http://mock/put", data="{}").text == "put"
+    assert requests_mock.call_count == 3
+    transport.close()
+
+
+def test_run_in_worker_pool():
+    transport = HttpTransport(4)
+    barrier = threading.Barrier(4, timeout=5)
+
+    def blocking_call(i):
+        # Only returns when 4 calls are in flight at the same time
+        barrier.wait()
+        return i, threading.current_thread().name
+
+    async def run():
+        return await asyncio.gather(
+            *[transport.run(blocking_call, i) for i in range(4)]
+        )
+
+    results = asyncio.run(run())
+    assert [i for i, _ in results] == [0, 1, 2, 3]
+    assert all(name.startswith("HttpTransport") for _, name in results)
+    transport.close()
@@ -1,4 +1,9 @@
-from tradingbot.components import Utils
+import json
+
+import numpy
+import pandas
+
+from tradingbot.components import MovingAverageType, Utils
 
 
 def test_midpoint():
@@ -36,3 +41,44 @@ def test_humanize_time():
     assert Utils.humanize_time(3600) == "01:00:00"
     assert Utils.humanize_time(4800) == "01:20:00"
     assert Utils.humanize_time(4811) == "01:20:11"
+
+
+def test_moving_average():
+    values = numpy.arange(1.0, 11.0)
+    sma = Utils.moving_average(values, 3, MovingAverageType.SMA)
+    assert numpy.isnan(sma[:2]).all()
+    assert numpy.allclose(sma[2:], values[1:-1])
+    wma = Utils.moving_average(values, 3, MovingAverageType.WMA)
+    assert wma[2] == (1 * 1 + 2 * 2 + 3 * 3) / 6
+    # EMA is seeded with the SMA of the first values
+    ema = Utils.moving_average([2.0, 4.0, 6.0, 10.0], 3, MovingAverageType.EMA)
+    assert numpy.isnan(ema[:2]).all()
+    assert ema[2] == 4.0
+    assert ema[3] == 4.0 + 0.5 * (10.0 - 4.0)
+    # Leading NaN values are skipped
+    sma = Utils.moving_average([numpy.nan, 1.0, 2.0, 3.0], 2, MovingAverageType.SMA)
+    assert numpy.isnan(sma[:2]).all()
+    assert list(sma[2:]) == [1.5, 2.5]
+    assert numpy.isnan(Utils.moving_average([1.0], 3, MovingAverageType.EMA)).all()
+
+
+def test_macdext_df_from_list_matches_alphavantage():
+    with open("test/test_data/alpha_vantage/mock_av_daily.json", "r") as f:
+        prices = pandas.DataFrame(json.load(f)["Time Series (Daily)"]).T
+    with open("test/test_data/alpha_vantage/mock_macd_ext_buy.json", "r") as f:
+        remote = pandas.DataFrame(json.load(f)["Technical Analysis: MACDEXT"]).T
+    prices = prices.astype(float).sort_index()
+    remote = remote.astype(float).sort_index()
+    # The remote indicator has been computed with SMA on the open prices
+    local = Utils.macdext_df_from_list(
+        prices["1. open"].values,
+        fast_ma=MovingAverageType.SMA,
+        slow_ma=MovingAverageType.SMA,
+        signal_ma=MovingAverageType.SMA,
+    )
+    local.index = prices.index
+    assert local.dropna().index[0] == prices.index[33]
+    local = local.loc[remote.index[-100:]]
+    assert numpy.allclose(local["MACD"], remote["MACD"][-100:], atol=1e-3)
+    assert numpy.allclose(local["Signal"], remote["MACD_Signal"][-100:], atol=1e-3)
+    assert numpy.allclose(local["Hist"], remote["MACD_Hist"][-100:], atol=1e-3)
@@ -0,0 +1,92 @@
+import datetime
+
+import pandas
+import pytest
+import toml
+from common.MockRequests import yf_request_prices
+
+from tradingbot.components import Configuration, Interval
+from tradingbot.components.broker import InterfaceNames, YFinanceInterface, YFInterval
+from tradingbot.interfaces import Market, MarketHistory
+
+
+@pytest.fixture
+def config():
+    with open("test/test_data/trading_bot.toml", "r") as f:
+        config = toml.load(f)
+        config["stocks_interface"]["active"] = InterfaceNames.YAHOO_FINANCE.value
+        config["stocks_interface"][InterfaceNames.YAHOO_FINANCE.value][
+            "api_timeout"
+        ] = 0
+        return Configuration(config)
+
+
+@pytest.fixture
+def yf(requests_mock, config):
+    yf_request_prices(requests_mock)
+    return YFinanceInterface(config)
+
+
+def make_market(market_id):
+    market = Market()
+    market.epic = "KA.D.{}.DAILY.IP".format(market_id)
+    market.id = market_id
+    return market
+
+
+def chart_requests(requests_mock):
+    # Skip the requests of the exchange timezone
+    return [r for r in requests_mock.request_history if "period1" in r.qs]
+
+
+def test_week_interval(yf):
+    assert yf._to_yf_interval(Interval.WEEK) == YFInterval.WEEK_1
+
+
+def test_window_start(yf):
+    today = pandas.Timestamp.now().floor("D")
+    # 30 trading days span 6 weeks, plus the bank holidays margin
+    assert yf._window_start("1d", Interval.DAY, 30) == today - datetime.timedelta(
+        days=46
+    )
+    assert yf._window_start("1wk", Interval.WEEK, 18) == today - datetime.timedelta(
+        weeks=19
+    )
+    # Intraday windows are bounded to what Yahoo Finance provides
+    assert yf._window_start("1m", Interval.MINUTE_1, 10000) == today - (
+        datetime.timedelta(days=6)
+    )
+
+
+def test_get_prices_exact_window(yf, requests_mock):
+    hist = yf.get_prices(make_market("EXACT"), Interval.DAY, 10)
+    assert isinstance(hist, MarketHistory)
+    assert len(hist.dataframe) == 10
+    # Oldest datapoint first
+    dates = hist.dataframe[MarketHistory.DATE_COLUMN]
+    assert dates.iloc[0] < dates.iloc[-1]
+
+    request = chart_requests(requests_mock)[-1]
+    assert request.qs["interval"] == ["1d"]
+    assert int(request.qs["period1"][0]) > datetime.datetime(2026, 1, 1).timestamp()
+
+
+def test_get_prices_incremental(yf, requests_mock):
+    market = make_market("INCREMENTAL")
+    first = yf.get_prices(market, Interval.DAY, 10)
+    second = yf.get_prices(market, Interval.DAY, 10)
+    assert first.dataframe.equals(second.dataframe)
+
+    # The second request starts from the last stored datapoint
+    request = chart_requests(requests_mock)[-1]
+    last_date = first.dataframe[MarketHistory.DATE_COLUMN].iloc[-1]
+    start = datetime.datetime.fromtimestamp(int(request.qs["period1"][0]))
+    assert start.date() == last_date.date()
+
+
+def test_get_prices_whole_history(yf, requests_mock):
+    hist = yf.get_prices(make_market("WHOLE"), Interval.DAY, None)
+    request = chart_requests(requests_mock)[-1]
+    # yfinance requests the whole history from 1900
+    assert int(request.qs["period1"][0]) < 0
+    assert len(hist.dataframe) > 1000
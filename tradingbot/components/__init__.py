@@ -7,6 +7,7 @@ from .configuration import (  # NOQA # isort:skip
 from .utils import (  # NOQA # isort:skip
     Interval,
     MarketClosedException,
+    MovingAverageType,
     NotSafeToTradeException,
     Singleton,
     SynchSingleton,
@@ -16,3 +17,7 @@ from .utils import (  # NOQA # isort:skip
 from .backtester import Backtester  # NOQA # isort:skip
 from .market_provider import MarketProvider, MarketSource  # NOQA # isort:skip
 from .time_provider import TimeProvider, TimeAmount  # NOQA # isort:skip
+from .shared_market_data import (  # NOQA # isort:skip
+    SharedMarketData,
+    SharedMarketDataReader,
+)
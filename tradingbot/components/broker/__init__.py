@@ -1,11 +1,51 @@
+from .rate_limiter import RateLimiter  # NOQA # isort:skip
+from .cassette import Cassette, CassetteAdapter, CassetteMode  # NOQA # isort:skip
+from .metrics import BrokerMetrics, EndpointMetrics, Histogram  # NOQA # isort:skip
+from .transport import HttpTransport, shared_transport  # NOQA # isort:skip
 from .abstract_interfaces import (  # NOQA # isort:skip
     AbstractInterface,
     AccountBalances,
     StocksInterface,
     AccountInterface,
 )
+from .allowance_planner import AllowancePlanner  # NOQA # isort:skip
+from .price_encoding import (  # NOQA # isort:skip
+    EncodedColumn,
+    EncodedPrices,
+    PriceEncoding,
+)
+from .history_cache import HistoryCache  # NOQA # isort:skip
 from .av_interface import AVInterface, AVInterval  # NOQA # isort:skip
+from .ig_price_parser import (  # NOQA # isort:skip
+    IGPrices,
+    IGPriceType,
+    json_loads,
+    parse_ig_prices,
+)
 from .ig_interface import IGInterface, IG_API_URL  # NOQA # isort:skip
 from .yf_interface import YFinanceInterface, YFInterval  # NOQA # isort:skip
+from .paper_interface import PaperInterface  # NOQA # isort:skip
+from .async_interfaces import (  # NOQA # isort:skip
+    AsyncInterface,
+    AsyncAccountInterface,
+    AsyncStocksInterface,
+    AsyncIGInterface,
+    AsyncAVInterface,
+    AsyncYFinanceInterface,
+    AsyncPaperInterface,
+)
+from .composite_interface import (  # NOQA # isort:skip
+    AsyncCompositeStocksInterface,
+    ProviderStats,
+)
+from .order_pipeline import (  # NOQA # isort:skip
+    DealResult,
+    OrderPipeline,
+    PendingDeal,
+)
+from .position_book import PositionBook  # NOQA # isort:skip
+from .single_flight import SingleFlight  # NOQA # isort:skip
+from .kill_switch import KillSwitch, KillSwitchReport  # NOQA # isort:skip
 from .factories import BrokerFactory, InterfaceNames  # NOQA # isort:skip
+from .async_broker import AsyncBroker  # NOQA # isort:skip
 from .broker import Broker  # NOQA # isort:skip
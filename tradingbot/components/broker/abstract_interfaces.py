@@ -1,10 +1,10 @@
-import datetime as dt
-import time
+import logging
 from abc import abstractmethod
 from typing import Any, Dict, List, Optional, Tuple
 
 from ...interfaces import Market, MarketHistory, MarketMACD, Position
 from .. import Configuration, Interval, SynchSingleton, TradeDirection
+from . import shared_transport
 
 AccountBalances = Tuple[Optional[float], Optional[float]]
 
@@ -13,16 +13,18 @@ AccountBalances = Tuple[Optional[float], Optional[float]]
 class AbstractInterface(metaclass=SynchSingleton):
     def __init__(self, config: Configuration) -> None:
         self._config = config
-        self._last_call_ts = dt.datetime.now()
+        self._transport = shared_transport(config)
+        self._rate_limiter = self._transport.rate_limiter(type(self).__name__)
+        self._trading_rate_limiter = self._transport.rate_limiter(
+            "{}.trading".format(type(self).__name__)
+        )
         self.initialise()
 
     def _wait_before_call(self, timeout: float) -> None:
         """
         Wait between API calls to not overload the server
         """
-        while (dt.datetime.now() - self._last_call_ts) <= dt.timedelta(seconds=timeout):
-            time.sleep(0.5)
-        self._last_call_ts = dt.datetime.now()
+        self._rate_limiter.acquire(timeout)
 
     @abstractmethod
     def initialise(self) -> None:
@@ -68,10 +70,24 @@ class AccountInterface(AbstractInterface):
     ) -> bool:
         pass
 
+    @abstractmethod
+    def submit_order(
+        self, ticker: str, direction: TradeDirection, limit: float, stop: float
+    ) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def get_deal_confirmation(self, deal_ref: str) -> Dict[str, Any]:
+        pass
+
     @abstractmethod
     def close_position(self, position: Position) -> bool:
         pass
 
+    @abstractmethod
+    def submit_close(self, position: Position) -> Optional[str]:
+        pass
+
     @abstractmethod
     def close_all_positions(self) -> bool:
         pass
@@ -100,8 +116,37 @@ class StocksInterface(AbstractInterface):
     ) -> MarketHistory:
         pass
 
+    def get_prices_batch(
+        self, markets: List[Market], interval: Interval, data_range: int
+    ) -> Dict[str, MarketHistory]:
+        """
+        Return the prices of several markets keyed by epic. Markets whose
+        prices can't be fetched are left out.
+        Interfaces able to fetch several markets at once override this
+        """
+        histories = {}
+        for market in markets:
+            try:
+                histories[market.epic] = self.get_prices(market, interval, data_range)
+            except Exception as e:
+                logging.warning("No prices for {}: {}".format(market.epic, e))
+        return histories
+
     @abstractmethod
     def get_macd(
         self, market: Market, interval: Interval, data_range: int
     ) -> MarketMACD:
         pass
+
+    def start_spin(self) -> None:
+        """
+        Notify that the bot is starting a new spin over the markets
+        """
+        pass
+
+    def set_market_priority(self, epic: str, priority: float) -> None:
+        """
+        Hint that a market is close to a trade signal. Interfaces rationing
+        their data requests can use it to decide which markets to refresh
+        """
+        pass
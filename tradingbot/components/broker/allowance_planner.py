@@ -0,0 +1,179 @@
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from ...interfaces import MarketHistory
+
+HistoryKey = Tuple[str, str, int]
+
+
+class AllowancePlanner:
+    """
+    Keep track of the IG historical data allowance and decide which markets
+    can fetch fresh prices in the current spin.
+
+    The remaining allowance is spread evenly over the spins left before the
+    allowance reset. Markets with an open position are always refreshed while
+    the allowance lasts, markets flagged as close to a trade signal are served
+    next and all the others share what is left of the spin budget, falling
+    back to the last cached history when the budget is spent.
+
+    Spins are delimited by explicit calls to start_spin(). The amount of spins
+    left is estimated as the open market time before the reset divided by the
+    spin interval: the processing time of each spin is not accounted for, so
+    the estimate errs on the side of spending the allowance more slowly.
+    """
+
+    spin_interval: float
+    reserve: int
+    remaining: Optional[int]
+    total: Optional[int]
+    reset_at: Optional[float]
+
+    def __init__(
+        self,
+        spin_interval: float,
+        reserve: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        market_seconds: Optional[Callable[[float], float]] = None,
+    ) -> None:
+        """
+        - **spin_interval**: seconds between two spins of the bot
+        - **reserve**: allowance kept aside for markets with open positions
+        - **clock**: monotonic clock returning seconds
+        - **market_seconds**: function returning how many seconds the market
+          is open within the given amount of seconds from now. If None all
+          the time to the reset is considered trading time
+        """
+        self.spin_interval = max(float(spin_interval), 1.0)
+        self.reserve = reserve
+        self.remaining = None
+        self.total = None
+        self.reset_at = None
+        self._clock = clock
+        self._market_seconds = market_seconds
+        self._held: Set[str] = set()
+        self._priority: Dict[str, float] = {}
+        self._last_cost: Dict[str, int] = {}
+        self._cache: Dict[HistoryKey, MarketHistory] = {}
+        self._spin_budget: Optional[int] = None
+        self._spin_spent = 0
+        self._spin_fetched: Set[str] = set()
+
+    def start_spin(self) -> None:
+        """
+        Start a new spin: the spent budget is cleared and a new budget is
+        computed from the current allowance status
+        """
+        self._check_reset()
+        self._spin_spent = 0
+        self._spin_fetched = set()
+        self._spin_budget = self._compute_spin_budget()
+
+    def update(self, allowance: Dict[str, Any]) -> None:
+        """
+        Update the allowance status from the "allowance" object of an IG
+        prices response
+        """
+        self.remaining = int(allowance["remainingAllowance"])
+        self.total = int(allowance.get("totalAllowance", self.remaining))
+        self.reset_at = self._clock() + float(allowance["allowanceExpiry"])
+        if self._spin_budget is None:
+            self._spin_budget = self._compute_spin_budget()
+
+    def set_held_epics(self, epics: Iterable[str]) -> None:
+        """
+        Set the epics of the markets with an open position
+        """
+        self._held = set(epics)
+
+    def set_priority(self, epic: str, priority: float) -> None:
+        """
+        Flag a market as close to a trade signal. A priority of 0 removes the flag
+        """
+        if priority > 0:
+            self._priority[epic] = priority
+        else:
+            self._priority.pop(epic, None)
+
+    def seconds_to_reset(self) -> Optional[float]:
+        """
+        Return the amount of seconds to the next allowance reset if known
+        """
+        if self.reset_at is None:
+            return None
+        return max(self.reset_at - self._clock(), 0.0)
+
+    def spin_budget(self) -> Optional[int]:
+        """
+        Return the allowance that can be used in the current spin or None
+        if the allowance status is still unknown
+        """
+        self._check_reset()
+        return self._spin_budget
+
+    def should_fetch(self, epic: str, cost: int, has_cache: bool) -> bool:
+        """
+        Return True if fresh prices of the given market can be fetched from IG,
+        False if the cached history should be used instead
+
+            - **epic**: market epic
+            - **cost**: amount of datapoints the request would use
+            - **has_cache**: whether a cached history is available for the market
+        """
+        self._check_reset()
+        if self.remaining is None or self._spin_budget is None:
+            return True
+        if epic in self._held:
+            return self.remaining >= cost
+        if not has_cache or epic in self._priority:
+            return self.remaining - cost >= self.reserve
+        reserved = sum(
+            self._last_cost.get(e, 0)
+            for e in self._held.union(self._priority)
+            if e not in self._spin_fetched
+        )
+        return self._spin_spent + cost + reserved <= self._spin_budget
+
+    def record_fetch(self, epic: str, cost: int) -> None:
+        """
+        Account a completed prices request in the current spin
+        """
+        self._spin_spent += cost
+        self._spin_fetched.add(epic)
+        self._last_cost[epic] = cost
+
+    def store(self, key: HistoryKey, history: MarketHistory) -> None:
+        """
+        Cache the last history fetched for the given key
+        """
+        self._cache[key] = history
+
+    def cached(self, key: HistoryKey) -> Optional[MarketHistory]:
+        """
+        Return the cached history for the given key if any
+        """
+        return self._cache.get(key)
+
+    def _check_reset(self) -> None:
+        if self.reset_at is not None and self._clock() >= self.reset_at:
+            # The allowance has been reset, wait for the next response to know more
+            self.remaining = self.total
+            self.reset_at = None
+            self._spin_budget = None
+
+    def _compute_spin_budget(self) -> Optional[int]:
+        if self.remaining is None or self.reset_at is None:
+            return None
+        to_reset = max(self.reset_at - self._clock(), 0.0)
+        if self._market_seconds is not None:
+            to_reset = self._market_seconds(to_reset)
+        spins_left = max(1, math.ceil(to_reset / self.spin_interval))
+        budget = max(self.remaining - self.reserve, 0) // spins_left
+        logging.debug(
+            "IG allowance: {} left, {} spins to reset, {} per spin".format(
+                self.remaining, spins_left, budget
+            )
+        )
+        return budget
@@ -0,0 +1,266 @@
+import asyncio
+import threading
+import time
+from typing import Any, Coroutine, Dict, List, Optional, TypeVar
+
+from ...interfaces import Market, MarketHistory, MarketMACD, Position
+from .. import Interval, TradeDirection
+from . import (
+    AsyncAccountInterface,
+    AsyncStocksInterface,
+    BrokerFactory,
+    BrokerMetrics,
+    DealResult,
+    KillSwitch,
+    KillSwitchReport,
+    OrderPipeline,
+    PositionBook,
+    SingleFlight,
+    shared_transport,
+)
+
+T = TypeVar("T")
+
+# Event loop serving the synchronous Broker API
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="BrokerEventLoop", daemon=True
+            ).start()
+        return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the broker event loop and block until its result
+    is available. It can be called from any thread but the loop's own one
+    """
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("Blocking Broker call from the broker event loop")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+class AsyncBroker:
+    """
+    Asyncio counterpart of the Broker: the same broker related actions as
+    coroutines, so that many requests can be in flight at the same time.
+    Identical read requests in flight are coalesced into a single call
+    """
+
+    factory: BrokerFactory
+    stocks_ifc: AsyncStocksInterface
+    account_ifc: AsyncAccountInterface
+    position_book: PositionBook
+    order_pipeline: OrderPipeline
+    kill_switch: KillSwitch
+    single_flight: SingleFlight
+    metrics: BrokerMetrics
+
+    def __init__(self, factory: BrokerFactory) -> None:
+        self.factory = factory
+        self.stocks_ifc = self.factory.make_async_stock_interface_from_config()
+        self.account_ifc = self.factory.make_async_account_interface_from_config()
+        self.metrics = shared_transport(factory.config).metrics
+        self.position_book = PositionBook()
+        self.single_flight = SingleFlight(self.metrics)
+        self.order_pipeline = OrderPipeline(
+            self.account_ifc,
+            factory.config.get_ig_confirm_poll_interval(),
+            factory.config.get_ig_confirm_timeout(),
+            metrics=self.metrics,
+        )
+        self.order_pipeline.add_listener(self.position_book.on_deal_result)
+        self.kill_switch = KillSwitch(
+            self.account_ifc,
+            factory.config.get_ig_close_all_parallelism(),
+            factory.config.get_ig_close_all_retries(),
+            factory.config.get_ig_confirm_poll_interval(),
+            factory.config.get_ig_confirm_timeout(),
+            metrics=self.metrics,
+        )
+
+    async def get_open_positions(self) -> List[Position]:
+        """
+        Returns the current open positions
+        """
+        return await self.single_flight.do(
+            "get_open_positions", (), self._fetch_open_positions
+        )
+
+    async def _fetch_open_positions(self) -> List[Position]:
+        requested_at = time.monotonic()
+        positions = await self.account_ifc.get_open_positions()
+        if positions is not None:
+            self.position_book.update(positions, requested_at)
+        return positions
+
+    async def get_markets_from_watchlist(self, watchlist_name: str) -> List[Market]:
+        """
+        Return a name list of the markets in the required watchlist
+        """
+        return await self.single_flight.do(
+            "get_markets_from_watchlist",
+            watchlist_name,
+            lambda: self.account_ifc.get_markets_from_watchlist(watchlist_name),
+        )
+
+    async def navigate_market_node(self, node_id: str) -> Dict[str, Any]:
+        """
+        Return the children nodes of the requested node
+        """
+        return await self.single_flight.do(
+            "navigate_market_node",
+            node_id,
+            lambda: self.account_ifc.navigate_market_node(node_id),
+        )
+
+    async def get_account_used_perc(self) -> Optional[float]:
+        """
+        Returns the account used value in percentage
+        """
+        return await self.single_flight.do(
+            "get_account_used_perc", (), self.account_ifc.get_account_used_perc
+        )
+
+    async def close_all_positions(self) -> bool:
+        """
+        Attempt to close all the current open positions
+        """
+        if self.factory.config.is_paper_trading_enabled():
+            return await self.account_ifc.close_all_positions()
+        report = await self.flatten_positions()
+        return report.success()
+
+    async def flatten_positions(self) -> KillSwitchReport:
+        """
+        Close all the open positions concurrently and report the ones that
+        are still open
+        """
+        return await self.kill_switch.run()
+
+    async def close_position(self, position: Position) -> bool:
+        """
+        Attempt to close the requested open position
+        """
+        return await self.account_ifc.close_position(position)
+
+    async def trade(
+        self, market_id: str, trade_direction: TradeDirection, limit: float, stop: float
+    ) -> bool:
+        """
+        Request a trade of the given market
+        """
+        return await self.account_ifc.trade(market_id, trade_direction, limit, stop)
+
+    async def submit_trade(
+        self, market_id: str, trade_direction: TradeDirection, limit: float, stop: float
+    ) -> Optional[str]:
+        """
+        Submit a trade of the given market without waiting for its confirmation.
+        The result is recorded in the position book once confirmed
+
+            - Returns the deal reference or None if the trade was not submitted
+        """
+        return await self.order_pipeline.submit(market_id, trade_direction, limit, stop)
+
+    async def wait_for_confirmations(self) -> List[DealResult]:
+        """
+        Wait for the confirmation of all the submitted trades
+        """
+        return await self.order_pipeline.join()
+
+    def has_unsettled_deal(self, market_id: str) -> bool:
+        """
+        Return True if a trade of the given market is waiting for confirmation
+        or has been confirmed after the last open positions snapshot
+        """
+        return self.order_pipeline.is_pending(market_id) or self.position_book.has_deal(
+            market_id
+        )
+
+    async def get_market_info(self, market_id: str) -> Market:
+        """
+        Return the last available snapshot of the requested market
+        """
+        return await self.single_flight.do(
+            "get_market_info",
+            market_id,
+            lambda: self.account_ifc.get_market_info(market_id),
+        )
+
+    async def search_market(self, search: str) -> List[Market]:
+        """
+        Search for a market from a search string
+        """
+        return await self.single_flight.do(
+            "search_market", search, lambda: self.account_ifc.search_market(search)
+        )
+
+    async def get_macd(
+        self, market: Market, interval: Interval, datapoints_range: int
+    ) -> MarketMACD:
+        """
+        Return a pandas dataframe containing MACD technical indicator
+        for the requested market with requested interval
+        """
+        return await self.single_flight.do(
+            "get_macd",
+            (market.epic, market.id, interval, datapoints_range),
+            lambda: self.stocks_ifc.get_macd(market, interval, datapoints_range),
+        )
+
+    async def get_prices(
+        self, market: Market, interval: Interval, data_range: int
+    ) -> MarketHistory:
+        """
+        Returns past prices for the given market
+
+            - market: market to query prices for
+            - interval: resolution of the time series: minute, hours, etc.
+            - data_range: amount of past datapoint to fetch
+            - Returns the MarketHistory instance
+        """
+        return await self.single_flight.do(
+            "get_prices",
+            (market.epic, market.id, interval, data_range),
+            lambda: self.stocks_ifc.get_prices(market, interval, data_range),
+        )
+
+    async def get_prices_batch(
+        self, markets: List[Market], interval: Interval, data_range: int
+    ) -> Dict[str, MarketHistory]:
+        """
+        Returns past prices for several markets keyed by epic, fetched in as
+        few requests as the stocks interface allows
+        """
+        return await self.single_flight.do(
+            "get_prices_batch",
+            (tuple((m.epic, m.id) for m in markets), interval, data_range),
+            lambda: self.stocks_ifc.get_prices_batch(markets, interval, data_range),
+        )
+
+    def start_spin(self) -> None:
+        """
+        Notify the interfaces that a new spin over the markets is starting
+        """
+        self.stocks_ifc.start_spin()
+
+    def set_market_priority(self, epic: str, priority: float) -> None:
+        """
+        Flag a market as close to a trade signal so that its prices are
+        refreshed first. A priority of 0 removes the flag
+        """
+        self.stocks_ifc.set_market_priority(epic, priority)
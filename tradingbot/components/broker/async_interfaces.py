@@ -0,0 +1,185 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from ...interfaces import Market, MarketHistory, MarketMACD, Position
+from .. import Configuration, Interval, TradeDirection
+from . import (
+    AbstractInterface,
+    AccountBalances,
+    AccountInterface,
+    AVInterface,
+    IGInterface,
+    PaperInterface,
+    StocksInterface,
+    YFinanceInterface,
+)
+
+T = TypeVar("T")
+
+
+class AsyncInterface:
+    """
+    Asyncio counterpart of a broker interface. Calls are forwarded to the
+    interface singleton and run in the worker pool of the shared transport,
+    so the synchronous and asynchronous APIs use the same connection pool,
+    rate limiter and state. The rate limiter slot of each call is awaited on
+    the event loop, hence queued calls do not hold a worker.
+    Latency, errors and rate limiter waits of each method are recorded in
+    the transport metrics
+    """
+
+    ifc: AbstractInterface
+
+    def __init__(self, ifc: AbstractInterface) -> None:
+        self.ifc = ifc
+
+    async def _call(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Wait for the rate limiter slot and then run the blocking call
+        """
+        async with self.ifc._rate_limiter.hold() as waited:
+            return await self._run(func, waited, *args)
+
+    async def _call_trading(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Wait for the trading requests rate limiter slot and then run the
+        blocking call
+        """
+        async with self.ifc._trading_rate_limiter.hold() as waited:
+            return await self._run(func, waited, *args)
+
+    async def _call_unpaced(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking call that is not paced by the rate limiter
+        """
+        return await self._run(func, 0.0, *args)
+
+    async def _run(self, func: Callable[..., T], waited: float, *args: Any) -> T:
+        """
+        Run the blocking call in the worker pool recording its metrics
+        """
+        metrics = self.ifc._transport.metrics
+        endpoint = "{}.{}".format(type(self.ifc).__name__, func.__name__)
+        if waited > 0:
+            metrics.add_rate_limit_wait(endpoint, waited)
+        start = time.perf_counter()
+        try:
+            result = await self.ifc._transport.run(func, *args)
+        except Exception:
+            metrics.observe(endpoint, time.perf_counter() - start, error=True)
+            raise
+        metrics.observe(endpoint, time.perf_counter() - start)
+        return result
+
+
+class AsyncAccountInterface(AsyncInterface):
+    ifc: AccountInterface
+
+    async def authenticate(self) -> bool:
+        return await self._call_unpaced(self.ifc.authenticate)
+
+    async def set_default_account(self, account_id: str) -> bool:
+        return await self._call_unpaced(self.ifc.set_default_account, account_id)
+
+    async def get_account_balances(self) -> AccountBalances:
+        return await self._call(self.ifc.get_account_balances)
+
+    async def get_open_positions(self) -> List[Position]:
+        return await self._call(self.ifc.get_open_positions)
+
+    async def get_positions_map(self) -> Dict[str, int]:
+        return await self._call(self.ifc.get_positions_map)
+
+    async def get_market_info(self, market_ticker: str) -> Market:
+        return await self._call(self.ifc.get_market_info, market_ticker)
+
+    async def search_market(self, search_string: str) -> List[Market]:
+        return await self._call(self.ifc.search_market, search_string)
+
+    async def trade(
+        self, ticker: str, direction: TradeDirection, limit: float, stop: float
+    ) -> bool:
+        return await self._call(self.ifc.trade, ticker, direction, limit, stop)
+
+    async def submit_order(
+        self, ticker: str, direction: TradeDirection, limit: float, stop: float
+    ) -> Optional[str]:
+        return await self._call_trading(
+            self.ifc.submit_order, ticker, direction, limit, stop
+        )
+
+    async def get_deal_confirmation(self, deal_ref: str) -> Dict[str, Any]:
+        return await self._call(self.ifc.get_deal_confirmation, deal_ref)
+
+    async def close_position(self, position: Position) -> bool:
+        return await self._call(self.ifc.close_position, position)
+
+    async def submit_close(self, position: Position) -> Optional[str]:
+        return await self._call_trading(self.ifc.submit_close, position)
+
+    async def close_all_positions(self) -> bool:
+        return await self._call(self.ifc.close_all_positions)
+
+    async def get_account_used_perc(self) -> Optional[float]:
+        return await self._call(self.ifc.get_account_used_perc)
+
+    async def get_markets_from_watchlist(self, watchlist_id: str) -> List[Market]:
+        return await self._call(self.ifc.get_markets_from_watchlist, watchlist_id)
+
+    async def navigate_market_node(self, node_id: str) -> Dict[str, Any]:
+        return await self._call(self.ifc.navigate_market_node, node_id)
+
+
+class AsyncStocksInterface(AsyncInterface):
+    ifc: StocksInterface
+
+    async def get_prices(
+        self, market: Market, interval: Interval, data_range: int
+    ) -> MarketHistory:
+        return await self._call(self.ifc.get_prices, market, interval, data_range)
+
+    async def get_prices_batch(
+        self, markets: List[Market], interval: Interval, data_range: int
+    ) -> Dict[str, MarketHistory]:
+        return await self._call(
+            self.ifc.get_prices_batch, markets, interval, data_range
+        )
+
+    async def get_macd(
+        self, market: Market, interval: Interval, data_range: int
+    ) -> MarketMACD:
+        return await self._call(self.ifc.get_macd, market, interval, data_range)
+
+    def start_spin(self) -> None:
+        self.ifc.start_spin()
+
+    def set_market_priority(self, epic: str, priority: float) -> None:
+        self.ifc.set_market_priority(epic, priority)
+
+
+class AsyncIGInterface(AsyncAccountInterface, AsyncStocksInterface):
+    ifc: IGInterface
+
+    def __init__(self, config: Configuration) -> None:
+        super().__init__(IGInterface(config))
+
+
+class AsyncAVInterface(AsyncStocksInterface):
+    ifc: AVInterface
+
+    def __init__(self, config: Configuration) -> None:
+        super().__init__(AVInterface(config))
+
+
+class AsyncYFinanceInterface(AsyncStocksInterface):
+    ifc: YFinanceInterface
+
+    def __init__(self, config: Configuration) -> None:
+        super().__init__(YFinanceInterface(config))
+
+
+class AsyncPaperInterface(AsyncAccountInterface):
+    ifc: PaperInterface
+
+    def __init__(self, config: Configuration) -> None:
+        super().__init__(PaperInterface(config))
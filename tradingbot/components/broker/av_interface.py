@@ -1,15 +1,18 @@
 import logging
 import sys
 import traceback
+from datetime import datetime, timedelta
 from enum import Enum
+from typing import Callable, Dict, Optional, Tuple
 
 import pandas
 from alpha_vantage.techindicators import TechIndicators
 from alpha_vantage.timeseries import TimeSeries
 
 from ...interfaces import Market, MarketHistory, MarketMACD
-from .. import Interval
-from . import StocksInterface
+from .. import Interval, MovingAverageType, Utils
+from ..time_provider import TimeProvider
+from . import HistoryCache, PriceEncoding, StocksInterface
 
 
 class AVInterval(Enum):
@@ -27,6 +30,18 @@ class AVInterval(Enum):
     MONTHLY = "monthly"
 
 
+# Minutes between two datapoints of the intraday intervals
+AV_INTRADAY_MINUTES = {
+    AVInterval.MIN_1: 1,
+    AVInterval.MIN_5: 5,
+    AVInterval.MIN_15: 15,
+    AVInterval.MIN_30: 30,
+    AVInterval.MIN_60: 60,
+}
+
+SeriesKey = Tuple[str, str]
+
+
 class AVInterface(StocksInterface):
     """
     AlphaVantage interface class, provides methods to call AlphaVantage API
@@ -35,6 +50,7 @@ class AVInterface(StocksInterface):
 
     def initialise(self) -> None:
         logging.info("Initialising AVInterface...")
+        self._rate_limiter.interval = self._config.get_alphavantage_api_timeout()
         api_key = self._config.get_credentials()["av_api_key"]
         self.TS = TimeSeries(
             key=api_key, output_format="pandas", treat_info_as_error=True
@@ -42,6 +58,12 @@ class AVInterface(StocksInterface):
         self.TI = TechIndicators(
             key=api_key, output_format="pandas", treat_info_as_error=True
         )
+        # Whole history is downloaded once, then only the latest datapoints
+        self._history_cache = HistoryCache(
+            max_rows=None,
+            encoding=PriceEncoding(self._config.get_history_encoding()),
+        )
+        self._expires_at: Dict[SeriesKey, datetime] = {}
 
     def _to_av_interval(self, interval: Interval) -> AVInterval:
         """
@@ -75,23 +97,7 @@ class AVInterface(StocksInterface):
     def get_prices(
         self, market: Market, interval: Interval, data_range: int
     ) -> MarketHistory:
-        data = None
-        av_interval = self._to_av_interval(interval)
-        if (
-            av_interval == AVInterval.MIN_1
-            or av_interval == AVInterval.MIN_5
-            or av_interval == AVInterval.MIN_15
-            or av_interval == AVInterval.MIN_30
-            or av_interval == AVInterval.MIN_60
-        ):
-            data = self.intraday(market.id, av_interval)
-        elif av_interval == AVInterval.DAILY:
-            data = self.daily(market.id)
-        elif av_interval == AVInterval.WEEKLY:
-            data = self.weekly(market.id)
-        # TODO implement monthly call
-        else:
-            raise ValueError("Unsupported Interval.{}".format(interval.name))
+        data = self._time_series(market.id, self._to_av_interval(interval))
         history = MarketHistory(
             market,
             data.index,
@@ -102,6 +108,19 @@ class AVInterface(StocksInterface):
         )
         return history
 
+    def _time_series(self, marketId: str, interval: AVInterval) -> pandas.DataFrame:
+        """
+        Return the time series of the given AlphaVantage interval
+        """
+        if interval in AV_INTRADAY_MINUTES:
+            return self.intraday(marketId, interval)
+        elif interval == AVInterval.DAILY:
+            return self.daily(marketId)
+        elif interval == AVInterval.WEEKLY:
+            return self.weekly(marketId)
+        # TODO implement monthly call
+        raise ValueError("Unsupported AVInterval.{}".format(interval.name))
+
     def daily(self, marketId: str) -> pandas.DataFrame:
         """
         Calls AlphaVantage API and return the Daily time series for the given market
@@ -109,18 +128,11 @@ class AVInterface(StocksInterface):
             - **marketId**: string representing an AlphaVantage compatible market id
             - Returns **None** if an error occurs otherwise the pandas dataframe
         """
-        self._wait_before_call(self._config.get_alphavantage_api_timeout())
-        market = self._format_market_id(marketId)
-        try:
-            data, meta_data = self.TS.get_daily(symbol=market, outputsize="full")
-            return data
-        except Exception as e:
-            print(e)
-            logging.error("AlphaVantage wrong api call for {}".format(market))
-            logging.debug(e)
-            logging.debug(traceback.format_exc())
-            logging.debug(sys.exc_info()[0])
-        return None
+        return self._cached_series(
+            marketId,
+            AVInterval.DAILY,
+            lambda symbol, size: self.TS.get_daily(symbol=symbol, outputsize=size),
+        )
 
     def intraday(self, marketId: str, interval: AVInterval) -> pandas.DataFrame:
         """
@@ -130,19 +142,13 @@ class AVInterface(StocksInterface):
             - **interval**: string representing an AlphaVantage interval type
             - Returns **None** if an error occurs otherwise the pandas dataframe
         """
-        self._wait_before_call(self._config.get_alphavantage_api_timeout())
-        market = self._format_market_id(marketId)
-        try:
-            data, meta_data = self.TS.get_intraday(
-                symbol=market, interval=interval.value, outputsize="full"
-            )
-            return data
-        except Exception as e:
-            logging.error("AlphaVantage wrong api call for {}".format(market))
-            logging.debug(e)
-            logging.debug(traceback.format_exc())
-            logging.debug(sys.exc_info()[0])
-        return None
+        return self._cached_series(
+            marketId,
+            interval,
+            lambda symbol, size: self.TS.get_intraday(
+                symbol=symbol, interval=interval.value, outputsize=size
+            ),
+        )
 
     def weekly(self, marketId: str) -> pandas.DataFrame:
         """
@@ -151,17 +157,63 @@ class AVInterface(StocksInterface):
             - **marketId**: string representing an AlphaVantage compatible market id
             - Returns **None** if an error occurs otherwise the pandas dataframe
         """
-        self._wait_before_call(self._config.get_alphavantage_api_timeout())
+        # The weekly series has no compact output
+        return self._cached_series(
+            marketId,
+            AVInterval.WEEKLY,
+            lambda symbol, size: self.TS.get_weekly(symbol=symbol),
+        )
+
+    def _cached_series(
+        self,
+        marketId: str,
+        interval: AVInterval,
+        fetch: Callable[[str, str], Tuple[pandas.DataFrame, dict]],
+    ) -> Optional[pandas.DataFrame]:
+        """
+        Return the time series from the history cache, refreshing it when it
+        expires: the first call downloads the "full" output, the next ones
+        merge the "compact" output into the stored history
+
+            - **marketId**: string representing an AlphaVantage compatible market id
+            - **interval**: AlphaVantage interval of the time series
+            - **fetch**: function calling the API with the symbol and output size
+            - Returns **None** if an error occurs otherwise the pandas dataframe
+              with the oldest datapoint first
+        """
         market = self._format_market_id(marketId)
+        key = (market, interval.value)
+        cached = self._history_cache.get(key)
+        if cached is not None and datetime.now() < self._expires_at.get(
+            key, datetime.min
+        ):
+            return cached
+        full = not self._history_cache.covers(key, None)
+        expires_at = self._expiry(interval)
+        self._wait_before_call(self._config.get_alphavantage_api_timeout())
         try:
-            data, meta_data = self.TS.get_weekly(symbol=market)
-            return data
+            data, meta_data = fetch(market, "full" if full else "compact")
         except Exception as e:
             logging.error("AlphaVantage wrong api call for {}".format(market))
             logging.debug(e)
             logging.debug(traceback.format_exc())
             logging.debug(sys.exc_info()[0])
-        return None
+            return cached
+        data = data.sort_index()
+        start = None if full or len(data) == 0 else data.index[0]
+        merged = self._history_cache.merge(key, data, start)
+        self._expires_at[key] = expires_at
+        return merged
+
+    def _expiry(self, interval: AVInterval) -> datetime:
+        """
+        Return when a time series fetched now becomes stale: intraday series
+        after one datapoint, the others at the next market close
+        """
+        now = datetime.now()
+        if interval in AV_INTRADAY_MINUTES:
+            return now + timedelta(minutes=AV_INTRADAY_MINUTES[interval])
+        return TimeProvider().get_next_market_close(now)
 
     def quote_endpoint(self, market_id: str) -> pandas.DataFrame:
         """
@@ -199,12 +251,21 @@ class AVInterface(StocksInterface):
 
     def macdext(self, marketId: str, interval: AVInterval) -> pandas.DataFrame:
         """
-        Calls AlphaVantage API and return the MACDEXT tech indicator series for the given market
+        Return the MACDEXT tech indicator series for the given market, computed
+        from the cached time series unless the remote indicators are configured
 
             - **marketId**: string representing an AlphaVantage compatible market id
             - **interval**: string representing an AlphaVantage interval type
             - Returns **None** if an error occurs otherwise the pandas dataframe
         """
+        if self._config.get_alphavantage_local_indicators():
+            return self._local_macd(
+                marketId,
+                interval,
+                MovingAverageType.WMA,
+                MovingAverageType.EMA,
+                MovingAverageType.SMA,
+            )
         self._wait_before_call(self._config.get_alphavantage_api_timeout())
         market = self._format_market_id(marketId)
         data, meta_data = self.TI.get_macdext(
@@ -214,20 +275,29 @@ class AVInterface(StocksInterface):
             fastperiod=12,
             slowperiod=26,
             signalperiod=9,
-            fastmatype=2,
-            slowmatype=1,
-            signalmatype=0,
+            fastmatype=MovingAverageType.WMA.value,
+            slowmatype=MovingAverageType.EMA.value,
+            signalmatype=MovingAverageType.SMA.value,
         )
         return data
 
     def macd(self, marketId: str, interval: AVInterval) -> pandas.DataFrame:
         """
-        Calls AlphaVantage API and return the MACDEXT tech indicator series for the given market
+        Return the MACD tech indicator series for the given market, computed
+        from the cached time series unless the remote indicators are configured
 
             - **marketId**: string representing an AlphaVantage compatible market id
             - **interval**: string representing an AlphaVantage interval type
             - Returns **None** if an error occurs otherwise the pandas dataframe
         """
+        if self._config.get_alphavantage_local_indicators():
+            return self._local_macd(
+                marketId,
+                interval,
+                MovingAverageType.EMA,
+                MovingAverageType.EMA,
+                MovingAverageType.EMA,
+            )
         self._wait_before_call(self._config.get_alphavantage_api_timeout())
         market = self._format_market_id(marketId)
         data, meta_data = self.TI.get_macd(
@@ -240,6 +310,34 @@ class AVInterface(StocksInterface):
         )
         return data
 
+    def _local_macd(
+        self,
+        marketId: str,
+        interval: AVInterval,
+        fast_ma: MovingAverageType,
+        slow_ma: MovingAverageType,
+        signal_ma: MovingAverageType,
+    ) -> Optional[pandas.DataFrame]:
+        """
+        Compute the MACD of the close prices with the same periods and columns
+        of the AlphaVantage indicators, oldest datapoint first
+        """
+        series = self._time_series(marketId, interval)
+        if series is None:
+            return None
+        data = Utils.macdext_df_from_list(
+            series["4. close"].values,
+            12,
+            26,
+            9,
+            fast_ma=fast_ma,
+            slow_ma=slow_ma,
+            signal_ma=signal_ma,
+        )
+        data.index = series.index
+        data = data.dropna()
+        return data.rename(columns={"Signal": "MACD_Signal", "Hist": "MACD_Hist"})
+
     # Utils functions
 
     def _format_market_id(self, marketId: str) -> str:
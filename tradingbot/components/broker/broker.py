@@ -1,60 +1,114 @@
-from typing import Any, Dict, List, Optional
+import logging
+from typing import Any, Dict, List, Optional, Tuple
 
 from ...interfaces import Market, MarketHistory, MarketMACD, Position
 from .. import Interval, TradeDirection
-from . import AccountInterface, BrokerFactory, StocksInterface
+from . import (
+    AccountInterface,
+    AsyncBroker,
+    BrokerFactory,
+    DealResult,
+    KillSwitchReport,
+    PositionBook,
+    StocksInterface,
+)
+from .async_broker import run_sync
 
 
 class Broker:
     """
     This class provides a template interface for all those broker related
-    actions/tasks wrapping the actual implementation class internally
+    actions/tasks wrapping the actual implementation class internally.
+    It is a blocking wrapper of the AsyncBroker
     """
 
     factory: BrokerFactory
-    stocks_ifc: StocksInterface
-    account_ifc: AccountInterface
+    async_broker: AsyncBroker
 
     def __init__(self, factory: BrokerFactory) -> None:
         self.factory = factory
-        self.stocks_ifc = self.factory.make_stock_interface_from_config()
-        self.account_ifc = self.factory.make_account_interface_from_config()
+        self.async_broker = AsyncBroker(factory)
+
+    @property
+    def stocks_ifc(self) -> StocksInterface:
+        return self.async_broker.stocks_ifc.ifc
+
+    @property
+    def account_ifc(self) -> AccountInterface:
+        return self.async_broker.account_ifc.ifc
+
+    @property
+    def position_book(self) -> PositionBook:
+        return self.async_broker.position_book
+
+    def coalescing_stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Return the amount of calls and of calls coalesced with an identical
+        request in flight for each broker operation
+        """
+        return self.async_broker.single_flight.stats()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the latency histogram summary, errors, bytes transferred,
+        retries, coalesced calls and rate limiter waits of each HTTP endpoint,
+        interface method and broker operation
+        """
+        return self.async_broker.metrics.snapshot()
+
+    def dump_metrics(self, reset: bool = True) -> str:
+        """
+        Log the metrics report and return it. With reset the metrics start
+        over, so that each report covers the calls since the previous one
+        """
+        report = self.async_broker.metrics.report()
+        logging.info("Broker metrics:\n{}".format(report))
+        if reset:
+            self.async_broker.metrics.reset()
+        return report
 
     def get_open_positions(self) -> List[Position]:
         """
         Returns the current open positions
         """
-        return self.account_ifc.get_open_positions()
+        return run_sync(self.async_broker.get_open_positions())
 
     def get_markets_from_watchlist(self, watchlist_name: str) -> List[Market]:
         """
         Return a name list of the markets in the required watchlist
         """
-        return self.account_ifc.get_markets_from_watchlist(watchlist_name)
+        return run_sync(self.async_broker.get_markets_from_watchlist(watchlist_name))
 
     def navigate_market_node(self, node_id: str) -> Dict[str, Any]:
         """
         Return the children nodes of the requested node
         """
-        return self.account_ifc.navigate_market_node(node_id)
+        return run_sync(self.async_broker.navigate_market_node(node_id))
 
     def get_account_used_perc(self) -> Optional[float]:
         """
         Returns the account used value in percentage
         """
-        return self.account_ifc.get_account_used_perc()
+        return run_sync(self.async_broker.get_account_used_perc())
 
     def close_all_positions(self) -> bool:
         """
         Attempt to close all the current open positions
         """
-        return self.account_ifc.close_all_positions()
+        return run_sync(self.async_broker.close_all_positions())
+
+    def flatten_positions(self) -> KillSwitchReport:
+        """
+        Close all the open positions concurrently and report the ones that
+        are still open
+        """
+        return run_sync(self.async_broker.flatten_positions())
 
     def close_position(self, position: Position) -> bool:
         """
         Attempt to close the requested open position
         """
-        return self.account_ifc.close_position(position)
+        return run_sync(self.async_broker.close_position(position))
 
     def trade(
         self, market_id: str, trade_direction: TradeDirection, limit: float, stop: float
@@ -62,19 +116,44 @@ class Broker:
         """
         Request a trade of the given market
         """
-        return self.account_ifc.trade(market_id, trade_direction, limit, stop)
+        return run_sync(
+            self.async_broker.trade(market_id, trade_direction, limit, stop)
+        )
+
+    def submit_trade(
+        self, market_id: str, trade_direction: TradeDirection, limit: float, stop: float
+    ) -> Optional[str]:
+        """
+        Submit a trade of the given market without waiting for its confirmation
+        """
+        return run_sync(
+            self.async_broker.submit_trade(market_id, trade_direction, limit, stop)
+        )
+
+    def wait_for_confirmations(self) -> List[DealResult]:
+        """
+        Wait for the confirmation of all the submitted trades
+        """
+        return run_sync(self.async_broker.wait_for_confirmations())
+
+    def has_unsettled_deal(self, market_id: str) -> bool:
+        """
+        Return True if a trade of the given market is waiting for confirmation
+        or has been confirmed after the last open positions snapshot
+        """
+        return self.async_broker.has_unsettled_deal(market_id)
 
     def get_market_info(self, market_id: str) -> Market:
         """
         Return the last available snapshot of the requested market
         """
-        return self.account_ifc.get_market_info(market_id)
+        return run_sync(self.async_broker.get_market_info(market_id))
 
     def search_market(self, search: str) -> List[Market]:
         """
         Search for a market from a search string
         """
-        return self.account_ifc.search_market(search)
+        return run_sync(self.async_broker.search_market(search))
 
     def get_macd(
         self, market: Market, interval: Interval, datapoints_range: int
@@ -83,7 +162,7 @@ class Broker:
         Return a pandas dataframe containing MACD technical indicator
         for the requested market with requested interval
         """
-        return self.stocks_ifc.get_macd(market, interval, datapoints_range)
+        return run_sync(self.async_broker.get_macd(market, interval, datapoints_range))
 
     def get_prices(
         self, market: Market, interval: Interval, data_range: int
@@ -96,4 +175,28 @@ class Broker:
             - data_range: amount of past datapoint to fetch
             - Returns the MarketHistory instance
         """
-        return self.stocks_ifc.get_prices(market, interval, data_range)
+        return run_sync(self.async_broker.get_prices(market, interval, data_range))
+
+    def get_prices_batch(
+        self, markets: List[Market], interval: Interval, data_range: int
+    ) -> Dict[str, MarketHistory]:
+        """
+        Returns past prices for several markets keyed by epic, fetched in as
+        few requests as the stocks interface allows
+        """
+        return run_sync(
+            self.async_broker.get_prices_batch(markets, interval, data_range)
+        )
+
+    def start_spin(self) -> None:
+        """
+        Notify the interfaces that a new spin over the markets is starting
+        """
+        self.async_broker.start_spin()
+
+    def set_market_priority(self, epic: str, priority: float) -> None:
+        """
+        Flag a market as close to a trade signal so that its prices are
+        refreshed first. A priority of 0 removes the flag
+        """
+        self.async_broker.set_market_priority(epic, priority)
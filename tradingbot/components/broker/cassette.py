@@ -0,0 +1,236 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# The stored content is already decoded and its length may differ
+DROPPED_HEADERS = ["Content-Encoding", "Content-Length", "Transfer-Encoding"]
+
+Entry = Dict[str, Any]
+RequestKey = Tuple[str, str, str]
+
+
+class CassetteMode(Enum):
+    """
+    Modes of the broker traffic cassette
+    """
+
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class Cassette:
+    """
+    On-disk log of the HTTP requests sent to the broker APIs and of their
+    responses, stored as gzipped json lines.
+
+    Request bodies are only stored as a hash, so that credentials never reach
+    the disk. When replaying, requests are matched by method, url and body
+    and the recorded responses are served in the order they were received.
+    Requests with a different query, e.g. a time window computed from the
+    current date, fall back to the responses recorded for the same path.
+    Once the responses of a request are exhausted the last one served for
+    the same request, or else for the same path, is repeated
+    """
+
+    mode: CassetteMode
+    filepath: Path
+    latency_scale: float
+
+    def __init__(
+        self,
+        mode: CassetteMode,
+        filepath: Path,
+        latency_scale: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        - **mode**: record or replay the traffic
+        - **filepath**: path of the cassette file
+        - **latency_scale**: replayed response time as a fraction of the
+          recorded one: 1 as recorded, 0.1 ten times faster, 0 for no wait
+        - **sleep**: function waiting for the given seconds
+        """
+        if mode is CassetteMode.OFF:
+            raise ValueError("Cassette mode must be record or replay")
+        self.mode = mode
+        self.filepath = filepath
+        self.latency_scale = latency_scale
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._exact: Dict[RequestKey, Deque[Entry]] = {}
+        self._by_path: Dict[RequestKey, Deque[Entry]] = {}
+        self._last: Dict[RequestKey, Entry] = {}
+        self._file: Optional[Any] = None
+        if mode is CassetteMode.RECORD:
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(self.filepath, "wt", encoding="utf-8")
+        else:
+            self._load()
+        logging.info("Cassette {}: {}".format(mode.value, filepath))
+
+    def _load(self) -> None:
+        with gzip.open(self.filepath, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._exact.setdefault(self._key(entry), deque()).append(entry)
+                self._by_path.setdefault(self._path_key(entry), deque()).append(entry)
+
+    @staticmethod
+    def _body_hash(body: Any) -> str:
+        if body is None:
+            return ""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return hashlib.sha1(body).hexdigest()
+
+    @staticmethod
+    def _key(entry: Entry) -> RequestKey:
+        return (entry["method"], entry["url"], entry["body"])
+
+    @staticmethod
+    def _path_key(entry: Entry) -> RequestKey:
+        url = urlsplit(entry["url"])
+        return (entry["method"], url.netloc + url.path, entry["body"])
+
+    def record(
+        self, request: requests.PreparedRequest, response: requests.Response
+    ) -> None:
+        """
+        Append the request and its response to the cassette
+        """
+        headers = {
+            k: v for k, v in response.headers.items() if k not in DROPPED_HEADERS
+        }
+        entry: Entry = {
+            "method": request.method,
+            "url": request.url,
+            "body": self._body_hash(request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            "elapsed": response.elapsed.total_seconds(),
+            "time": time.monotonic() - self._started,
+        }
+        try:
+            entry["text"] = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["content"] = base64.b64encode(response.content).decode("ascii")
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def replay(self, request: requests.PreparedRequest) -> requests.Response:
+        """
+        Return the recorded response of the request after waiting for the
+        scaled recorded response time
+
+            - Raise a ConnectionError if the request has not been recorded
+        """
+        probe = {
+            "method": request.method,
+            "url": request.url,
+            "body": self._body_hash(request.body),
+        }
+        key = self._key(probe)
+        path_key = self._path_key(probe)
+        with self._lock:
+            entry = self._next(self._exact, key)
+            if entry is None:
+                entry = self._next(self._by_path, path_key)
+            if entry is None:
+                entry = self._last.get(key, self._last.get(path_key))
+            if entry is None:
+                raise requests.ConnectionError(
+                    "No recorded response for {} {}".format(
+                        request.method, request.url
+                    ),
+                    request=request,
+                )
+            self._last[key] = entry
+            self._last[path_key] = entry
+        if self.latency_scale > 0:
+            self._sleep(entry["elapsed"] * self.latency_scale)
+        return self._build_response(request, entry)
+
+    @staticmethod
+    def _next(
+        entries: Dict[RequestKey, Deque[Entry]], key: RequestKey
+    ) -> Optional[Entry]:
+        queue = entries.get(key)
+        # Both the lookups share the entries, skip the ones already replayed
+        while queue and queue[0].get("replayed"):
+            queue.popleft()
+        if not queue:
+            return None
+        entry = queue.popleft()
+        entry["replayed"] = True
+        return entry
+
+    @staticmethod
+    def _build_response(
+        request: requests.PreparedRequest, entry: Entry
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url or ""
+        response.request = request
+        response.elapsed = timedelta(seconds=entry["elapsed"])
+        if "text" in entry:
+            response._content = entry["text"].encode("utf-8")
+        else:
+            response._content = base64.b64decode(entry["content"])
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    Transport adapter recording the traffic to a cassette, or serving the
+    recorded responses without network access
+    """
+
+    cassette: Cassette
+
+    def __init__(self, cassette: Cassette, **kwargs: Any) -> None:
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(
+        self, request: requests.PreparedRequest, *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        if self.cassette.mode is CassetteMode.REPLAY:
+            return self.cassette.replay(request)
+        start = time.perf_counter()
+        response = super().send(request, *args, **kwargs)
+        # Read the body to time the whole response and store it
+        response.content
+        response.elapsed = timedelta(seconds=time.perf_counter() - start)
+        self.cassette.record(request, response)
+        return response
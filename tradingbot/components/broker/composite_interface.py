@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from ...interfaces import Market, MarketHistory, MarketMACD
+from .. import Interval
+from . import AsyncStocksInterface
+
+T = TypeVar("T")
+
+# Weight of the last sample in the latency moving average
+LATENCY_SMOOTHING = 0.2
+
+
+class ProviderStats:
+    """
+    Latency and health of a provider of the composite stocks interface
+
+        - **name**: name of the provider interface
+        - **latency**: moving average of the response time in seconds, None
+          until the first response
+        - **calls**: amount of requests sent to the provider
+        - **errors**: amount of failed requests
+        - **failures**: amount of consecutive failed requests
+        - **unhealthy_until**: clock time until the provider is avoided
+    """
+
+    name: str
+    latency: Optional[float]
+    calls: int
+    errors: int
+    failures: int
+    unhealthy_until: float
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latency = None
+        self.calls = 0
+        self.errors = 0
+        self.failures = 0
+        self.unhealthy_until = 0.0
+
+    def record_latency(self, seconds: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def record_success(self, seconds: float) -> None:
+        self.record_latency(seconds)
+        self.failures = 0
+        self.unhealthy_until = 0.0
+
+    def record_failure(self, now: float, cooldown: float) -> None:
+        self.errors += 1
+        self.failures += 1
+        self.unhealthy_until = now + cooldown
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+
+class AsyncCompositeStocksInterface(AsyncStocksInterface):
+    """
+    Stocks interface routing the requests over an ordered list of providers.
+
+    Each request goes to the fastest healthy provider, falling back to the
+    configured order until latencies are known. If it does not answer within
+    hedge_delay seconds the request is also sent to the next provider and the
+    first response wins. Failed requests are retried on the next provider and
+    the failed one is avoided for failure_cooldown seconds. The "ifc"
+    attribute refers to the first configured provider
+    """
+
+    providers: List[AsyncStocksInterface]
+    stats: List[ProviderStats]
+    hedge_delay: float
+    failure_cooldown: float
+    hedged: int
+
+    def __init__(
+        self,
+        providers: Dict[str, AsyncStocksInterface],
+        hedge_delay: float,
+        failure_cooldown: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        - **providers**: provider interfaces by name, in order of preference
+        - **hedge_delay**: seconds to wait for a response before hedging
+        - **failure_cooldown**: seconds a failed provider is avoided for
+        - **clock**: monotonic clock returning seconds
+        """
+        if len(providers) == 0:
+            raise ValueError("The composite interface needs at least a provider")
+        self.providers = list(providers.values())
+        super().__init__(self.providers[0].ifc)
+        self.stats = [ProviderStats(name) for name in providers]
+        self.hedge_delay = hedge_delay
+        self.failure_cooldown = failure_cooldown
+        self.hedged = 0
+        self._clock = clock
+
+    def ranking(self) -> List[int]:
+        """
+        Return the indexes of the providers in the order they are tried:
+        healthy ones first, fastest first, in configured order if the
+        latency is unknown
+        """
+        now = self._clock()
+
+        def key(index: int) -> Tuple[bool, float, int]:
+            stats = self.stats[index]
+            latency = float("inf") if stats.latency is None else stats.latency
+            return (not stats.is_healthy(now), latency, index)
+
+        return sorted(range(len(self.providers)), key=key)
+
+    async def _route(self, call: Callable[[AsyncStocksInterface], Awaitable[T]]) -> T:
+        """
+        Run the call on the best provider, hedging and failing over to the
+        next ones, and return the first successful result
+        """
+        queue = self.ranking()
+        pending: Dict[asyncio.Future, Tuple[int, float]] = {}
+        last_error: Optional[BaseException] = None
+        self._launch(pending, queue.pop(0), call)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=self.hedge_delay if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.hedged += 1
+                    self._launch(pending, queue.pop(0), call)
+                    continue
+                for future in done:
+                    index, started = pending.pop(future)
+                    stats = self.stats[index]
+                    error = future.exception()
+                    if error is None:
+                        stats.record_success(self._clock() - started)
+                        return future.result()
+                    stats.record_failure(self._clock(), self.failure_cooldown)
+                    logging.warning(
+                        "Stocks interface {} failed: {}".format(stats.name, error)
+                    )
+                    last_error = error
+                if not pending and queue:
+                    self._launch(pending, queue.pop(0), call)
+        finally:
+            for future, (index, started) in pending.items():
+                future.cancel()
+                # The slower provider took at least this long
+                stats = self.stats[index]
+                elapsed = self._clock() - started
+                if stats.latency is None or stats.latency < elapsed:
+                    stats.record_latency(elapsed)
+        assert last_error is not None
+        raise last_error
+
+    def _launch(
+        self,
+        pending: Dict[asyncio.Future, Tuple[int, float]],
+        index: int,
+        call: Callable[[AsyncStocksInterface], Awaitable[T]],
+    ) -> None:
+        self.stats[index].calls += 1
+        future = asyncio.ensure_future(call(self.providers[index]))
+        pending[future] = (index, self._clock())
+
+    async def get_prices(
+        self, market: Market, interval: Interval, data_range: int
+    ) -> MarketHistory:
+        return await self._route(
+            lambda ifc: ifc.get_prices(market, interval, data_range)
+        )
+
+    async def get_prices_batch(
+        self, markets: List[Market], interval: Interval, data_range: int
+    ) -> Dict[str, MarketHistory]:
+        return await self._route(
+            lambda ifc: ifc.get_prices_batch(markets, interval, data_range)
+        )
+
+    async def get_macd(
+        self, market: Market, interval: Interval, data_range: int
+    ) -> MarketMACD:
+        return await self._route(lambda ifc: ifc.get_macd(market, interval, data_range))
+
+    def start_spin(self) -> None:
+        for ifc in self.providers:
+            ifc.start_spin()
+
+    def set_market_priority(self, epic: str, priority: float) -> None:
+        for ifc in self.providers:
+            ifc.set_market_priority(epic, priority)
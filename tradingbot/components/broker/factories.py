@@ -1,11 +1,20 @@
 from enum import Enum
-from typing import TypeVar, Union
+from typing import TypeVar, Union, cast
 
 from .. import Configuration
 from . import (
     AccountInterface,
+    AsyncAccountInterface,
+    AsyncAVInterface,
+    AsyncCompositeStocksInterface,
+    AsyncIGInterface,
+    AsyncInterface,
+    AsyncPaperInterface,
+    AsyncStocksInterface,
+    AsyncYFinanceInterface,
     AVInterface,
     IGInterface,
+    PaperInterface,
     StocksInterface,
     YFinanceInterface,
 )
@@ -19,6 +28,7 @@ class InterfaceNames(Enum):
     IG_INDEX = "ig_interface"
     ALPHA_VANTAGE = "alpha_vantage"
     YAHOO_FINANCE = "yfinance"
+    COMPOSITE = "composite"
 
 
 class BrokerFactory:
@@ -34,6 +44,10 @@ class BrokerFactory:
             return AVInterface(self.config)
         elif name == InterfaceNames.YAHOO_FINANCE.value:
             return YFinanceInterface(self.config)
+        elif name == InterfaceNames.COMPOSITE.value:
+            raise ValueError(
+                "Interface {} is only available asynchronously".format(name)
+            )
         else:
             raise ValueError("Interface {} not supported".format(name))
 
@@ -45,4 +59,44 @@ class BrokerFactory:
     def make_account_interface_from_config(
         self,
     ) -> BrokerInterfaces:
+        if self.config.is_paper_trading_enabled():
+            return PaperInterface(self.config)
         return self.make(self.config.get_active_account_interface())
+
+    def make_async(self, name: str) -> AsyncInterface:
+        if name == InterfaceNames.IG_INDEX.value:
+            return AsyncIGInterface(self.config)
+        elif name == InterfaceNames.ALPHA_VANTAGE.value:
+            return AsyncAVInterface(self.config)
+        elif name == InterfaceNames.YAHOO_FINANCE.value:
+            return AsyncYFinanceInterface(self.config)
+        elif name == InterfaceNames.COMPOSITE.value:
+            return self.make_async_composite()
+        else:
+            raise ValueError("Interface {} not supported".format(name))
+
+    def make_async_composite(self) -> AsyncCompositeStocksInterface:
+        providers = {}
+        for name in self.config.get_composite_providers():
+            if name == InterfaceNames.COMPOSITE.value:
+                raise ValueError("Interface {} can't be a provider".format(name))
+            providers[name] = cast(AsyncStocksInterface, self.make_async(name))
+        return AsyncCompositeStocksInterface(
+            providers,
+            self.config.get_composite_hedge_delay(),
+            self.config.get_composite_failure_cooldown(),
+        )
+
+    def make_async_stock_interface_from_config(self) -> AsyncStocksInterface:
+        return cast(
+            AsyncStocksInterface,
+            self.make_async(self.config.get_active_stocks_interface()),
+        )
+
+    def make_async_account_interface_from_config(self) -> AsyncAccountInterface:
+        if self.config.is_paper_trading_enabled():
+            return AsyncPaperInterface(self.config)
+        return cast(
+            AsyncAccountInterface,
+            self.make_async(self.config.get_active_account_interface()),
+        )
@@ -0,0 +1,212 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Sequence, Union
+
+import pandas
+
+from ...interfaces import Market, MarketHistory, PriceWindow
+from . import EncodedPrices, PriceEncoding
+
+StoredFrame = Union[pandas.DataFrame, EncodedPrices]
+
+
+class HistoryCache:
+    """
+    Local store of the price history of each market, so that interfaces only
+    download the datapoints newer than the ones already stored.
+
+    Each entry is a dataframe indexed by date, oldest first, together with the
+    date from which its history is known to be complete and the time of the
+    last update. Entries are capped to max_rows, dropping the oldest rows.
+
+    The most recent rows of the entries read as MarketHistory are also kept
+    in a PriceWindow, updated in place with the merged rows, so that the
+    histories handed to the strategies are not copied at each spin.
+
+    Entries can be stored with a compact encoding and are decoded to float64
+    dataframes when read
+    """
+
+    max_rows: Optional[int]
+    columns: Optional[Sequence[str]]
+    window_capacity: int
+    encoding: PriceEncoding
+
+    def __init__(
+        self,
+        max_rows: Optional[int] = 10000,
+        clock: Callable[[], float] = time.time,
+        columns: Optional[Sequence[str]] = None,
+        window_capacity: int = 256,
+        encoding: PriceEncoding = PriceEncoding.FLOAT64,
+    ) -> None:
+        """
+        - **max_rows**: maximum amount of rows stored for each entry, None
+          for no limit
+        - **clock**: clock returning seconds since the epoch
+        - **columns**: names of the high, low, close and volume columns of
+          the stored rows, required to read them as MarketHistory
+        - **window_capacity**: amount of most recent rows kept in the price
+          window of each entry
+        - **encoding**: encoding of the stored entries, FLOAT64 to store the
+          dataframes as they are
+        """
+        self.max_rows = max_rows
+        self.columns = columns
+        self.window_capacity = window_capacity
+        self.encoding = encoding
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._frames: Dict[Hashable, StoredFrame] = {}
+        self._covered_from: Dict[Hashable, Optional[pandas.Timestamp]] = {}
+        self._updated_at: Dict[Hashable, float] = {}
+        self._windows: Dict[Hashable, PriceWindow] = {}
+
+    def get(self, key: Hashable) -> Optional[pandas.DataFrame]:
+        """
+        Return the stored history for the given key if any
+        """
+        with self._lock:
+            stored = self._frames.get(key)
+            return None if stored is None else self._decode(stored)
+
+    def last_date(self, key: Hashable) -> Optional[pandas.Timestamp]:
+        """
+        Return the date of the most recent stored row for the given key
+        """
+        with self._lock:
+            stored = self._frames.get(key)
+            if stored is None or len(stored) == 0:
+                return None
+            if isinstance(stored, EncodedPrices):
+                return stored.last_date()
+            return stored.index[-1]
+
+    def covers(self, key: Hashable, start: Optional[pandas.Timestamp]) -> bool:
+        """
+        Return True if the stored history is complete from the given date.
+        A start of None stands for the whole available history
+        """
+        with self._lock:
+            if key not in self._frames:
+                return False
+            covered_from = self._covered_from[key]
+            if covered_from is None:
+                return True
+            return start is not None and covered_from <= start
+
+    def updated_at(self, key: Hashable) -> Optional[float]:
+        """
+        Return the time of the last update of the given key
+        """
+        with self._lock:
+            return self._updated_at.get(key)
+
+    def merge(
+        self,
+        key: Hashable,
+        frame: pandas.DataFrame,
+        start: Optional[pandas.Timestamp],
+    ) -> pandas.DataFrame:
+        """
+        Merge freshly downloaded rows into the stored history and return it.
+        Rows with the same date are replaced by the fresh ones
+
+            - **key**: identifier of the history, e.g. symbol and interval
+            - **frame**: downloaded rows indexed by date
+            - **start**: date the download started from, None if the whole
+              available history was downloaded
+        """
+        fresh = frame.sort_index()
+        with self._lock:
+            stored = self._load(key)
+            covered_from = start
+            if stored is not None and len(stored) > 0:
+                old_start = self._covered_from[key]
+                # The fresh rows extend the stored ones only if they overlap
+                if start is not None and start <= stored.index[-1]:
+                    if old_start is None or old_start < start:
+                        covered_from = old_start
+                frame = pandas.concat([stored, frame])
+                frame = frame[~frame.index.duplicated(keep="last")]
+            frame = frame.sort_index()
+            if self.max_rows is not None and len(frame) > self.max_rows:
+                frame = frame.tail(self.max_rows)
+                covered_from = frame.index[0]
+            if self.encoding is PriceEncoding.FLOAT64:
+                self._frames[key] = frame
+            else:
+                self._frames[key] = EncodedPrices(frame, self.encoding)
+            self._covered_from[key] = covered_from
+            self._updated_at[key] = self._clock()
+            window = self._windows.get(key)
+            if window is not None:
+                last_date = window.last_date()
+                if (
+                    len(fresh) > 0
+                    and last_date is not None
+                    and fresh.index[0] < last_date
+                ):
+                    # Rows older than the window changed, fill it again
+                    window.clear()
+                    self._extend(window, frame)
+                else:
+                    self._extend(window, fresh)
+            return frame
+
+    def history(
+        self, key: Hashable, market: Market, datapoints: Optional[int]
+    ) -> Optional[MarketHistory]:
+        """
+        Return the most recent datapoints of the stored history, or the whole
+        history if None. Up to window_capacity datapoints are a view of the
+        price window of the entry, larger histories are copied
+
+            - Returns **None** if the key is not stored
+        """
+        if self.columns is None:
+            raise ValueError("Price columns of the history cache not configured")
+        with self._lock:
+            stored = self._frames.get(key)
+            if stored is None:
+                return None
+            if datapoints is not None and datapoints <= self.window_capacity:
+                window = self._windows.get(key)
+                if window is None:
+                    window = self._windows[key] = PriceWindow(self.window_capacity)
+                    first = len(stored) - self.window_capacity
+                    self._extend(window, self._decode(stored, first))
+                return window.history(market, datapoints)
+            first = 0 if datapoints is None else len(stored) - datapoints
+            frame = self._decode(stored, first)
+            return MarketHistory(
+                market, frame.index, *[frame[c].values for c in self.columns]
+            )
+
+    def _load(self, key: Hashable) -> Optional[pandas.DataFrame]:
+        stored = self._frames.get(key)
+        return None if stored is None else self._decode(stored)
+
+    @staticmethod
+    def _decode(stored: StoredFrame, first: int = 0) -> pandas.DataFrame:
+        """
+        Return the stored rows from the given one as a dataframe
+        """
+        first = max(first, 0)
+        if isinstance(stored, EncodedPrices):
+            return stored.decode(first)
+        return stored.iloc[first:] if first > 0 else stored
+
+    def _extend(self, window: PriceWindow, frame: pandas.DataFrame) -> None:
+        if self.columns is not None:
+            window.extend(frame.index, *[frame[c].values for c in self.columns])
+
+    def clear(self) -> None:
+        """
+        Drop all the stored histories
+        """
+        with self._lock:
+            self._frames.clear()
+            self._covered_from.clear()
+            self._updated_at.clear()
+            self._windows.clear()
@@ -1,14 +1,25 @@
 import json
 import logging
+from datetime import datetime, timedelta
 from enum import Enum
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import pandas
-import requests
+import numpy
 
+from ...indicators import IndicatorEngine
 from ...interfaces import Market, MarketHistory, MarketMACD, Position
 from .. import Interval, TradeDirection, Utils
-from . import AccountBalances, AccountInterface, StocksInterface
+from ..time_provider import TimeProvider
+from . import (
+    AccountBalances,
+    AccountInterface,
+    AllowancePlanner,
+    IGPriceType,
+    StocksInterface,
+    json_loads,
+    parse_ig_prices,
+)
 
 
 class IG_API_URL(Enum):
@@ -36,6 +47,8 @@ class IGInterface(AccountInterface, StocksInterface):
 
     api_base_url: str
     authenticated_headers: Dict[str, str]
+    allowance_planner: Optional[AllowancePlanner]
+    price_type: IGPriceType
 
     def initialise(self) -> None:
         logging.info("initialising IGInterface...")
@@ -44,8 +57,26 @@ class IGInterface(AccountInterface, StocksInterface):
             if self._config.get_ig_use_demo_account()
             else ""
         )
-        self.api_base_url = IG_API_URL.BASE_URI.value.replace("@", demoPrefix)
+        self.api_base_url = self._config.get_ig_api_base_url() or (
+            IG_API_URL.BASE_URI.value.replace("@", demoPrefix)
+        )
         self.authenticated_headers = {}
+        self._rate_limiter.interval = self._config.get_ig_api_timeout()
+        # Spread the trading requests budget keeping half of it for bursts,
+        # so that any minute never exceeds the budget
+        trading_budget = self._config.get_ig_trading_requests_per_minute()
+        self._trading_rate_limiter.interval = 120.0 / trading_budget
+        self._trading_rate_limiter.burst = max(trading_budget // 2, 1)
+        self.price_type = IGPriceType(self._config.get_ig_price_type())
+        self.allowance_planner = None
+        if self._config.get_ig_plan_allowance():
+            self.allowance_planner = AllowancePlanner(
+                self._config.get_spin_interval(),
+                self._config.get_ig_allowance_reserve(),
+                market_seconds=self._open_market_seconds,
+            )
+        filepath = self._config.get_indicators_state_filepath()
+        self.indicators = IndicatorEngine(Path(filepath) if filepath else None)
         if self._config.is_paper_trading_enabled():
             logging.info("Paper trading is active")
         if not self.authenticate():
@@ -67,7 +98,7 @@ class IGInterface(AccountInterface, StocksInterface):
             "Version": "2",
         }
         url = "{}/{}".format(self.api_base_url, IG_API_URL.SESSION.value)
-        response = requests.post(url, data=json.dumps(data), headers=headers)
+        response = self._transport.post(url, data=json.dumps(data), headers=headers)
 
         if response.status_code != 200:
             logging.debug(
@@ -102,7 +133,7 @@ class IGInterface(AccountInterface, StocksInterface):
         """
         url = "{}/{}".format(self.api_base_url, IG_API_URL.SESSION.value)
         data = {"accountId": accountId, "defaultAccount": "True"}
-        response = requests.put(
+        response = self._transport.put(
             url, data=json.dumps(data), headers=self.authenticated_headers
         )
 
@@ -155,6 +186,8 @@ class IGInterface(AccountInterface, StocksInterface):
                     market_id=None,
                 )
             )
+        if self.allowance_planner is not None:
+            self.allowance_planner.set_held_epics([p.epic for p in positions])
         return positions
 
     def get_positions_map(self) -> Dict[str, int]:
@@ -188,19 +221,19 @@ class IGInterface(AccountInterface, StocksInterface):
             raise RuntimeError("Multiple matches found for epic: {}".format(epic_id))
         if self._config.get_ig_controlled_risk():
             info["minNormalStopOrLimitDistance"] = info["minControlledRiskStopDistance"]
-        market = Market()
-        market.epic = info["instrument"]["epic"]
-        market.id = info["instrument"]["marketId"]
-        market.name = info["instrument"]["name"]
-        market.bid = info["snapshot"]["bid"]
-        market.offer = info["snapshot"]["offer"]
-        market.high = info["snapshot"]["high"]
-        market.low = info["snapshot"]["low"]
-        market.stop_distance_min = info["dealingRules"]["minNormalStopOrLimitDistance"][
-            "value"
-        ]
-        market.expiry = info["instrument"]["expiry"]
-        return market
+        return Market(
+            epic=info["instrument"]["epic"],
+            id=info["instrument"]["marketId"],
+            name=info["instrument"]["name"],
+            bid=info["snapshot"]["bid"],
+            offer=info["snapshot"]["offer"],
+            high=info["snapshot"]["high"],
+            low=info["snapshot"]["low"],
+            stop_distance_min=info["dealingRules"]["minNormalStopOrLimitDistance"][
+                "value"
+            ],
+            expiry=info["instrument"]["expiry"],
+        )
 
     def search_market(self, search: str) -> List[Market]:
         """
@@ -218,6 +251,19 @@ class IGInterface(AccountInterface, StocksInterface):
     def get_prices(
         self, market: Market, interval: Interval, data_range: int
     ) -> MarketHistory:
+        planner = self.allowance_planner
+        cache_key = (market.epic, str(interval), data_range)
+        if planner is not None:
+            cached = planner.cached(cache_key)
+            if not planner.should_fetch(market.epic, data_range, cached is not None):
+                if cached is None:
+                    raise RuntimeError(
+                        "IG historical data allowance exhausted for {}".format(
+                            market.epic
+                        )
+                    )
+                logging.info("Using cached prices for {}".format(market.epic))
+                return cached
         url = "{}/{}/{}/{}/{}".format(
             self.api_base_url,
             IG_API_URL.PRICES.value,
@@ -225,29 +271,48 @@ class IGInterface(AccountInterface, StocksInterface):
             interval,
             data_range,
         )
-        data = self._http_get(url)
-        if "allowance" in data:
-            remaining_allowance = data["allowance"]["remainingAllowance"]
-            reset_time = Utils.humanize_time(int(data["allowance"]["allowanceExpiry"]))
+        prices = parse_ig_prices(self._http_get_content(url), self.price_type)
+        if prices.allowance is not None:
+            remaining_allowance = prices.allowance["remainingAllowance"]
+            reset_time = Utils.humanize_time(int(prices.allowance["allowanceExpiry"]))
             if remaining_allowance < 100:
                 logging.warn(
                     "Remaining API calls left: {}".format(str(remaining_allowance))
                 )
                 logging.warn("Time to API Key reset: {}".format(str(reset_time)))
-        dates = []
-        highs = []
-        lows = []
-        closes = []
-        volumes = []
-        for price in data["prices"]:
-            dates.append(price["snapshotTimeUTC"])
-            highs.append(price["highPrice"]["bid"])
-            lows.append(price["lowPrice"]["bid"])
-            closes.append(price["closePrice"]["bid"])
-            volumes.append(float(price["lastTradedVolume"]))
-        history = MarketHistory(market, dates, highs, lows, closes, volumes)
+            if planner is not None:
+                planner.update(prices.allowance)
+        history = MarketHistory(
+            market, prices.dates, prices.high, prices.low, prices.close, prices.volume
+        )
+        if planner is not None:
+            planner.record_fetch(market.epic, data_range)
+            planner.store(cache_key, history)
         return history
 
+    def _open_market_seconds(self, seconds: float) -> float:
+        now = datetime.now()
+        return TimeProvider().get_open_market_seconds(
+            now, now + timedelta(seconds=seconds)
+        )
+
+    def start_spin(self) -> None:
+        """
+        Notify the start of a new spin to the allowance planner and checkpoint
+        the indicators updated in the previous one
+        """
+        if self.allowance_planner is not None:
+            self.allowance_planner.start_spin()
+        self.indicators.save()
+
+    def set_market_priority(self, epic: str, priority: float) -> None:
+        """
+        Flag a market as close to a trade signal so that the allowance planner
+        keeps its prices fresh
+        """
+        if self.allowance_planner is not None:
+            self.allowance_planner.set_priority(epic, priority)
+
     def trade(
         self, epic_id: str, trade_direction: TradeDirection, limit: float, stop: float
     ) -> bool:
@@ -268,6 +333,43 @@ class IGInterface(AccountInterface, StocksInterface):
             )
             return True
 
+        deal_ref = self.submit_order(epic_id, trade_direction, limit, stop)
+        if deal_ref is None:
+            return False
+        if self.confirm_order(deal_ref):
+            logging.info(
+                "Order {} for {} confirmed with limit={} and stop={}".format(
+                    trade_direction.value, epic_id, limit, stop
+                )
+            )
+            return True
+        else:
+            logging.warning(
+                "Trade {} of {} has failed!".format(trade_direction.value, epic_id)
+            )
+            return False
+
+    def submit_order(
+        self, epic_id: str, trade_direction: TradeDirection, limit: float, stop: float
+    ) -> Optional[str]:
+        """
+        Submit a new trade for the given epic without waiting for its confirmation
+
+            - **epic_id**: market epic as string
+            - **trade_direction**: BUY or SELL
+            - **limit**: limit level
+            - **stop**: stop level
+            - Returns the deal reference or None if an error occurs or
+              paper trading is enabled
+        """
+        if self._config.is_paper_trading_enabled():
+            logging.info(
+                "Paper trade: {} {} with limit={} and stop={}".format(
+                    trade_direction.value, epic_id, limit, stop
+                )
+            )
+            return None
+
         url = "{}/{}".format(self.api_base_url, IG_API_URL.POSITIONS_OTC.value)
         data = {
             "direction": trade_direction.value,
@@ -282,27 +384,16 @@ class IGInterface(AccountInterface, StocksInterface):
             "stopLevel": stop,
         }
 
-        r = requests.post(
+        self._trading_rate_limiter.acquire()
+        r = self._transport.post(
             url, data=json.dumps(data), headers=self.authenticated_headers
         )
 
         if r.status_code != 200:
-            return False
+            return None
 
         d = json.loads(r.text)
-        deal_ref = d["dealReference"]
-        if self.confirm_order(deal_ref):
-            logging.info(
-                "Order {} for {} confirmed with limit={} and stop={}".format(
-                    trade_direction.value, epic_id, limit, stop
-                )
-            )
-            return True
-        else:
-            logging.warning(
-                "Trade {} of {} has failed!".format(trade_direction.value, epic_id)
-            )
-            return False
+        return d["dealReference"]
 
     def confirm_order(self, dealRef: str) -> bool:
         """
@@ -311,8 +402,7 @@ class IGInterface(AccountInterface, StocksInterface):
             - **dealRef**: dealing reference to confirm
             - Returns **False** if an error occurs otherwise True
         """
-        url = "{}/{}/{}".format(self.api_base_url, IG_API_URL.CONFIRMS.value, dealRef)
-        d = self._http_get(url)
+        d = self.get_deal_confirmation(dealRef)
 
         if d is not None:
             if d["reason"] != "SUCCESS":
@@ -321,6 +411,17 @@ class IGInterface(AccountInterface, StocksInterface):
                 return True
         return False
 
+    def get_deal_confirmation(self, deal_ref: str) -> Dict[str, Any]:
+        """
+        Fetch the confirmation of a deal
+
+            - **deal_ref**: dealing reference returned when the deal was submitted
+            - Returns the confirmation json object
+            - Raise an exception if the confirmation is not available yet
+        """
+        url = "{}/{}/{}".format(self.api_base_url, IG_API_URL.CONFIRMS.value, deal_ref)
+        return self._http_get(url)
+
     def close_position(self, position: Position) -> bool:
         """
         Close the given market position
@@ -331,6 +432,28 @@ class IGInterface(AccountInterface, StocksInterface):
         if self._config.is_paper_trading_enabled():
             logging.info("Paper trade: close {} position".format(position.epic))
             return True
+        deal_ref = self.submit_close(position)
+        if deal_ref is None:
+            return False
+        if self.confirm_order(deal_ref):
+            logging.info("Position  for {} closed".format(position.epic))
+            return True
+        else:
+            logging.error("Could not close position for {}".format(position.epic))
+            return False
+
+    def submit_close(self, position: Position) -> Optional[str]:
+        """
+        Submit the closure of the given position without waiting for its
+        confirmation
+
+            - **position**: position json object obtained from IG API
+            - Returns the deal reference or None if an error occurs or
+              paper trading is enabled
+        """
+        if self._config.is_paper_trading_enabled():
+            logging.info("Paper trade: close {} position".format(position.epic))
+            return None
         # To close we need the opposite direction
         direction = TradeDirection.NONE
         if position.direction is TradeDirection.BUY:
@@ -339,7 +462,7 @@ class IGInterface(AccountInterface, StocksInterface):
             direction = TradeDirection.BUY
         else:
             logging.error("Wrong position direction!")
-            return False
+            return None
 
         url = "{}/{}".format(self.api_base_url, IG_API_URL.POSITIONS_OTC.value)
         data = {
@@ -355,17 +478,12 @@ class IGInterface(AccountInterface, StocksInterface):
         }
         del_headers = dict(self.authenticated_headers)
         del_headers["_method"] = "DELETE"
-        r = requests.post(url, data=json.dumps(data), headers=del_headers)
+        self._trading_rate_limiter.acquire()
+        r = self._transport.post(url, data=json.dumps(data), headers=del_headers)
         if r.status_code != 200:
-            return False
+            return None
         d = json.loads(r.text)
-        deal_ref = d["dealReference"]
-        if self.confirm_order(deal_ref):
-            logging.info("Position  for {} closed".format(position.epic))
-            return True
-        else:
-            logging.error("Could not close position for {}".format(position.epic))
-            return False
+        return d["dealReference"]
 
     def close_all_positions(self) -> bool:
         """
@@ -442,18 +560,26 @@ class IGInterface(AccountInterface, StocksInterface):
                 break
         return markets
 
-    def _http_get(self, url: str) -> Dict[str, Any]:
+    def _http_get_content(self, url: str) -> bytes:
         """
         Perform an HTTP GET request to the url.
-        Return the json object returned from the API if 200 is received
-        Return None if an error is received from the API
+        Return the raw body of the response if 200 is received
+        Raise an exception if an error is received from the API
         """
         self._wait_before_call(self._config.get_ig_api_timeout())
-        response = requests.get(url, headers=self.authenticated_headers)
+        response = self._transport.get(url, headers=self.authenticated_headers)
         if response.status_code != 200:
             logging.error("HTTP request returned {}".format(response.status_code))
             raise RuntimeError("HTTP request returned {}".format(response.status_code))
-        data = json.loads(response.text)
+        return response.content
+
+    def _http_get(self, url: str) -> Dict[str, Any]:
+        """
+        Perform an HTTP GET request to the url.
+        Return the json object returned from the API if 200 is received
+        Return None if an error is received from the API
+        """
+        data = json_loads(self._http_get_content(url))
         if "errorCode" in data:
             logging.error(data["errorCode"])
             raise RuntimeError(data["errorCode"])
@@ -462,20 +588,8 @@ class IGInterface(AccountInterface, StocksInterface):
     def get_macd(
         self, market: Market, interval: Interval, data_range: int
     ) -> MarketMACD:
-        data = self._macd_dataframe(market, interval)
-        # TODO Put date instead of index numbers
-        return MarketMACD(
-            market,
-            data.index,
-            data["MACD"].values,
-            data["Signal"].values,
-            data["Hist"].values,
-        )
-
-    def _macd_dataframe(self, market: Market, interval: Interval) -> pandas.DataFrame:
         prices = self.get_prices(market, Interval.DAY, 26)
-        if prices is None:
-            return None
-        return Utils.macd_df_from_list(
-            prices.dataframe[MarketHistory.CLOSE_COLUMN].values
-        )
+        # Only the new bars are computed, on top of the bars of previous spins
+        dates, values = self.indicators.series(prices, Interval.DAY.value, "macd")
+        macd, signal, hist = numpy.array(values, dtype=float).reshape(-1, 3).T
+        return MarketMACD(market, dates, macd, signal, hist)
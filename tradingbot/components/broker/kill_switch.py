@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from ...interfaces import Position
+from . import AsyncAccountInterface, BrokerMetrics
+
+
+class KillSwitchReport:
+    """
+    Outcome of a KillSwitch run
+
+        - **closed**: positions no longer open
+        - **still_open**: positions that could not be closed
+        - **attempts**: close requests submitted for each deal id
+        - **elapsed**: seconds taken by the run
+    """
+
+    closed: List[Position]
+    still_open: List[Position]
+    attempts: Dict[str, int]
+    elapsed: float
+
+    def __init__(
+        self,
+        closed: List[Position],
+        still_open: List[Position],
+        attempts: Dict[str, int],
+        elapsed: float,
+    ) -> None:
+        self.closed = closed
+        self.still_open = still_open
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    def success(self) -> bool:
+        return len(self.still_open) == 0
+
+
+class KillSwitch:
+    """
+    Close all the open positions as fast as the trading requests budget allows.
+
+    The closures are submitted concurrently, with bounded parallelism, and
+    then the open positions are polled until the closed deals disappear,
+    instead of confirming each deal on its own. Positions still open when the
+    confirmation timeout expires are submitted again, up to max_retries times,
+    so the run takes as long as the slowest closure rather than their sum
+    """
+
+    def __init__(
+        self,
+        account_ifc: AsyncAccountInterface,
+        max_parallel: int,
+        max_retries: int,
+        poll_interval: float,
+        timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Optional[BrokerMetrics] = None,
+    ) -> None:
+        """
+        - **account_ifc**: interface used to close the positions
+        - **max_parallel**: maximum amount of close requests in flight
+        - **max_retries**: maximum amount of close requests for each position
+        - **poll_interval**: seconds between two polls of the open positions
+        - **timeout**: seconds to wait for the submitted closures each attempt
+        - **clock**: monotonic clock returning seconds
+        - **metrics**: metrics counting the repeated close requests
+        """
+        self.account_ifc = account_ifc
+        self.metrics = metrics
+        self.max_parallel = max(max_parallel, 1)
+        self.max_retries = max(max_retries, 1)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._clock = clock
+
+    async def run(self, positions: Optional[List[Position]] = None) -> KillSwitchReport:
+        """
+        Close the given positions or all the open positions if None
+        """
+        start = self._clock()
+        if positions is None:
+            positions = await self.account_ifc.get_open_positions()
+        targets = {p.deal_id: p for p in positions}
+        remaining = dict(targets)
+        attempts = {deal_id: 0 for deal_id in targets}
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def close(position: Position) -> None:
+            async with semaphore:
+                attempts[position.deal_id] += 1
+                if attempts[position.deal_id] > 1 and self.metrics is not None:
+                    self.metrics.add_retry("KillSwitch.close")
+                try:
+                    deal_ref = await self.account_ifc.submit_close(position)
+                except Exception as e:
+                    deal_ref = None
+                    logging.debug("Close of {} failed: {}".format(position.deal_id, e))
+                if deal_ref is None:
+                    logging.warning(
+                        "Unable to submit the close of {} ({})".format(
+                            position.deal_id, position.epic
+                        )
+                    )
+
+        for attempt in range(self.max_retries):
+            if not remaining:
+                break
+            logging.info(
+                "Closing {} positions, attempt {}".format(len(remaining), attempt + 1)
+            )
+            await asyncio.gather(*[close(p) for p in remaining.values()])
+            remaining = await self._wait_closed(remaining)
+
+        report = KillSwitchReport(
+            [p for deal_id, p in targets.items() if deal_id not in remaining],
+            list(remaining.values()),
+            attempts,
+            self._clock() - start,
+        )
+        for p in report.still_open:
+            logging.error("Position {} ({}) is still open".format(p.deal_id, p.epic))
+        return report
+
+    async def _wait_closed(self, remaining: Dict[str, Position]) -> Dict[str, Position]:
+        """
+        Poll the open positions until the given ones are closed or the timeout
+        expires and return the ones still open
+        """
+        deadline = self._clock() + self.timeout
+        while remaining:
+            try:
+                open_ids = {
+                    p.deal_id for p in await self.account_ifc.get_open_positions()
+                }
+                remaining = {k: p for k, p in remaining.items() if k in open_ids}
+            except Exception as e:
+                logging.debug("Unable to fetch open positions: {}".format(e))
+            if not remaining or self._clock() >= deadline:
+                break
+            await asyncio.sleep(self.poll_interval)
+        return remaining
@@ -0,0 +1,231 @@
+import bisect
+import re
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# Upper bounds in seconds of the latency histogram buckets: 1ms to ~65s
+LATENCY_BUCKETS = [0.001 * 2**i for i in range(17)]
+# Path segments kept in the endpoint names, the others are identifiers
+ENDPOINT_SEGMENT = re.compile(r"^[a-z_-]+$")
+
+
+class Histogram:
+    """
+    Latency distribution over fixed exponential buckets, so that observing a
+    sample is cheap and the memory used does not grow with the samples
+    """
+
+    counts: List[int]
+    count: int
+    total: float
+    max: float
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Return the upper bound of the bucket containing the q-th percentile,
+        capped to the largest sample
+
+            - **q**: percentile between 0 and 100
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count > 0:
+                bound = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+
+class EndpointMetrics:
+    """
+    Counters of an API endpoint or of a broker operation
+
+        - **latency**: histogram of the call durations
+        - **errors**: amount of failed calls
+        - **bytes_sent**, **bytes_received**: size of the request and response
+          bodies
+        - **retries**: amount of calls repeated after a failure or a timeout
+        - **coalesced**: amount of calls served by an identical call in flight
+        - **rate_limit_wait**: seconds spent waiting for the rate limiter
+    """
+
+    latency: Histogram
+    errors: int
+    bytes_sent: int
+    bytes_received: int
+    retries: int
+    coalesced: int
+    rate_limit_wait: float
+
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.rate_limit_wait = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.latency.count,
+            "errors": self.errors,
+            "mean": self.latency.mean(),
+            "p50": self.latency.percentile(50),
+            "p90": self.latency.percentile(90),
+            "p99": self.latency.percentile(99),
+            "max": self.latency.max,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "rate_limit_wait": self.rate_limit_wait,
+        }
+
+
+class BrokerMetrics:
+    """
+    Thread safe registry of the metrics of the broker layer, by endpoint.
+
+    HTTP requests are named after their method, host and path, with the
+    identifiers in the path replaced by "*". Interface methods and broker
+    operations are named after their class and method
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+
+    @staticmethod
+    def http_endpoint(method: str, url: str) -> str:
+        """
+        Return the endpoint name of an HTTP request
+        """
+        parts = urlsplit(url)
+        segments = [
+            s if ENDPOINT_SEGMENT.match(s) else "*"
+            for s in parts.path.split("/")
+            if s != ""
+        ]
+        return "{} {}/{}".format(method, parts.netloc, "/".join(segments))
+
+    def _get(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics()
+        return metrics
+
+    def observe(
+        self,
+        endpoint: str,
+        seconds: float,
+        error: bool = False,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """
+        Record a completed call of the endpoint
+        """
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.latency.observe(seconds)
+            if error:
+                metrics.errors += 1
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+
+    def add_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._get(endpoint).retries += 1
+
+    def add_coalesced(self, endpoint: str) -> None:
+        with self._lock:
+            self._get(endpoint).coalesced += 1
+
+    def add_rate_limit_wait(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._get(endpoint).rate_limit_wait += seconds
+
+    def get(self, endpoint: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the metrics of the endpoint or None if it has not been used
+        """
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            return None if metrics is None else metrics.to_dict()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the metrics of all the endpoints, sorted by name
+        """
+        with self._lock:
+            return {
+                name: self._endpoints[name].to_dict()
+                for name in sorted(self._endpoints)
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def report(self) -> str:
+        """
+        Return the metrics of all the endpoints as a text table, latencies
+        in milliseconds and sizes in KB
+        """
+        header = "{:<60} {:>6} {:>5} {:>8} {:>8} {:>8} {:>9} {:>9} {:>5} {:>5} {:>8}"
+        row = (
+            "{:<60} {:>6d} {:>5d} {:>8.1f} {:>8.1f} {:>8.1f} {:>9.1f} {:>9.1f}"
+            " {:>5d} {:>5d} {:>8.1f}"
+        )
+        lines = [
+            header.format(
+                "endpoint",
+                "calls",
+                "err",
+                "p50",
+                "p99",
+                "max",
+                "sent",
+                "recv",
+                "retry",
+                "coal",
+                "wait",
+            )
+        ]
+        for name, m in self.snapshot().items():
+            lines.append(
+                row.format(
+                    name[:60],
+                    m["calls"],
+                    m["errors"],
+                    m["p50"] * 1000,
+                    m["p99"] * 1000,
+                    m["max"] * 1000,
+                    m["bytes_sent"] / 1024,
+                    m["bytes_received"] / 1024,
+                    m["retries"],
+                    m["coalesced"],
+                    m["rate_limit_wait"] * 1000,
+                )
+            )
+        return "\n".join(lines)
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .. import TradeDirection
+from . import AsyncAccountInterface, BrokerMetrics
+
+
+class PendingDeal:
+    """
+    Deal submitted to the broker and waiting for its confirmation
+    """
+
+    deal_reference: str
+    epic: str
+    direction: TradeDirection
+    submitted_at: float
+
+    def __init__(
+        self,
+        deal_reference: str,
+        epic: str,
+        direction: TradeDirection,
+        submitted_at: float,
+    ) -> None:
+        self.deal_reference = deal_reference
+        self.epic = epic
+        self.direction = direction
+        self.submitted_at = submitted_at
+
+
+class DealResult:
+    """
+    Outcome of a submitted deal
+
+        - **accepted**: True if the broker confirmed the deal
+        - **reason**: reason reported by the broker or CONFIRMATION_TIMEOUT
+        - **deal_id**: id of the deal if accepted
+        - **latency**: seconds between the submission and the confirmation
+    """
+
+    deal_reference: str
+    epic: str
+    direction: TradeDirection
+    accepted: bool
+    reason: str
+    deal_id: Optional[str]
+    latency: float
+
+    def __init__(self, **kargs: Any) -> None:
+        self.deal_reference = kargs["deal_reference"]
+        self.epic = kargs["epic"]
+        self.direction = kargs["direction"]
+        self.accepted = kargs["accepted"]
+        self.reason = kargs["reason"]
+        self.deal_id = kargs["deal_id"]
+        self.latency = kargs["latency"]
+
+
+DealListener = Callable[[DealResult], None]
+
+# Amount of order-to-confirm latencies kept
+LATENCY_SAMPLES = 1000
+
+
+class OrderPipeline:
+    """
+    Submit deals right away and resolve their confirmations concurrently.
+    Submitted deals are kept in a pending table until their confirmation is
+    received, then the result is notified to the registered listeners
+    """
+
+    pending: Dict[str, PendingDeal]
+    latencies: Deque[float]
+
+    def __init__(
+        self,
+        account_ifc: AsyncAccountInterface,
+        poll_interval: float,
+        timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Optional[BrokerMetrics] = None,
+    ) -> None:
+        """
+        - **account_ifc**: interface used to submit and confirm the deals
+        - **poll_interval**: seconds between two confirmation requests
+        - **timeout**: seconds after which a deal is considered not confirmed
+        - **clock**: monotonic clock returning seconds
+        - **metrics**: metrics counting the repeated confirmation requests
+        """
+        self.account_ifc = account_ifc
+        self.metrics = metrics
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.pending = {}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._clock = clock
+        self._listeners: List[DealListener] = []
+        self._tasks: Dict[str, "asyncio.Task[DealResult]"] = {}
+
+    def add_listener(self, listener: DealListener) -> None:
+        """
+        Register a function called with the DealResult of every deal
+        """
+        self._listeners.append(listener)
+
+    def is_pending(self, epic: str) -> bool:
+        """
+        Return True if a deal for the given market is waiting for confirmation
+        """
+        return any(deal.epic == epic for deal in tuple(self.pending.values()))
+
+    async def submit(
+        self, epic: str, direction: TradeDirection, limit: float, stop: float
+    ) -> Optional[str]:
+        """
+        Submit a deal and schedule its confirmation without waiting for it
+
+            - Returns the deal reference or None if the deal was not submitted
+        """
+        submitted_at = self._clock()
+        deal_ref = await self.account_ifc.submit_order(epic, direction, limit, stop)
+        if deal_ref is None:
+            return None
+        deal = PendingDeal(deal_ref, epic, direction, submitted_at)
+        self.pending[deal_ref] = deal
+        self._tasks[deal_ref] = asyncio.ensure_future(self._confirm(deal))
+        return deal_ref
+
+    async def join(self) -> List[DealResult]:
+        """
+        Wait for all the pending deals to be resolved
+        """
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return []
+        return list(await asyncio.gather(*tasks))
+
+    async def _confirm(self, deal: PendingDeal) -> DealResult:
+        confirmation = None
+        while confirmation is None:
+            try:
+                confirmation = await self.account_ifc.get_deal_confirmation(
+                    deal.deal_reference
+                )
+            except Exception as e:
+                # Not available yet or transient error: poll again
+                logging.debug(
+                    "Confirmation of {} not available: {}".format(
+                        deal.deal_reference, e
+                    )
+                )
+                if self._clock() - deal.submitted_at >= self.timeout:
+                    break
+                if self.metrics is not None:
+                    self.metrics.add_retry("OrderPipeline.confirm")
+                await asyncio.sleep(self.poll_interval)
+        latency = self._clock() - deal.submitted_at
+        if confirmation is not None:
+            result = DealResult(
+                deal_reference=deal.deal_reference,
+                epic=deal.epic,
+                direction=deal.direction,
+                accepted=confirmation.get("reason") == "SUCCESS",
+                reason=confirmation.get("reason"),
+                deal_id=confirmation.get("dealId"),
+                latency=latency,
+            )
+        else:
+            result = DealResult(
+                deal_reference=deal.deal_reference,
+                epic=deal.epic,
+                direction=deal.direction,
+                accepted=False,
+                reason="CONFIRMATION_TIMEOUT",
+                deal_id=None,
+                latency=latency,
+            )
+        self._resolve(result)
+        return result
+
+    def _resolve(self, result: DealResult) -> None:
+        self.pending.pop(result.deal_reference, None)
+        self._tasks.pop(result.deal_reference, None)
+        self.latencies.append(result.latency)
+        logging.info(
+            "Deal {} {} of {}: {} after {:.3f}s".format(
+                result.deal_reference,
+                result.direction.value,
+                result.epic,
+                result.reason,
+                result.latency,
+            )
+        )
+        for listener in self._listeners:
+            try:
+                listener(result)
+            except Exception as e:
+                logging.error("Deal listener error: {}".format(e))
@@ -0,0 +1,286 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ...interfaces import Market, Position
+from .. import TradeDirection, Utils
+from . import AccountBalances, AccountInterface, IGInterface
+
+# Reason of the confirmation of the accepted deals, as reported by IG
+DEAL_SUCCESS = "SUCCESS"
+
+
+class PaperInterface(AccountInterface):
+    """
+    In-memory account simulating the trades when paper trading is enabled.
+
+    Market snapshots, searches, watchlists and market navigation come from
+    the configured account interface, while positions, deals and balances
+    never leave this class. Deals are filled at the snapshot offer when
+    buying and at the snapshot bid when selling. Stops and limits of the
+    open positions are checked against every snapshot fetched through this
+    interface, closing the positions at the stop or limit level.
+    The account state is saved after each change and restored on start
+    """
+
+    market_data: AccountInterface
+    balance: float
+    margin_factor: float
+    state_filepath: Optional[Path]
+
+    def initialise(self) -> None:
+        logging.info("Initialising PaperInterface...")
+        self.market_data = self._make_market_data()
+        self.margin_factor = self._config.get_paper_account_margin_factor()
+        filepath = self._config.get_paper_account_state_filepath()
+        self.state_filepath = Path(filepath) if filepath else None
+        self._lock = threading.RLock()
+        self.balance = self._config.get_paper_account_balance()
+        self._positions: Dict[str, Position] = {}
+        self._confirms: Dict[str, Dict[str, Any]] = {}
+        self._deals = 0
+        self._load()
+
+    def _make_market_data(self) -> AccountInterface:
+        name = self._config.get_active_account_interface()
+        if name == "ig_interface":
+            return IGInterface(self._config)
+        raise ValueError("Interface {} not supported".format(name))
+
+    def authenticate(self) -> bool:
+        return True
+
+    def set_default_account(self, account_id: str) -> bool:
+        return True
+
+    def get_account_balances(self) -> AccountBalances:
+        """
+        Return the simulated balance and the margin held by the open positions
+        """
+        with self._lock:
+            deposit = sum(
+                p.level * p.size * self.margin_factor for p in self._positions.values()
+            )
+            return self.balance, deposit
+
+    def get_open_positions(self) -> List[Position]:
+        with self._lock:
+            return list(self._positions.values())
+
+    def get_positions_map(self) -> Dict[str, int]:
+        positions_map: Dict[str, int] = {}
+        for item in self.get_open_positions():
+            key = item.epic + "-" + item.direction.name
+            positions_map[key] = positions_map.get(key, 0) + item.size
+        return positions_map
+
+    def get_market_info(self, market_ticker: str) -> Market:
+        market = self.market_data.get_market_info(market_ticker)
+        self.update_market(market)
+        return market
+
+    def search_market(self, search_string: str) -> List[Market]:
+        markets = self.market_data.search_market(search_string)
+        for market in markets:
+            self.update_market(market)
+        return markets
+
+    def update_market(self, market: Market) -> None:
+        """
+        Close the positions of the market whose stop or limit has been hit
+        by the given snapshot
+        """
+        with self._lock:
+            hit = [p for p in self._positions.values() if p.epic == market.epic]
+            closed = False
+            for position in hit:
+                if position.direction is TradeDirection.BUY:
+                    hit_stop = market.bid <= position.stop
+                    hit_limit = market.bid >= position.limit
+                else:
+                    hit_stop = market.offer >= position.stop
+                    hit_limit = market.offer <= position.limit
+                if not hit_stop and not hit_limit:
+                    continue
+                level = position.stop if hit_stop else position.limit
+                logging.info(
+                    "Paper position {} of {} hit its {} at {}".format(
+                        position.deal_id,
+                        position.epic,
+                        "stop" if hit_stop else "limit",
+                        level,
+                    )
+                )
+                self._settle(position, level)
+                closed = True
+            if closed:
+                self._save()
+
+    def trade(
+        self, ticker: str, direction: TradeDirection, limit: float, stop: float
+    ) -> bool:
+        deal_ref = self.submit_order(ticker, direction, limit, stop)
+        return deal_ref is not None and self._is_accepted(deal_ref)
+
+    def submit_order(
+        self, ticker: str, direction: TradeDirection, limit: float, stop: float
+    ) -> Optional[str]:
+        """
+        Fill a deal at the current snapshot price and return its deal reference
+        """
+        try:
+            market = self.get_market_info(ticker)
+        except Exception as e:
+            logging.warning("Paper trade of {} rejected: {}".format(ticker, e))
+            with self._lock:
+                return self._confirm(None, ticker, direction, "MARKET_UNAVAILABLE")
+        level = market.offer if direction is TradeDirection.BUY else market.bid
+        with self._lock:
+            self._deals += 1
+            position = Position(
+                deal_id="PAPER{:08d}".format(self._deals),
+                size=self._config.get_ig_order_size(),
+                create_date=datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S"),
+                direction=direction,
+                level=level,
+                limit=limit,
+                stop=stop,
+                currency=self._config.get_ig_order_currency(),
+                epic=market.epic,
+                market_id=market.id,
+            )
+            self._positions[position.deal_id] = position
+            logging.info(
+                "Paper trade: {} {} at {} with limit={} and stop={}".format(
+                    direction.value, market.epic, level, limit, stop
+                )
+            )
+            deal_ref = self._confirm(position.deal_id, market.epic, direction)
+            self._save()
+            return deal_ref
+
+    def get_deal_confirmation(self, deal_ref: str) -> Dict[str, Any]:
+        with self._lock:
+            if deal_ref not in self._confirms:
+                raise RuntimeError("Deal {} not found".format(deal_ref))
+            return self._confirms[deal_ref]
+
+    def close_position(self, position: Position) -> bool:
+        deal_ref = self.submit_close(position)
+        return deal_ref is not None and self._is_accepted(deal_ref)
+
+    def submit_close(self, position: Position) -> Optional[str]:
+        """
+        Close a position at the current snapshot price and return the deal
+        reference
+        """
+        try:
+            market = self.market_data.get_market_info(position.epic)
+        except Exception as e:
+            logging.warning("Paper close of {} failed: {}".format(position.epic, e))
+            return None
+        with self._lock:
+            if position.deal_id not in self._positions:
+                return self._confirm(
+                    None, position.epic, position.direction, "POSITION_NOT_FOUND"
+                )
+            position = self._positions[position.deal_id]
+            if position.direction is TradeDirection.BUY:
+                level = market.bid
+            else:
+                level = market.offer
+            self._settle(position, level)
+            logging.info("Paper trade: close {} at {}".format(position.epic, level))
+            deal_ref = self._confirm(
+                position.deal_id, position.epic, position.direction
+            )
+            self._save()
+            return deal_ref
+
+    def close_all_positions(self) -> bool:
+        result = True
+        for position in self.get_open_positions():
+            if not self.close_position(position):
+                result = False
+        return result
+
+    def get_account_used_perc(self) -> Optional[float]:
+        balance, deposit = self.get_account_balances()
+        if balance is None or deposit is None:
+            return None
+        return Utils.percentage(deposit, balance)
+
+    def get_markets_from_watchlist(self, watchlist_id: str) -> List[Market]:
+        return self.market_data.get_markets_from_watchlist(watchlist_id)
+
+    def navigate_market_node(self, node_id: str) -> Dict[str, Any]:
+        return self.market_data.navigate_market_node(node_id)
+
+    def _settle(self, position: Position, level: float) -> None:
+        """
+        Remove the position crediting its profit or loss to the balance
+        """
+        sign = 1 if position.direction is TradeDirection.BUY else -1
+        self.balance += (level - position.level) * position.size * sign
+        del self._positions[position.deal_id]
+
+    def _confirm(
+        self,
+        deal_id: Optional[str],
+        epic: str,
+        direction: TradeDirection,
+        reason: str = DEAL_SUCCESS,
+    ) -> str:
+        self._deals += 1
+        deal_ref = "PAPERREF{:08d}".format(self._deals)
+        self._confirms[deal_ref] = {
+            "dealReference": deal_ref,
+            "dealId": deal_id,
+            "epic": epic,
+            "direction": direction.value,
+            "dealStatus": "ACCEPTED" if reason == DEAL_SUCCESS else "REJECTED",
+            "reason": reason,
+        }
+        return deal_ref
+
+    def _is_accepted(self, deal_ref: str) -> bool:
+        return self.get_deal_confirmation(deal_ref)["reason"] == DEAL_SUCCESS
+
+    def _load(self) -> None:
+        if self.state_filepath is None or not self.state_filepath.exists():
+            return
+        with self.state_filepath.open("r") as f:
+            state = json.load(f)
+        self.balance = state["balance"]
+        self._deals = state["deals"]
+        for p in state["positions"]:
+            p["direction"] = TradeDirection[p["direction"]]
+            position = Position(**p)
+            self._positions[position.deal_id] = position
+        logging.info(
+            "Paper account restored: balance {} and {} positions".format(
+                self.balance, len(self._positions)
+            )
+        )
+
+    def _save(self) -> None:
+        if self.state_filepath is None:
+            return
+        state = {
+            "balance": self.balance,
+            "deals": self._deals,
+            "positions": [
+                dict(p.to_dict(), direction=p.direction.name)
+                for p in self._positions.values()
+            ],
+        }
+        self.state_filepath.parent.mkdir(parents=True, exist_ok=True)
+        # Replace the file at once so that a crash never leaves it half written
+        tmp_filepath = self.state_filepath.with_suffix(".tmp")
+        with tmp_filepath.open("w") as f:
+            json.dump(state, f)
+        os.replace(tmp_filepath, self.state_filepath)
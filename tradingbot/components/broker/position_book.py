@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from ...interfaces import Position
+from . import DealResult
+
+
+class PositionBook:
+    """
+    Local view of the account positions: the last snapshot received from
+    the broker plus the deals confirmed after that snapshot was requested
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._positions: List[Position] = []
+        self._deals: Dict[str, Tuple[DealResult, float]] = {}
+
+    def update(self, positions: List[Position], requested_at: float) -> None:
+        """
+        Replace the snapshot of the open positions. Deals confirmed before
+        the snapshot was requested are part of it and are discarded
+
+            - **positions**: open positions returned by the broker
+            - **requested_at**: clock time when the snapshot was requested
+        """
+        with self._lock:
+            self._positions = list(positions)
+            self._deals = {
+                ref: (result, confirmed_at)
+                for ref, (result, confirmed_at) in self._deals.items()
+                if confirmed_at >= requested_at
+            }
+
+    def on_deal_result(self, result: DealResult) -> None:
+        """
+        Record the result of a submitted deal
+        """
+        if not result.accepted:
+            return
+        with self._lock:
+            self._deals[result.deal_reference] = (result, self._clock())
+
+    def positions(self) -> List[Position]:
+        """
+        Return the last snapshot of the open positions
+        """
+        with self._lock:
+            return list(self._positions)
+
+    def confirmed_deals(self) -> List[DealResult]:
+        """
+        Return the deals confirmed after the last snapshot
+        """
+        with self._lock:
+            return [result for result, _ in self._deals.values()]
+
+    def has_position(self, epic: str) -> bool:
+        """
+        Return True if the market has an open position or a confirmed deal
+        """
+        with self._lock:
+            if any(p.epic == epic for p in self._positions):
+                return True
+        return self.has_deal(epic)
+
+    def has_deal(self, epic: str) -> bool:
+        """
+        Return True if a deal of the market was confirmed after the last snapshot
+        """
+        with self._lock:
+            return any(result.epic == epic for result, _ in self._deals.values())
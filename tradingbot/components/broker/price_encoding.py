@@ -0,0 +1,152 @@
+from enum import Enum
+from typing import List, Optional
+
+import numpy
+import pandas
+
+# Most decimals of the prices stored as integer ticks
+MAX_DECIMALS = 6
+# Largest integer a float64 represents exactly
+MAX_EXACT_INTEGER = 2**53
+
+
+class PriceEncoding(Enum):
+    """
+    Encodings of the price histories stored in memory
+    """
+
+    FLOAT64 = "float64"
+    FLOAT32 = "float32"
+    TICKS = "ticks"
+
+
+def _integer_dtype(values: numpy.ndarray) -> numpy.dtype:
+    """
+    Return the smallest integer type holding the values, keeping its minimum
+    value free to mark the missing ones
+    """
+    int32 = numpy.iinfo(numpy.int32)
+    if len(values) == 0 or (values.min() > int32.min and values.max() <= int32.max):
+        return numpy.dtype(numpy.int32)
+    return numpy.dtype(numpy.int64)
+
+
+def _decimals(values: numpy.ndarray) -> Optional[int]:
+    """
+    Return the fewest decimals representing all the values, ignoring the
+    float64 rounding errors, None if more than MAX_DECIMALS are needed
+    """
+    values = values[~numpy.isnan(values)]
+    for decimals in range(MAX_DECIMALS + 1):
+        scaled = values * 10**decimals
+        if len(scaled) > 0 and numpy.abs(scaled).max() >= MAX_EXACT_INTEGER:
+            return None
+        if numpy.all(numpy.abs(scaled - numpy.rint(scaled)) <= 1e-6):
+            return decimals
+    return None
+
+
+class EncodedColumn:
+    """
+    Float64 column stored as integer ticks of 10^-decimals, as float32 or
+    as it is when decimals is None
+    """
+
+    data: numpy.ndarray
+    decimals: Optional[int]
+
+    def __init__(self, values: numpy.ndarray, encoding: PriceEncoding) -> None:
+        values = numpy.asarray(values, dtype=numpy.float64)
+        self.decimals = None
+        if encoding is not PriceEncoding.FLOAT64:
+            self.decimals = _decimals(values)
+        # Without ticks, whole numbers such as volumes are still integers
+        if encoding is PriceEncoding.FLOAT32 and self.decimals != 0:
+            self.decimals = None
+        if self.decimals is None:
+            float32 = encoding is PriceEncoding.FLOAT32
+            self.data = values.astype(numpy.float32 if float32 else numpy.float64)
+            return
+        missing = numpy.isnan(values)
+        ticks = numpy.rint(numpy.where(missing, 0, values) * 10**self.decimals)
+        dtype = _integer_dtype(ticks)
+        self.data = ticks.astype(dtype)
+        self.data[missing] = numpy.iinfo(dtype).min
+
+    def decode(self, first: int = 0) -> numpy.ndarray:
+        """
+        Return the float64 values from the given row
+        """
+        data = self.data[first:]
+        if self.decimals is None:
+            return data.astype(numpy.float64)
+        values = data / 10**self.decimals
+        values[data == numpy.iinfo(data.dtype).min] = numpy.nan
+        return values
+
+
+class EncodedPrices:
+    """
+    Compact copy of a dataframe of prices indexed by date.
+
+    Dates are stored as the first one followed by the differences between
+    consecutive dates, in multiples of their greatest common divisor, so that
+    regular bars take 4 bytes per date. Prices are stored as integer ticks
+    when they have at most MAX_DECIMALS decimals, otherwise as float64, or
+    as float32 with the FLOAT32 encoding. Whole numbers such as volumes are
+    stored as integers with both the encodings
+    """
+
+    encoding: PriceEncoding
+    columns: List[str]
+
+    def __init__(self, frame: pandas.DataFrame, encoding: PriceEncoding) -> None:
+        self.encoding = encoding
+        self.columns = list(frame.columns)
+        self._index_name = frame.index.name
+        dates = frame.index.values.astype("datetime64[ns]").view(numpy.int64)
+        self._length = len(dates)
+        self._first = int(dates[0]) if len(dates) > 0 else 0
+        deltas = numpy.diff(dates)
+        self._unit = int(numpy.gcd.reduce(deltas)) if len(deltas) > 0 else 1
+        self._unit = max(self._unit, 1)
+        steps = deltas // self._unit
+        self._steps = steps.astype(_integer_dtype(steps))
+        self._data = [EncodedColumn(frame[c].values, encoding) for c in self.columns]
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the encoded arrays
+        """
+        return self._steps.nbytes + sum(c.data.nbytes for c in self._data)
+
+    def dates(self, first: int = 0) -> numpy.ndarray:
+        """
+        Return the dates from the given row as datetime64
+        """
+        offsets = numpy.zeros(self._length, dtype=numpy.int64)
+        numpy.cumsum(self._steps, out=offsets[1:])
+        dates = self._first + offsets[first:] * self._unit
+        return dates.astype("datetime64[ns]")
+
+    def last_date(self) -> Optional[pandas.Timestamp]:
+        if self._length == 0:
+            return None
+        last = self._first + int(self._steps.sum(dtype=numpy.int64)) * self._unit
+        return pandas.Timestamp(last)
+
+    def decode(self, first: int = 0) -> pandas.DataFrame:
+        """
+        Return the float64 dataframe of the prices from the given row
+        """
+        first = min(max(first, 0), self._length)
+        index = pandas.DatetimeIndex(self.dates(first), name=self._index_name)
+        return pandas.DataFrame(
+            {c: data.decode(first) for c, data in zip(self.columns, self._data)},
+            index=index,
+            columns=self.columns,
+        )
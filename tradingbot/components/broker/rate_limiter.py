@@ -0,0 +1,76 @@
+import asyncio
+import contextlib
+import contextvars
+import threading
+import time
+from typing import AsyncIterator, Optional
+
+# Slot already granted to the current context by RateLimiter.hold()
+_held_slot: contextvars.ContextVar[Optional["RateLimiter"]] = contextvars.ContextVar(
+    "held_slot", default=None
+)
+
+
+class RateLimiter:
+    """
+    Thread safe pacing of API calls. Each call is granted a time slot at least
+    "interval" seconds after the previous one, so concurrent callers queue up
+    instead of polling, while the requests themselves can overlap.
+    Up to "burst" calls can be granted at once after an idle period
+    """
+
+    interval: float
+    burst: int
+
+    def __init__(self, interval: float = 0.0, burst: int = 1) -> None:
+        self.interval = interval
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _reserve(self, interval: Optional[float]) -> float:
+        step = self.interval if interval is None else interval
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now - (self.burst - 1) * step, self._next_slot)
+            self._next_slot = slot + step
+        return max(slot - now, 0.0)
+
+    def acquire(self, interval: Optional[float] = None) -> float:
+        """
+        Block until the next call is allowed and return the time waited.
+        A slot already awaited with hold() is used without waiting again
+
+            - **interval**: override the configured interval for this call
+        """
+        if _held_slot.get() is self:
+            _held_slot.set(None)
+            return 0.0
+        wait = self._reserve(interval)
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    async def acquire_async(self, interval: Optional[float] = None) -> float:
+        """
+        Same as acquire() but without blocking the event loop
+        """
+        wait = self._reserve(interval)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
+
+    @contextlib.asynccontextmanager
+    async def hold(self, interval: Optional[float] = None) -> AsyncIterator[float]:
+        """
+        Await the next slot on the event loop and hand it over to the first
+        blocking acquire() performed in this context, so that worker threads
+        do not sleep while queueing for their turn. The time waited is
+        returned as the context value
+        """
+        waited = await self.acquire_async(interval)
+        token = _held_slot.set(self)
+        try:
+            yield waited
+        finally:
+            _held_slot.reset(token)
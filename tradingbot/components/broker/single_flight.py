@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from . import BrokerMetrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce identical requests in flight: while a call for a key is running,
+    callers asking for the same key wait for it and share its result (or
+    its exception) instead of issuing their own. The result object is shared
+    between the callers, so it must be treated as read only.
+
+    Calls are coalesced per event loop, since asyncio futures can't be awaited
+    from a different loop. The latency of the calls and the coalesced calls
+    are recorded in the metrics as "Broker.<name>", if given
+    """
+
+    calls: Counter
+    coalesced: Counter
+    metrics: Optional[BrokerMetrics]
+
+    def __init__(self, metrics: Optional[BrokerMetrics] = None) -> None:
+        self.calls = Counter()
+        self.coalesced = Counter()
+        self.metrics = metrics
+        self._in_flight: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    async def do(self, name: str, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run call() unless a call with the same name and key is in flight
+
+            - **name**: name of the operation, used for the metrics
+            - **key**: hashable arguments identifying the request
+            - **call**: function returning the awaitable to run
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (name, key)
+        with self._lock:
+            in_flight = self._in_flight.setdefault(loop, {})
+            future = in_flight.get(flight_key)
+            self.calls[name] += 1
+            if future is not None:
+                self.coalesced[name] += 1
+        if future is not None and self.metrics is not None:
+            self.metrics.add_coalesced("Broker.{}".format(name))
+        if future is None:
+            future = asyncio.ensure_future(self._timed(name, call))
+            in_flight[flight_key] = future
+            future.add_done_callback(lambda _: in_flight.pop(flight_key, None))
+        # Cancelling a caller must not cancel the call shared with the others
+        return await asyncio.shield(future)
+
+    async def _timed(self, name: str, call: Callable[[], Awaitable[T]]) -> T:
+        if self.metrics is None:
+            return await call()
+        endpoint = "Broker.{}".format(name)
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except Exception:
+            self.metrics.observe(endpoint, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.observe(endpoint, time.perf_counter() - start)
+        return result
+
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Return the amount of calls and of coalesced calls for each operation
+        """
+        with self._lock:
+            return {
+                name: (self.calls[name], self.coalesced[name]) for name in self.calls
+            }
@@ -0,0 +1,154 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .. import Configuration
+from . import BrokerMetrics, Cassette, CassetteAdapter, CassetteMode, RateLimiter
+
+Headers = Optional[Dict[str, str]]
+T = TypeVar("T")
+
+
+class HttpTransport:
+    """
+    HTTP client shared by all the broker interfaces. Requests go through a
+    single session so that connections are pooled and reused across threads,
+    blocking calls can be awaited through a worker pool of the same size and
+    each API gets a rate limiter shared by all its users.
+    The latency and size of the responses are recorded in the metrics.
+    The traffic can be recorded to a cassette or replayed from it
+    """
+
+    pool_size: int
+    session: requests.Session
+    executor: ThreadPoolExecutor
+    cassette: Optional[Cassette]
+    metrics: BrokerMetrics
+
+    def __init__(self, pool_size: int, cassette: Optional[Cassette] = None) -> None:
+        self.pool_size = max(int(pool_size), 1)
+        self.cassette = cassette
+        self.metrics = BrokerMetrics()
+        logging.debug("HttpTransport pool size: {}".format(self.pool_size))
+        self.session = requests.Session()
+        if cassette is None:
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+        else:
+            adapter = CassetteAdapter(
+                cassette, pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Also sees the requests sent through the session by third party clients
+        self.session.hooks["response"].append(self._observe_response)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.pool_size, thread_name_prefix="HttpTransport"
+        )
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
+    def rate_limiter(self, name: str) -> RateLimiter:
+        """
+        Return the rate limiter of the given API, creating it if required
+        """
+        with self._limiters_lock:
+            if name not in self._limiters:
+                self._limiters[name] = RateLimiter()
+            return self._limiters[name]
+
+    def request(
+        self, method: str, url: str, data: Any = None, headers: Headers = None
+    ) -> requests.Response:
+        """
+        Perform an HTTP request and return the response
+        """
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, url, data=data, headers=headers)
+        except requests.RequestException:
+            self.metrics.observe(
+                BrokerMetrics.http_endpoint(method, url),
+                time.perf_counter() - start,
+                error=True,
+            )
+            raise
+
+    def _observe_response(
+        self, response: requests.Response, *args: Any, **kwargs: Any
+    ) -> None:
+        request = response.request
+        body = request.body or b""
+        self.metrics.observe(
+            BrokerMetrics.http_endpoint(str(request.method), str(request.url)),
+            response.elapsed.total_seconds(),
+            error=response.status_code >= 400,
+            bytes_sent=len(body),
+            bytes_received=len(response.content),
+        )
+
+    def get(self, url: str, headers: Headers = None) -> requests.Response:
+        return self.request("GET", url, headers=headers)
+
+    def post(
+        self, url: str, data: Any = None, headers: Headers = None
+    ) -> requests.Response:
+        return self.request("POST", url, data=data, headers=headers)
+
+    def put(
+        self, url: str, data: Any = None, headers: Headers = None
+    ) -> requests.Response:
+        return self.request("PUT", url, data=data, headers=headers)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking function in the worker pool and await its result.
+        The caller context variables are visible to the function
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+
+    def close(self) -> None:
+        """
+        Stop the worker pool and close the pooled connections and the cassette
+        """
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.cassette is not None:
+            self.cassette.close()
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def shared_transport(config: Configuration) -> HttpTransport:
+    """
+    Return the HttpTransport shared by all the broker interfaces, creating it
+    from the configuration on the first call
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            cassette = None
+            mode = CassetteMode(config.get_cassette_mode())
+            if mode is not CassetteMode.OFF:
+                cassette = Cassette(
+                    mode,
+                    Path(config.get_cassette_filepath()),
+                    config.get_cassette_latency_scale(),
+                )
+            _transport = HttpTransport(config.get_max_concurrent_requests(), cassette)
+        return _transport
@@ -1,18 +1,23 @@
+import datetime
 import logging
+import math
+import threading
 from enum import Enum
+from typing import Dict, List, Optional, Tuple
 
+import pandas
 import yfinance as yf
 
 from ...interfaces import Market, MarketHistory, MarketMACD
 from .. import Interval, Utils
-from . import StocksInterface
+from . import HistoryCache, PriceEncoding, StocksInterface
 
 
 class YFInterval(Enum):
     MIN_1 = "1m"
     MIN_2 = "2m"
     MIN_5 = "5m"
-    MIN_15 = "15"
+    MIN_15 = "15m"
     MIN_30 = "30m"
     MIN_60 = "60m"
     MIN_90 = "90m"
@@ -24,30 +29,173 @@ class YFInterval(Enum):
     MONTH_3 = "3mo"
 
 
+# Approximate length of a trading session, used to size intraday windows
+TRADING_HOURS_PER_DAY = 8.5
+# Extra calendar days fetched to make up for bank holidays
+WINDOW_MARGIN_DAYS = 4
+# How far back Yahoo Finance serves each intraday interval
+INTRADAY_LOOKBACK_DAYS = {
+    "1m": 7,
+    "2m": 60,
+    "5m": 60,
+    "15m": 60,
+    "30m": 60,
+    "1h": 730,
+}
+
+# Time between two datapoints of each interval
+INTERVAL_STEPS = {
+    Interval.MINUTE_1: datetime.timedelta(minutes=1),
+    Interval.MINUTE_2: datetime.timedelta(minutes=2),
+    Interval.MINUTE_3: datetime.timedelta(minutes=3),
+    Interval.MINUTE_5: datetime.timedelta(minutes=5),
+    Interval.MINUTE_10: datetime.timedelta(minutes=10),
+    Interval.MINUTE_15: datetime.timedelta(minutes=15),
+    Interval.MINUTE_30: datetime.timedelta(minutes=30),
+    Interval.HOUR: datetime.timedelta(hours=1),
+    Interval.HOUR_2: datetime.timedelta(hours=2),
+    Interval.HOUR_3: datetime.timedelta(hours=3),
+    Interval.HOUR_4: datetime.timedelta(hours=4),
+    Interval.DAY: datetime.timedelta(days=1),
+    Interval.WEEK: datetime.timedelta(weeks=1),
+    Interval.MONTH: datetime.timedelta(days=31),
+}
+
+HistoryKey = Tuple[str, str]
+
+
 class YFinanceInterface(StocksInterface):
     def initialise(self) -> None:
         logging.info("Initialising YFinanceInterface...")
+        self._rate_limiter.interval = self._config.get_yfinance_api_timeout()
+        # yf.download() collects the results in module globals
+        self._download_lock = threading.Lock()
+        self._history_cache = HistoryCache(
+            columns=["High", "Low", "Close", "Volume"],
+            encoding=PriceEncoding(self._config.get_history_encoding()),
+        )
 
     def get_prices(
-        self, market: Market, interval: Interval, data_range: int
+        self, market: Market, interval: Interval, data_range: Optional[int]
     ) -> MarketHistory:
+        symbol = self._format_market_id(market.id)
+        key = (symbol, self._to_yf_interval(interval).value)
+        start = self._fetch_start(key, interval, data_range)
         self._wait_before_call(self._config.get_yfinance_api_timeout())
 
-        ticker = yf.Ticker(self._format_market_id(market.id))
-        data = ticker.history(
-            period=self._to_yf_data_range(data_range),
-            interval=self._to_yf_interval(interval).value,
-        )
-        # Reverse dataframe to have most recent data at the top
-        data = data.iloc[::-1]
-        history = MarketHistory(
-            market,
-            data.index,
-            data["High"].values,
-            data["Low"].values,
-            data["Close"].values,
-            data["Volume"].values,
-        )
+        ticker = yf.Ticker(symbol, session=self._transport.session)
+        if start is None:
+            data = ticker.history(period="max", interval=key[1])
+        else:
+            data = ticker.history(start=start.to_pydatetime(), interval=key[1])
+        self._history_cache.merge(key, self._normalise(data), start)
+        return self._history(key, market, data_range)
+
+    def get_prices_batch(
+        self, markets: List[Market], interval: Interval, data_range: Optional[int]
+    ) -> Dict[str, MarketHistory]:
+        """
+        Fetch the prices of all the markets with a single multi-symbol download
+        """
+        if len(markets) == 0:
+            return {}
+        yf_interval = self._to_yf_interval(interval).value
+        symbols = [self._format_market_id(m.id) for m in markets]
+        starts = [
+            self._fetch_start((s, yf_interval), interval, data_range) for s in symbols
+        ]
+        # A single window covering the markets fetching the most datapoints
+        windows = [s for s in starts if s is not None]
+        start = min(windows) if len(windows) == len(starts) else None
+        self._wait_before_call(self._config.get_yfinance_api_timeout())
+        with self._download_lock:
+            data = yf.download(
+                symbols,
+                start=None if start is None else start.to_pydatetime(),
+                period="max",
+                interval=yf_interval,
+                group_by="ticker",
+                auto_adjust=True,
+                threads=min(len(symbols), self._transport.pool_size),
+                progress=False,
+                show_errors=False,
+            )
+        grouped = len(set(symbols)) > 1
+        histories = {}
+        for market, symbol in zip(markets, symbols):
+            # A single symbol download does not group the columns by ticker
+            if not grouped:
+                frame = data
+            elif symbol.upper() in data.columns.get_level_values(0):
+                frame = data[symbol.upper()]
+            else:
+                frame = data.iloc[0:0]
+            # Drop the rows added to align the symbols and the failed symbols
+            frame = self._normalise(frame)
+            if len(frame) == 0:
+                logging.warning("No prices for {}".format(symbol))
+                continue
+            key = (symbol, yf_interval)
+            self._history_cache.merge(key, frame, start)
+            histories[market.epic] = self._history(key, market, data_range)
+        return histories
+
+    def _fetch_start(
+        self, key: HistoryKey, interval: Interval, datapoints: Optional[int]
+    ) -> Optional[pandas.Timestamp]:
+        """
+        Return the date to download the prices from: the last cached date if
+        the cache already holds the requested window, otherwise the start of
+        the window. None stands for the whole available history
+        """
+        window_start = None
+        if datapoints is not None:
+            window_start = self._window_start(key[1], interval, datapoints)
+        last_date = self._history_cache.last_date(key)
+        if last_date is not None and self._history_cache.covers(key, window_start):
+            # The last stored datapoint might have been still in progress
+            return last_date
+        return window_start
+
+    def _window_start(
+        self, yf_interval: str, interval: Interval, datapoints: int
+    ) -> pandas.Timestamp:
+        """
+        Return the date from which the given amount of datapoints are available,
+        accounting for weekends and out of hours
+        """
+        step = self._to_timedelta(interval)
+        if step >= datetime.timedelta(weeks=1):
+            window = step * (datapoints + 1)
+        else:
+            bars_per_day = max(
+                1, int(datetime.timedelta(hours=TRADING_HOURS_PER_DAY) / step)
+            )
+            trading_days = math.ceil(datapoints / bars_per_day)
+            window = datetime.timedelta(
+                days=math.ceil(trading_days * 7 / 5) + WINDOW_MARGIN_DAYS
+            )
+        if yf_interval in INTRADAY_LOOKBACK_DAYS:
+            window = min(
+                window, datetime.timedelta(days=INTRADAY_LOOKBACK_DAYS[yf_interval] - 1)
+            )
+        return pandas.Timestamp.now().floor("D") - window
+
+    def _normalise(self, data: pandas.DataFrame) -> pandas.DataFrame:
+        """
+        Keep the price columns of a yfinance dataframe with a timezone naive index
+        """
+        data = data[["High", "Low", "Close", "Volume"]].dropna(how="all")
+        if getattr(data.index, "tz", None) is not None:
+            data.index = data.index.tz_localize(None)
+        return data
+
+    def _history(
+        self, key: HistoryKey, market: Market, datapoints: Optional[int]
+    ) -> MarketHistory:
+        history = self._history_cache.history(key, market, datapoints)
+        if history is None:
+            raise RuntimeError("No prices stored for {}".format(key[0]))
         return history
 
     def get_macd(
@@ -56,9 +204,7 @@ class YFinanceInterface(StocksInterface):
         self._wait_before_call(self._config.get_yfinance_api_timeout())
         # Fetch prices with at least 26 data points
         prices = self.get_prices(market, interval, 30)
-        data = Utils.macd_df_from_list(
-            prices.dataframe[MarketHistory.CLOSE_COLUMN].values
-        )
+        data = Utils.macd_df_from_list(prices.close)
         # TODO use dates instead of index
         return MarketMACD(
             market,
@@ -98,30 +244,10 @@ class YFinanceInterface(StocksInterface):
         elif interval == Interval.DAY:
             return YFInterval.DAY_1
         elif interval == Interval.WEEK:
-            return YFInterval.DAY_5
+            return YFInterval.WEEK_1
         elif interval == Interval.MONTH:
             return YFInterval.MONTH_1
         raise ValueError("Unsupported interval {}".format(interval.name))
 
-    def _to_yf_data_range(self, days: int) -> str:
-        # Values: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
-        if days < 2:
-            return "1d"
-        elif days < 6:
-            return "5d"
-        elif days < 32:
-            return "1mo"
-        elif days < 93:
-            return "3mo"
-        elif days < 186:
-            return "6mo"
-        elif days < 366:
-            return "1y"
-        elif days < 732:
-            return "2y"
-        elif days < 1830:
-            return "5y"
-        elif days < 3660:
-            return "10y"
-        else:
-            return "max"
+    def _to_timedelta(self, interval: Interval) -> datetime.timedelta:
+        return INTERVAL_STEPS[interval]
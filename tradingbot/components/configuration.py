@@ -84,6 +84,18 @@ class Configuration:
     def get_spin_interval(self) -> Property:
         return self._find_property(["spin_interval"])
 
+    def get_max_concurrent_requests(self) -> Property:
+        return self._find_property(["max_concurrent_requests"])
+
+    def get_cassette_mode(self) -> Property:
+        return self._find_property(["cassette", "mode"])
+
+    def get_cassette_filepath(self) -> Property:
+        return self._find_property(["cassette", "filepath"])
+
+    def get_cassette_latency_scale(self) -> Property:
+        return self._find_property(["cassette", "latency_scale"])
+
     def is_logging_enabled(self) -> Property:
         return self._find_property(["logging", "enable"])
 
@@ -111,6 +123,9 @@ class Configuration:
     def get_stocks_interface_values(self) -> Property:
         return self._find_property(["stocks_interface", "values"])
 
+    def get_history_encoding(self) -> Property:
+        return self._find_property(["stocks_interface", "history_encoding"])
+
     def get_ig_order_type(self) -> Property:
         return self._find_property(["stocks_interface", "ig_interface", "order_type"])
 
@@ -143,18 +158,87 @@ class Configuration:
             ["stocks_interface", "ig_interface", "controlled_risk"]
         )
 
+    def get_ig_api_base_url(self) -> Property:
+        return self._find_property(["stocks_interface", "ig_interface", "api_base_url"])
+
     def get_ig_api_timeout(self) -> Property:
         return self._find_property(["stocks_interface", "ig_interface", "api_timeout"])
 
+    def get_ig_confirm_poll_interval(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "ig_interface", "confirm_poll_interval"]
+        )
+
+    def get_ig_confirm_timeout(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "ig_interface", "confirm_timeout"]
+        )
+
+    def get_ig_trading_requests_per_minute(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "ig_interface", "trading_requests_per_minute"]
+        )
+
+    def get_ig_close_all_parallelism(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "ig_interface", "close_all_parallelism"]
+        )
+
+    def get_ig_close_all_retries(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "ig_interface", "close_all_retries"]
+        )
+
+    def get_ig_price_type(self) -> Property:
+        return self._find_property(["stocks_interface", "ig_interface", "price_type"])
+
+    def get_ig_plan_allowance(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "ig_interface", "plan_allowance"]
+        )
+
+    def get_ig_allowance_reserve(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "ig_interface", "allowance_reserve"]
+        )
+
     def is_paper_trading_enabled(self) -> Property:
         return self._find_property(["paper_trading"])
 
+    def get_paper_account_balance(self) -> Property:
+        return self._find_property(["paper_account", "balance"])
+
+    def get_paper_account_margin_factor(self) -> Property:
+        return self._find_property(["paper_account", "margin_factor"])
+
+    def get_paper_account_state_filepath(self) -> Property:
+        return self._find_property(["paper_account", "state_filepath"])
+
+    def get_indicators_state_filepath(self) -> Property:
+        return self._find_property(["indicators", "state_filepath"])
+
     def get_alphavantage_api_timeout(self) -> Property:
         return self._find_property(["stocks_interface", "alpha_vantage", "api_timeout"])
 
+    def get_alphavantage_local_indicators(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "alpha_vantage", "local_indicators"]
+        )
+
     def get_yfinance_api_timeout(self) -> Property:
         return self._find_property(["stocks_interface", "yfinance", "api_timeout"])
 
+    def get_composite_providers(self) -> Property:
+        return self._find_property(["stocks_interface", "composite", "providers"])
+
+    def get_composite_hedge_delay(self) -> Property:
+        return self._find_property(["stocks_interface", "composite", "hedge_delay"])
+
+    def get_composite_failure_cooldown(self) -> Property:
+        return self._find_property(
+            ["stocks_interface", "composite", "failure_cooldown"]
+        )
+
     def get_active_account_interface(self) -> Property:
         return self._find_property(["account_interface", "active"])
 
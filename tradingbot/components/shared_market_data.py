@@ -0,0 +1,209 @@
+import logging
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy
+
+from ..interfaces import Market, MarketHistory, MarketSnapshotTable
+
+# Catalogue entry describing a published segment
+CatalogueEntry = Dict[str, Any]
+# Alignment of the arrays in the segments
+ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layout(arrays: List[numpy.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Return the position of each array in a segment holding all of them
+    """
+    layout = []
+    offset = 0
+    for array in arrays:
+        layout.append(
+            {"offset": offset, "shape": array.shape, "dtype": array.dtype.str}
+        )
+        offset = _aligned(offset + array.nbytes)
+    return layout
+
+
+class SharedMarketData:
+    """
+    Publish market histories and snapshot tables in shared memory segments,
+    so that worker processes read them without downloading or unpickling
+    them again.
+
+    Each item is copied once into its own segment, described in the
+    catalogue by the segment name and the position of its arrays. Only the
+    catalogue, a small dictionary, is sent to the workers, which map the
+    segments with a SharedMarketDataReader. Segments are removed by close.
+    Workers must be started by the publishing process, so that they share
+    its tracking of the segments
+    """
+
+    catalogue: Dict[str, CatalogueEntry]
+
+    def __init__(self) -> None:
+        self.catalogue = {}
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+
+    def __enter__(self) -> "SharedMarketData":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def publish_history(self, key: str, history: MarketHistory) -> None:
+        """
+        Publish the columns of a market history, replacing the previous
+        ones published with the same key
+        """
+        arrays = [
+            history.dates,
+            history.high,
+            history.low,
+            history.close,
+            history.volume,
+        ]
+        self._publish(key, arrays, {"kind": "history", "epic": history.market.epic})
+
+    def publish_snapshots(self, key: str, table: MarketSnapshotTable) -> None:
+        """
+        Publish the snapshots of a market table, replacing the previous
+        ones published with the same key
+        """
+        ids, names, expiries, prices = table.columns()
+        self._publish(
+            key,
+            [prices],
+            {
+                "kind": "snapshots",
+                "epics": list(table.epics),
+                "ids": list(ids),
+                "names": list(names),
+                "expiries": list(expiries),
+            },
+        )
+
+    def _publish(
+        self, key: str, arrays: List[numpy.ndarray], entry: CatalogueEntry
+    ) -> None:
+        layout = _layout(arrays)
+        size = max(layout[-1]["offset"] + arrays[-1].nbytes, 1)
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        for array, position in zip(arrays, layout):
+            view: numpy.ndarray = numpy.ndarray(
+                array.shape,
+                dtype=array.dtype,
+                buffer=segment.buf,
+                offset=position["offset"],
+            )
+            view[...] = array
+            del view
+        self.remove(key)
+        self._segments[key] = segment
+        self.catalogue[key] = dict(entry, segment=segment.name, arrays=layout)
+
+    def remove(self, key: str) -> None:
+        """
+        Remove a published item. Workers still mapping it keep their copy
+        of the segment until they close it
+        """
+        segment = self._segments.pop(key, None)
+        self.catalogue.pop(key, None)
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+
+    def close(self) -> None:
+        """
+        Remove all the published items
+        """
+        for key in list(self._segments):
+            self.remove(key)
+
+
+class SharedMarketDataReader:
+    """
+    Map the items published by a SharedMarketData in a worker process.
+
+    The arrays of the returned histories and tables are read-only views of
+    the shared segments: they are not copied and stay valid until the
+    reader is closed. Close it once the arrays are no longer used
+    """
+
+    catalogue: Dict[str, CatalogueEntry]
+
+    def __init__(self, catalogue: Dict[str, CatalogueEntry]) -> None:
+        """
+        - **catalogue**: catalogue of the publishing SharedMarketData
+        """
+        self.catalogue = catalogue
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+
+    def __enter__(self) -> "SharedMarketDataReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def keys(self) -> List[str]:
+        return list(self.catalogue)
+
+    def _arrays(self, key: str, kind: str) -> List[numpy.ndarray]:
+        entry = self.catalogue[key]
+        if entry["kind"] != kind:
+            raise ValueError("{} is not a {}".format(key, kind))
+        name = entry["segment"]
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = shared_memory.SharedMemory(name=name)
+            self._segments[name] = segment
+        arrays = []
+        for position in entry["arrays"]:
+            array: numpy.ndarray = numpy.ndarray(
+                tuple(position["shape"]),
+                dtype=numpy.dtype(position["dtype"]),
+                buffer=segment.buf,
+                offset=position["offset"],
+            )
+            array.flags.writeable = False
+            arrays.append(array)
+        return arrays
+
+    def history(self, key: str, market: Optional[Market] = None) -> MarketHistory:
+        """
+        Return the published market history
+
+            - **market**: market of the history, by default a market with
+              the published epic only
+        """
+        dates, high, low, close, volume = self._arrays(key, "history")
+        if market is None:
+            market = Market(epic=self.catalogue[key]["epic"])
+        return MarketHistory.from_columns(market, dates, high, low, close, volume)
+
+    def snapshots(self, key: str) -> MarketSnapshotTable:
+        """
+        Return the published snapshot table
+        """
+        entry = self.catalogue[key]
+        (prices,) = self._arrays(key, "snapshots")
+        return MarketSnapshotTable.from_columns(
+            entry["epics"], entry["ids"], entry["names"], entry["expiries"], prices
+        )
+
+    def close(self) -> None:
+        """
+        Unmap the segments. The arrays returned must not be used anymore
+        """
+        for name, segment in list(self._segments.items()):
+            try:
+                segment.close()
+            except BufferError:
+                logging.warning("Shared segment {} still in use".format(name))
+                continue
+            del self._segments[name]
@@ -1,6 +1,6 @@
 import logging
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
 import pytz
@@ -66,6 +66,39 @@ class TimeProvider:
         # Calculate the delta from from_time to the next market opening
         return (nextMarketOpening - from_time).total_seconds()
 
+    def get_next_market_close(self, from_time: datetime) -> datetime:
+        """Return the date and time of the next market close after from_time,
+        taking into account UK bank holidays and weekends"""
+        holidays = BankHolidays()
+        closing = from_time.replace(hour=16, minute=30, second=0, microsecond=0)
+        if from_time < closing and holidays.is_work_day(from_time.date()):
+            return closing
+        next_work_date = holidays.get_next_work_day(date=from_time.date())
+        return datetime(
+            year=next_work_date.year,
+            month=next_work_date.month,
+            day=next_work_date.day,
+            hour=16,
+            minute=30,
+        )
+
+    def get_open_market_seconds(self, from_time: datetime, to_time: datetime) -> float:
+        """Return the amount of seconds the market is open between from_time
+        and to_time, taking into account UK bank holidays and weekends"""
+        holidays = BankHolidays()
+        total = 0.0
+        day = from_time.date()
+        while day <= to_time.date():
+            if holidays.is_work_day(day):
+                opening = datetime(day.year, day.month, day.day, hour=8)
+                closing = datetime(day.year, day.month, day.day, hour=16, minute=30)
+                start = max(opening, from_time)
+                end = min(closing, to_time)
+                if end > start:
+                    total += (end - start).total_seconds()
+            day += timedelta(days=1)
+        return total
+
     def wait_for(self, time_amount_type: TimeAmount, amount: float = -1.0) -> None:
         """Wait for the specified amount of time.
         An TimeAmount type can be specified
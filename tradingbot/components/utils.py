@@ -3,8 +3,11 @@ import threading
 from enum import Enum
 from typing import Any, Dict, List, Tuple, Union
 
+import numpy
 import pandas
 
+from ..indicators import kernels
+
 
 class TradeDirection(Enum):
     """
@@ -38,6 +41,16 @@ class Interval(Enum):
     MONTH = "MONTH"
 
 
+class MovingAverageType(Enum):
+    """
+    Moving average types, with the same values used by AlphaVantage
+    """
+
+    SMA = 0
+    EMA = 1
+    WMA = 2
+
+
 class MarketClosedException(Exception):
     """Error to notify that the market is currently closed"""
 
@@ -50,11 +63,12 @@ class NotSafeToTradeException(Exception):
     pass
 
 
-# Mutex used for thread synchronisation
-lock: threading.Lock = threading.Lock()
+# Mutex used for thread synchronisation, reentrant so that a singleton can
+# create other singletons while being initialised
+lock = threading.RLock()
 
 
-def synchronised(lock: threading.Lock) -> Any:
+def synchronised(lock: Any) -> Any:
     """Thread synchronization decorator"""
 
     def wrapper(f: Any) -> Any:
@@ -134,12 +148,79 @@ class Utils:
         return "%02d:%02d:%02d" % (hours, mins, secs)
 
     @staticmethod
-    def macd_df_from_list(price_list: List[float]) -> pandas.DataFrame:
+    def macd_df_from_list(
+        price_list: Union[List[float], numpy.ndarray]
+    ) -> pandas.DataFrame:
         """Return a MACD pandas dataframe with columns "MACD", "Signal" and "Hist"""
-        px = pandas.DataFrame({"close": price_list})
-        px["26_ema"] = pandas.DataFrame.ewm(px["close"], span=26).mean()
-        px["12_ema"] = pandas.DataFrame.ewm(px["close"], span=12).mean()
-        px["MACD"] = px["12_ema"] - px["26_ema"]
-        px["Signal"] = px["MACD"].rolling(9).mean()
-        px["Hist"] = px["MACD"] - px["Signal"]
-        return px
+        close = numpy.asarray(price_list, dtype=float)
+        slow = kernels.ema(close, 26)
+        fast = kernels.ema(close, 12)
+        signal = kernels.sma(fast - slow, 9)
+        return pandas.DataFrame(
+            {
+                "close": close,
+                "26_ema": slow,
+                "12_ema": fast,
+                "MACD": fast - slow,
+                "Signal": signal,
+                "Hist": fast - slow - signal,
+            }
+        )
+
+    @staticmethod
+    def moving_average(
+        values: Union[List[float], numpy.ndarray],
+        period: int,
+        ma_type: MovingAverageType,
+    ) -> numpy.ndarray:
+        """
+        Return the moving average of the values with the same definition of
+        the AlphaVantage indicators: the first period - 1 items are NaN and
+        the EMA is seeded with the SMA of the first period values.
+        Leading NaN values are skipped
+        """
+        values = numpy.asarray(values, dtype=float)
+        result = numpy.full(len(values), numpy.nan)
+        first = int(numpy.argmax(~numpy.isnan(values))) if len(values) > 0 else 0
+        data = values[first:]
+        if period < 1 or len(data) < period:
+            return result
+        if ma_type == MovingAverageType.SMA:
+            cumsum = numpy.cumsum(numpy.insert(data, 0, 0.0))
+            ma = (cumsum[period:] - cumsum[:-period]) / period
+        elif ma_type == MovingAverageType.WMA:
+            weights = numpy.arange(1, period + 1, dtype=float)
+            ma = numpy.convolve(data, weights[::-1], mode="valid") / weights.sum()
+        elif ma_type == MovingAverageType.EMA:
+            # Already NaN before the first average
+            result[first:] = kernels.seeded_ema(data, period)
+            return result
+        else:
+            raise ValueError("Unsupported moving average {}".format(ma_type))
+        start = first + period - 1
+        result[start:] = ma
+        return result
+
+    @staticmethod
+    def macdext_df_from_list(
+        price_list: Union[List[float], numpy.ndarray],
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        fast_ma: MovingAverageType = MovingAverageType.EMA,
+        slow_ma: MovingAverageType = MovingAverageType.EMA,
+        signal_ma: MovingAverageType = MovingAverageType.EMA,
+    ) -> pandas.DataFrame:
+        """
+        Return a MACD pandas dataframe with columns "MACD", "Signal" and "Hist"
+        computed as the AlphaVantage MACDEXT indicator, with configurable
+        moving average types. Prices are expected oldest first and the rows
+        without a signal value are NaN
+        """
+        prices = numpy.asarray(price_list, dtype=float)
+        macd = Utils.moving_average(prices, fast_period, fast_ma)
+        macd = macd - Utils.moving_average(prices, slow_period, slow_ma)
+        signal = Utils.moving_average(macd, signal_period, signal_ma)
+        # The MACD is only reported where the signal is available
+        macd[numpy.isnan(signal)] = numpy.nan
+        return pandas.DataFrame({"MACD": macd, "Signal": signal, "Hist": macd - signal})
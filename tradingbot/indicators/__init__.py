@@ -0,0 +1,24 @@
+from .incremental import (  # NOQA # isort:skip
+    ATR,
+    EMA,
+    MACD,
+    SMA,
+    VWAP,
+    Indicator,
+    RollingStd,
+    RollingWindow,
+)
+from .kernels import (  # NOQA # isort:skip
+    atr,
+    bollinger,
+    crossover,
+    ema,
+    macd,
+    rolling_std,
+    seeded_ema,
+    sma,
+    true_range,
+    vwap,
+)
+from .engine import IndicatorEngine, IndicatorSeries  # NOQA # isort:skip
+from .graph import IndicatorGraph, Node  # NOQA # isort:skip
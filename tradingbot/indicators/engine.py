@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+import numpy
+
+from .incremental import ATR, EMA, MACD, SMA, VWAP, Indicator, RollingStd, Value
+
+# Only needed by the annotations: the components use the kernels of this
+# package and the interfaces depend on the components
+if TYPE_CHECKING:
+    from ..interfaces import MarketHistory
+
+INDICATORS: Dict[str, Type[Indicator]] = {
+    EMA.name: EMA,
+    SMA.name: SMA,
+    RollingStd.name: RollingStd,
+    MACD.name: MACD,
+    ATR.name: ATR,
+    VWAP.name: VWAP,
+}
+
+IndicatorKey = Tuple[str, str, str, Tuple[Tuple[str, Any], ...]]
+
+
+class IndicatorSeries:
+    """
+    Incremental indicator of a market together with the date of the last bar
+    it consumed and its most recent values
+    """
+
+    indicator: Indicator
+    last_date: Optional[numpy.datetime64]
+    dates: Deque[numpy.datetime64]
+    values: Deque[Value]
+
+    def __init__(self, indicator: Indicator, keep: int) -> None:
+        self.indicator = indicator
+        self.last_date = None
+        self.dates = deque(maxlen=keep)
+        self.values = deque(maxlen=keep)
+
+    def feed(self, history: "MarketHistory") -> int:
+        """
+        Update the indicator with the bars of the history newer than the last
+        one consumed, replacing the last one if it is in the history again.
+        Return the amount of bars consumed
+        """
+        first = 0
+        if self.last_date is not None:
+            last_date = numpy.datetime64(self.last_date, "ns")
+            first = int(numpy.searchsorted(history.dates, last_date, side="left"))
+        consumed = 0
+        for i in range(first, len(history)):
+            date = history.dates[i]
+            replace = self.last_date is not None and date == self.last_date
+            if not replace and self.last_date is not None and date < self.last_date:
+                continue
+            value = self.indicator.update(
+                history.high[i],
+                history.low[i],
+                history.close[i],
+                history.volume[i],
+                replace,
+            )
+            if replace:
+                self.values[-1] = value
+            else:
+                self.dates.append(date)
+                self.values.append(value)
+            self.last_date = date
+            consumed += 1
+        return consumed
+
+
+class IndicatorEngine:
+    """
+    Keep the incremental indicators of each market, interval and parameters
+    updated with the bars of the price histories, so that only the new bars
+    are computed at each spin while the indicators keep warming up over all
+    the bars seen.
+
+    The state of the indicators can be saved to a json file and is restored
+    when the engine is created
+    """
+
+    filepath: Optional[Path]
+    keep: int
+
+    def __init__(self, filepath: Optional[Path] = None, keep: int = 256) -> None:
+        """
+        - **filepath**: file storing the state of the indicators, None to keep
+          it in memory only
+        - **keep**: amount of most recent values kept for each indicator
+        """
+        self.filepath = filepath
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._series: Dict[IndicatorKey, IndicatorSeries] = {}
+        self._load()
+
+    @staticmethod
+    def _key(
+        epic: str, interval: Hashable, name: str, params: Dict[str, Any]
+    ) -> IndicatorKey:
+        return (epic, str(interval), name, tuple(sorted(params.items())))
+
+    def _get(self, key: IndicatorKey) -> IndicatorSeries:
+        series = self._series.get(key)
+        if series is None:
+            name = key[2]
+            if name not in INDICATORS:
+                raise ValueError("Indicator {} not supported".format(name))
+            indicator = INDICATORS[name](**dict(key[3]))
+            series = self._series[key] = IndicatorSeries(indicator, self.keep)
+        return series
+
+    def update(
+        self, history: "MarketHistory", interval: Hashable, name: str, **params: Any
+    ) -> Value:
+        """
+        Feed the new bars of the history to the indicator of its market and
+        return the indicator value
+        """
+        key = self._key(history.market.epic, interval, name, params)
+        with self._lock:
+            series = self._get(key)
+            series.feed(history)
+            return series.indicator.value
+
+    def series(
+        self, history: "MarketHistory", interval: Hashable, name: str, **params: Any
+    ) -> Tuple[numpy.ndarray, List[Value]]:
+        """
+        Feed the new bars of the history to the indicator of its market and
+        return the dates and values of its most recent bars, oldest first
+        """
+        key = self._key(history.market.epic, interval, name, params)
+        with self._lock:
+            series = self._get(key)
+            series.feed(history)
+            return numpy.array(series.dates), list(series.values)
+
+    def save(self) -> None:
+        """
+        Write the state of the indicators to the file, if any
+        """
+        if self.filepath is None:
+            return
+        with self._lock:
+            state = [
+                {
+                    "key": [key[0], key[1], key[2], [list(p) for p in key[3]]],
+                    "indicator": series.indicator.state(),
+                    "last_date": None
+                    if series.last_date is None
+                    else str(series.last_date),
+                    "dates": [str(d) for d in series.dates],
+                    "values": list(series.values),
+                }
+                for key, series in self._series.items()
+            ]
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        # Replace the file at once so that a crash never leaves it half written
+        tmp_filepath = self.filepath.with_suffix(".tmp")
+        with tmp_filepath.open("w") as f:
+            json.dump(state, f)
+        os.replace(tmp_filepath, self.filepath)
+
+    def _load(self) -> None:
+        if self.filepath is None or not self.filepath.exists():
+            return
+        with self.filepath.open("r") as f:
+            state = json.load(f)
+        for item in state:
+            epic, interval, name, params = item["key"]
+            key = (epic, interval, name, tuple((k, v) for k, v in params))
+            series = self._get(key)
+            series.indicator.load_state(item["indicator"])
+            if item["last_date"] is not None:
+                series.last_date = numpy.datetime64(item["last_date"])
+            series.dates.extend(numpy.datetime64(d) for d in item["dates"])
+            series.values.extend(
+                tuple(v) if isinstance(v, list) else v for v in item["values"]
+            )
+        logging.info("Indicators restored: {} series".format(len(self._series)))
@@ -0,0 +1,256 @@
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy
+
+from . import kernels
+
+# Only needed by the annotations: the components use the kernels of this
+# package and the interfaces depend on the components
+if TYPE_CHECKING:
+    from ..interfaces import MarketHistory
+
+
+class Node:
+    """
+    Operation of the indicator graph on the outputs of other nodes. Nodes
+    with the same operation, inputs and parameters are equal, so that the
+    indicators sharing a subexpression share its node
+    """
+
+    __slots__ = ("op", "inputs", "params", "_hash")
+
+    op: str
+    inputs: Tuple["Node", ...]
+    params: Tuple[Hashable, ...]
+
+    def __init__(
+        self,
+        op: str,
+        inputs: Tuple["Node", ...] = (),
+        params: Tuple[Hashable, ...] = (),
+    ) -> None:
+        self.op = op
+        self.inputs = inputs
+        self.params = params
+        self._hash = hash((op, inputs, params))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self.op == other.op
+            and self.inputs == other.inputs
+            and self.params == other.params
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        if not self.inputs and not self.params:
+            return self.op
+        args = [repr(i) for i in self.inputs] + [repr(p) for p in self.params]
+        return "{}({})".format(self.op, ", ".join(args))
+
+
+Outputs = Union[Node, Tuple[Node, ...]]
+Values = Union[numpy.ndarray, Tuple[numpy.ndarray, ...]]
+
+# Price columns of the histories
+HIGH = Node("high")
+LOW = Node("low")
+CLOSE = Node("close")
+VOLUME = Node("volume")
+SOURCES = [HIGH, LOW, CLOSE, VOLUME]
+
+OPERATIONS: Dict[str, Callable[..., numpy.ndarray]] = {
+    "ema": kernels.ema,
+    "seeded_ema": kernels.seeded_ema,
+    "sma": kernels.sma,
+    "rolling_std": kernels.rolling_std,
+    "true_range": kernels.true_range,
+    "vwap": kernels.vwap,
+    "add": numpy.add,
+    "subtract": numpy.subtract,
+    "multiply": numpy.multiply,
+}
+
+
+def _ema(span: int) -> Node:
+    return Node("ema", (CLOSE,), (span,))
+
+
+def _sma(window: int) -> Node:
+    return Node("sma", (CLOSE,), (window,))
+
+
+def _std(window: int, ddof: int = 1) -> Node:
+    return Node("rolling_std", (CLOSE,), (window, ddof))
+
+
+def _macd(fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[Node, Node, Node]:
+    line = Node("subtract", (_ema(fast), _ema(slow)))
+    signal_line = Node("sma", (line,), (signal,))
+    return line, signal_line, Node("subtract", (line, signal_line))
+
+
+def _bollinger(window: int, k: float = 2.0, ddof: int = 1) -> Tuple[Node, Node, Node]:
+    average = _sma(window)
+    width = Node("multiply", (_std(window, ddof),), (k,))
+    return average, Node("add", (average, width)), Node("subtract", (average, width))
+
+
+def _true_range() -> Node:
+    return Node("true_range", (HIGH, LOW, CLOSE))
+
+
+def _atr(period: int = 14) -> Node:
+    return Node("seeded_ema", (_true_range(),), (period, 1 / period))
+
+
+def _vwap(period: int) -> Node:
+    return Node("vwap", (HIGH, LOW, CLOSE, VOLUME), (period,))
+
+
+# Named indicators, as the nodes of their outputs
+DEFINITIONS: Dict[str, Callable[..., Outputs]] = {
+    "ema": _ema,
+    "sma": _sma,
+    "std": _std,
+    "macd": _macd,
+    "bollinger": _bollinger,
+    "true_range": _true_range,
+    "atr": _atr,
+    "vwap": _vwap,
+}
+
+# Histories are identified by the market, the amount of bars and the dates of
+# the first and of the last one
+BarsKey = Tuple[int, Any, Any]
+
+
+class IndicatorGraph:
+    """
+    Graph of the indicators requested by the strategies, by name and
+    parameters. The indicators are defined as nodes of kernel operations on
+    the price columns and the nodes they have in common, e.g. EMA(close, 26)
+    of two MACD variants, are stored once.
+
+    Each node is evaluated once per market and set of bars: the values are
+    cached until a new bar of the market comes in and are shared, read only,
+    by all the indicators using them
+    """
+
+    evaluations: int
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, Tuple[Any, ...]], Outputs] = {}
+        self._nodes: Dict[Node, Node] = {}
+        self._cache: Dict[str, Dict[BarsKey, Dict[Node, numpy.ndarray]]] = {}
+        self.evaluations = 0
+
+    @property
+    def nodes(self) -> List[Node]:
+        """
+        Distinct nodes of the requested indicators, inputs first
+        """
+        with self._lock:
+            return list(self._nodes)
+
+    def request(self, name: str, **params: Any) -> Outputs:
+        """
+        Add the indicator to the graph and return the nodes of its outputs
+
+            - Raise a ValueError if the indicator is not supported
+        """
+        if name not in DEFINITIONS:
+            raise ValueError("Indicator {} not supported".format(name))
+        key = (name, tuple(sorted(params.items())))
+        with self._lock:
+            outputs = self._requests.get(key)
+            if outputs is None:
+                outputs = DEFINITIONS[name](**params)
+                if isinstance(outputs, tuple):
+                    outputs = tuple(self._add(node) for node in outputs)
+                else:
+                    outputs = self._add(outputs)
+                self._requests[key] = outputs
+            return outputs
+
+    def _add(self, node: Node) -> Node:
+        """
+        Return the node of the graph equal to the given one, adding it with
+        its inputs if missing
+        """
+        existing = self._nodes.get(node)
+        if existing is not None:
+            return existing
+        inputs = tuple(self._add(item) for item in node.inputs)
+        node = self._nodes[node] = Node(node.op, inputs, node.params)
+        return node
+
+    def compute(self, history: "MarketHistory", name: str, **params: Any) -> Values:
+        """
+        Return the values of the indicator for the bars of the history,
+        evaluating only the nodes not cached for them yet
+        """
+        return self.evaluate(history, self.request(name, **params))
+
+    def evaluate(self, history: "MarketHistory", outputs: Outputs) -> Values:
+        """
+        Return the values of the nodes for the bars of the history
+        """
+        bars: BarsKey = (len(history), None, None)
+        if len(history) > 0:
+            bars = (len(history), history.dates[0], history.dates[-1])
+        with self._lock:
+            cached = self._cache.setdefault(history.market.epic, {})
+            values = cached.get(bars)
+            if values is None:
+                # A new bar supersedes the values of the previous ones, while
+                # histories of different lengths up to the same bar are kept
+                for key in [k for k in cached if k[2] != bars[2]]:
+                    del cached[key]
+                values = cached[bars] = {}
+            if isinstance(outputs, tuple):
+                return tuple(self._evaluate(n, history, values) for n in outputs)
+            return self._evaluate(outputs, history, values)
+
+    def _evaluate(
+        self,
+        node: Node,
+        history: "MarketHistory",
+        values: Dict[Node, numpy.ndarray],
+    ) -> numpy.ndarray:
+        value: Optional[numpy.ndarray] = values.get(node)
+        if value is not None:
+            return value
+        if node in SOURCES:
+            value = numpy.asarray(getattr(history, node.op), dtype=float)
+        else:
+            inputs = [self._evaluate(i, history, values) for i in node.inputs]
+            value = OPERATIONS[node.op](*inputs, *node.params)
+            value.flags.writeable = False
+            self.evaluations += 1
+        values[node] = value
+        return value
+
+    def clear(self) -> None:
+        """
+        Drop the cached values of all the markets
+        """
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,349 @@
+import math
+from typing import Any, Dict, Tuple, Union
+
+import numpy
+
+Value = Union[float, Tuple[float, ...]]
+
+NAN = float("nan")
+
+
+class Indicator:
+    """
+    Technical indicator updated one bar at a time in O(1).
+
+    update() consumes the next bar, or replaces the most recent one when
+    the bar is still in progress, and returns the indicator value. The
+    state of the indicator is a dictionary of plain values, so that it can
+    be checkpointed and restored
+    """
+
+    name: str = "indicator"
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        raise NotImplementedError
+
+    @property
+    def value(self) -> Value:
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        for key, item in vars(self).items():
+            if isinstance(item, Indicator):
+                state[key] = item.state()
+            elif isinstance(item, numpy.ndarray):
+                state[key] = item.tolist()
+            elif isinstance(item, tuple):
+                state[key] = list(item)
+            else:
+                state[key] = item
+        return state
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        for key, item in vars(self).items():
+            if key not in state:
+                continue
+            if isinstance(item, Indicator):
+                item.load_state(state[key])
+            elif isinstance(item, numpy.ndarray):
+                setattr(self, key, numpy.array(state[key], dtype=item.dtype))
+            elif isinstance(item, tuple):
+                setattr(self, key, tuple(state[key]))
+            else:
+                setattr(self, key, state[key])
+
+
+class RollingWindow(Indicator):
+    """
+    Ring buffer of the last period values with their running sum and sum of
+    squares. The sums are computed again each time the buffer wraps around,
+    so that rounding errors do not accumulate
+    """
+
+    name = "window"
+
+    def __init__(self, period: int) -> None:
+        if period < 1:
+            raise ValueError("Period must be positive")
+        self.period = period
+        self.values = numpy.zeros(period)
+        self.last = -1
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+
+    def push(self, x: float, replace: bool = False) -> None:
+        if replace and self.count > 0:
+            old = self.values[self.last]
+            self.total += x - old
+            self.squares += x * x - old * old
+            self.values[self.last] = x
+            return
+        self.last = (self.last + 1) % self.period
+        if self.count == self.period:
+            old = self.values[self.last]
+            self.total -= old
+            self.squares -= old * old
+        self.values[self.last] = x
+        self.count = min(self.count + 1, self.period)
+        if self.last == self.period - 1:
+            self.total = float(self.values.sum())
+            self.squares = float((self.values * self.values).sum())
+        else:
+            self.total += x
+            self.squares += x * x
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.period
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        self.push(close, replace)
+        return self.value
+
+    @property
+    def value(self) -> Value:
+        return self.total
+
+
+class EMA(Indicator):
+    """
+    Exponential moving average of the close prices with alpha 2 / (period + 1),
+    weighted as pandas ewm(span=period) so that early values are not biased
+    towards the first price
+    """
+
+    name = "ema"
+
+    def __init__(self, period: int) -> None:
+        if period < 1:
+            raise ValueError("Period must be positive")
+        self.period = period
+        self.decay = 1 - 2 / (period + 1)
+        self.weighted = 0.0
+        self.weights = 0.0
+        self.previous = (0.0, 0.0)
+
+    def push(self, x: float, replace: bool = False) -> float:
+        if replace:
+            self.weighted, self.weights = self.previous
+        else:
+            self.previous = (self.weighted, self.weights)
+        if not math.isnan(x):
+            self.weighted = x + self.decay * self.weighted
+            self.weights = 1 + self.decay * self.weights
+        return self.ema
+
+    @property
+    def ema(self) -> float:
+        return self.weighted / self.weights if self.weights > 0 else NAN
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        return self.push(close, replace)
+
+    @property
+    def value(self) -> Value:
+        return self.ema
+
+
+class SMA(Indicator):
+    """
+    Simple moving average of the close prices, NaN until period bars are seen
+    """
+
+    name = "sma"
+
+    def __init__(self, period: int) -> None:
+        self.window = RollingWindow(period)
+
+    def push(self, x: float, replace: bool = False) -> float:
+        self.window.push(x, replace)
+        return self.sma
+
+    @property
+    def sma(self) -> float:
+        if not self.window.full:
+            return NAN
+        return self.window.total / self.window.period
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        return self.push(close, replace)
+
+    @property
+    def value(self) -> Value:
+        return self.sma
+
+
+class RollingStd(Indicator):
+    """
+    Standard deviation of the last period close prices, NaN until period
+    bars are seen
+
+        - **ddof**: delta degrees of freedom, 1 for the sample deviation as
+          pandas rolling().std()
+    """
+
+    name = "std"
+
+    def __init__(self, period: int, ddof: int = 1) -> None:
+        self.window = RollingWindow(period)
+        self.ddof = ddof
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        self.window.push(close, replace)
+        return self.value
+
+    @property
+    def value(self) -> Value:
+        n = self.window.period
+        if not self.window.full or n <= self.ddof:
+            return NAN
+        mean = self.window.total / n
+        variance = (self.window.squares - n * mean * mean) / (n - self.ddof)
+        return math.sqrt(max(variance, 0.0))
+
+
+class MACD(Indicator):
+    """
+    Moving average convergence divergence of the close prices, as
+    Utils.macd_df_from_list: the difference of the fast and slow EMA, its
+    SMA as signal and their difference as histogram.
+    The value is the (macd, signal, hist) tuple
+    """
+
+    name = "macd"
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = SMA(signal)
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        macd = self.fast.push(close, replace) - self.slow.push(close, replace)
+        self.signal.push(macd, replace)
+        return self.value
+
+    @property
+    def value(self) -> Value:
+        macd = self.fast.ema - self.slow.ema
+        signal = self.signal.sma
+        return macd, signal, macd - signal
+
+
+class ATR(Indicator):
+    """
+    Average true range with Wilder smoothing: the mean of the first period
+    true ranges, then atr = (atr * (period - 1) + tr) / period
+    """
+
+    name = "atr"
+
+    def __init__(self, period: int = 14) -> None:
+        if period < 1:
+            raise ValueError("Period must be positive")
+        self.period = period
+        self.close = NAN
+        self.atr = 0.0
+        self.count = 0
+        self.previous = (NAN, 0.0, 0)
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        if replace:
+            self.close, self.atr, self.count = self.previous
+        else:
+            self.previous = (self.close, self.atr, self.count)
+        tr = high - low
+        if not math.isnan(self.close):
+            tr = max(tr, abs(high - self.close), abs(low - self.close))
+        self.count += 1
+        if self.count <= self.period:
+            self.atr += (tr - self.atr) / self.count
+        else:
+            self.atr = (self.atr * (self.period - 1) + tr) / self.period
+        self.close = close
+        return self.value
+
+    @property
+    def value(self) -> Value:
+        return self.atr if self.count >= self.period else NAN
+
+
+class VWAP(Indicator):
+    """
+    Volume weighted average of the typical price (high + low + close) / 3
+    over the last period bars
+    """
+
+    name = "vwap"
+
+    def __init__(self, period: int) -> None:
+        self.prices = RollingWindow(period)
+        self.volumes = RollingWindow(period)
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace: bool = False,
+    ) -> Value:
+        self.prices.push((high + low + close) / 3 * volume, replace)
+        self.volumes.push(volume, replace)
+        return self.value
+
+    @property
+    def value(self) -> Value:
+        if self.volumes.count == 0 or self.volumes.total == 0:
+            return NAN
+        return self.prices.total / self.volumes.total
@@ -0,0 +1,275 @@
+import math
+from typing import Optional, Tuple, Union
+
+import numpy
+
+ArrayLike = Union[numpy.ndarray, list]
+Bands = Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+
+# Smallest power of the decay used within a block of the recurrence, so that
+# its inverse does not overflow
+MIN_POWER = 1e-280
+
+
+def _as_float(values: Union[ArrayLike, float]) -> numpy.ndarray:
+    return numpy.asarray(values, dtype=float)
+
+
+def _check_window(window: int) -> None:
+    if window < 1:
+        raise ValueError("Window must be positive, not {}".format(window))
+
+
+def _recurrence(values: numpy.ndarray, decay: float) -> numpy.ndarray:
+    """
+    Return y[t] = decay * y[t - 1] + values[t] along the last axis, with
+    y[-1] = 0.
+
+    Within a block y[t] = decay^t * cumsum(values / decay^t), the blocks are
+    short enough for decay^t not to underflow and carry the last value over
+    """
+    if decay == 0:
+        return values.copy()
+    result = numpy.empty_like(values)
+    length = values.shape[-1]
+    block = max(1, min(length, int(math.log(MIN_POWER) / math.log(decay))))
+    powers = decay ** numpy.arange(block, dtype=float)
+    carry = numpy.zeros(values.shape[:-1])
+    for start in range(0, length, block):
+        end = min(start + block, length)
+        p = powers[: end - start]
+        y = p * numpy.cumsum(values[..., start:end] / p, axis=-1)
+        y += (carry * decay)[..., None] * p
+        result[..., start:end] = y
+        carry = y[..., -1]
+    return result
+
+
+def _precision_bars(decay: float) -> int:
+    return int(math.log(numpy.finfo(float).eps) / math.log(decay)) + 1
+
+
+def _ema_weights(length: int, decay: float) -> numpy.ndarray:
+    """
+    Return the sums of the weights of the first values of a series without
+    NaN, (1 - decay^(t + 1)) / (1 - decay), constant once decay^t is below
+    the float precision
+    """
+    weights = numpy.full(length, 1 / (1 - decay))
+    if decay > 0:
+        powers = decay ** numpy.arange(1, min(length, _precision_bars(decay)) + 1)
+        weights[: len(powers)] = (1 - powers) / (1 - decay)
+    return weights
+
+
+def _window_sums(values: numpy.ndarray, window: int) -> numpy.ndarray:
+    """
+    Return the sums of the last window values along the last axis, of fewer
+    values at the start of the series.
+
+    The cumulative sums restart every window values, so that their rounding
+    errors do not grow with the length of the series: a window ending in a
+    block is the prefix of the block plus the suffix of the previous one
+    """
+    length = values.shape[-1]
+    blocks = -(-length // window)
+    padded = numpy.zeros(values.shape[:-1] + (blocks * window,), values.dtype)
+    padded[..., :length] = values
+    shape = values.shape[:-1] + (blocks, window)
+    prefixes = numpy.cumsum(padded.reshape(shape), axis=-1)
+    suffixes = prefixes[..., -1:] - prefixes
+    prefixes[..., 1:, :] += suffixes[..., :-1, :]
+    return prefixes.reshape(padded.shape)[..., :length]
+
+
+def _rolling_sums(
+    values: numpy.ndarray, window: int
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Return the sums of the last window values along the last axis, NaN values
+    excluded, and the amount of values that are not NaN in each window
+    """
+    valid = ~numpy.isnan(values)
+    if valid.all():
+        length = values.shape[-1]
+        counts = numpy.minimum(numpy.arange(1, length + 1), window)
+        return _window_sums(values, window), counts
+    total = _window_sums(numpy.where(valid, values, 0.0), window)
+    return total, _window_sums(valid.astype(numpy.int64), window)
+
+
+def _reference(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    Return the first value of each series that is not NaN, subtracted before
+    the cumulative sums to keep them small
+    """
+    if values.shape[-1] == 0:
+        return numpy.zeros(values.shape[:-1] + (1,))
+    valid = ~numpy.isnan(values)
+    first = numpy.argmax(valid, axis=-1)[..., None]
+    reference = numpy.take_along_axis(values, first, axis=-1)
+    return numpy.where(numpy.isnan(reference), 0.0, reference)
+
+
+def ema(values: ArrayLike, span: int) -> numpy.ndarray:
+    """
+    Return the exponential moving average of the values along the last axis,
+    as pandas ewm(span=span).mean(): every value is weighted by
+    (1 - alpha)^age with alpha = 2 / (span + 1) and NaN values are skipped
+    """
+    _check_window(span)
+    values = _as_float(values)
+    valid = ~numpy.isnan(values)
+    decay = 1 - 2 / (span + 1)
+    if valid.all():
+        return _recurrence(values, decay) / _ema_weights(values.shape[-1], decay)
+    weighted = _recurrence(numpy.where(valid, values, 0.0), decay)
+    weights = _recurrence(valid.astype(float), decay)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where(weights > 0, weighted / weights, numpy.nan)
+
+
+def seeded_ema(
+    values: ArrayLike, period: int, alpha: Optional[float] = None
+) -> numpy.ndarray:
+    """
+    Return the exponential moving average of the values along the last axis
+    seeded with the simple average of the first period values, as the
+    AlphaVantage indicators. The first period - 1 items are NaN and leading
+    NaN values are skipped, the values that follow must not be NaN
+
+        - **alpha**: smoothing factor, 2 / (period + 1) by default, 1 / period
+          for the Wilder smoothing
+    """
+    _check_window(period)
+    values = _as_float(values)
+    if alpha is None:
+        alpha = 2 / (period + 1)
+    length = values.shape[-1]
+    if length == 0:
+        return values.copy()
+    valid = ~numpy.isnan(values)
+    seed_at = (numpy.argmax(valid, axis=-1) + period - 1)[..., None]
+    average = sma(values, period)
+    seed = numpy.take_along_axis(average, numpy.minimum(seed_at, length - 1), -1)
+    bars = numpy.arange(length)
+    inputs = numpy.where(valid, values, 0.0) * alpha
+    inputs = numpy.where(bars == seed_at, seed, inputs)
+    inputs = numpy.where(bars < seed_at, 0.0, inputs)
+    result = _recurrence(inputs, 1 - alpha)
+    result[numpy.broadcast_to(bars < seed_at, result.shape)] = numpy.nan
+    return result
+
+
+def sma(values: ArrayLike, window: int) -> numpy.ndarray:
+    """
+    Return the simple moving average of the values along the last axis, as
+    pandas rolling(window).mean(): NaN unless the window holds window values
+    """
+    _check_window(window)
+    values = _as_float(values)
+    reference = _reference(values)
+    total, count = _rolling_sums(values - reference, window)
+    with numpy.errstate(invalid="ignore"):
+        return numpy.where(count == window, total / window + reference, numpy.nan)
+
+
+def rolling_std(values: ArrayLike, window: int, ddof: int = 1) -> numpy.ndarray:
+    """
+    Return the moving standard deviation of the values along the last axis,
+    as pandas rolling(window).std(ddof), from the cumulative sums of the
+    values and of their squares
+    """
+    _check_window(window)
+    values = _as_float(values)
+    shifted = values - _reference(values)
+    total, count = _rolling_sums(shifted, window)
+    squares, _ = _rolling_sums(shifted**2, window)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        variance = (squares - total**2 / window) / (window - ddof)
+        std = numpy.sqrt(numpy.maximum(variance, 0.0))
+    return numpy.where((count == window) & (window > ddof), std, numpy.nan)
+
+
+def macd(close: ArrayLike, fast: int = 12, slow: int = 26, signal: int = 9) -> Bands:
+    """
+    Return the MACD line, its signal line and their difference, as
+    Utils.macd_df_from_list: the signal line is the simple moving average of
+    the MACD line
+    """
+    close = _as_float(close)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = sma(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close: ArrayLike, window: int, k: float = 2.0, ddof: int = 1) -> Bands:
+    """
+    Return the moving average of the close prices and the bands k standard
+    deviations above and below it
+    """
+    close = _as_float(close)
+    average = sma(close, window)
+    width = rolling_std(close, window, ddof) * k
+    return average, average + width, average - width
+
+
+def true_range(high: ArrayLike, low: ArrayLike, close: ArrayLike) -> numpy.ndarray:
+    """
+    Return the true range of the bars along the last axis, the high minus
+    the low price for the first bar
+    """
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    previous = numpy.full_like(close, numpy.nan)
+    previous[..., 1:] = close[..., :-1]
+    result = numpy.fmax(numpy.abs(high - previous), numpy.abs(low - previous))
+    return numpy.where(
+        numpy.isnan(high - low), numpy.nan, numpy.fmax(high - low, result)
+    )
+
+
+def atr(
+    high: ArrayLike, low: ArrayLike, close: ArrayLike, period: int = 14
+) -> numpy.ndarray:
+    """
+    Return the average true range with the Wilder smoothing, seeded with the
+    average of the first period true ranges
+    """
+    return seeded_ema(true_range(high, low, close), period, 1 / period)
+
+
+def vwap(
+    high: ArrayLike,
+    low: ArrayLike,
+    close: ArrayLike,
+    volume: ArrayLike,
+    period: int,
+) -> numpy.ndarray:
+    """
+    Return the volume weighted average of the typical price
+    (high + low + close) / 3 over the last period bars, or over the bars
+    available at the start of the series
+    """
+    _check_window(period)
+    typical = (_as_float(high) + _as_float(low) + _as_float(close)) / 3
+    volume = _as_float(volume)
+    traded, _ = _rolling_sums(typical * volume, period)
+    volumes, count = _rolling_sums(volume, period)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where((count > 0) & (volumes != 0), traded / volumes, numpy.nan)
+
+
+def crossover(first: ArrayLike, second: Union[ArrayLike, float]) -> numpy.ndarray:
+    """
+    Return 1 where the first series crosses above the second one, -1 where
+    it crosses below and 0 elsewhere, along the last axis. A cross above
+    happens when first > second after first <= second on the previous bar.
+    Bars compared with NaN never cross
+    """
+    diff = _as_float(first) - _as_float(second)
+    result = numpy.zeros(diff.shape, dtype=numpy.int8)
+    current, previous = diff[..., 1:], diff[..., :-1]
+    with numpy.errstate(invalid="ignore"):
+        result[..., 1:][(current > 0) & (previous <= 0)] = 1
+        result[..., 1:][(current < 0) & (previous >= 0)] = -1
+    return result
@@ -1,4 +1,7 @@
 from .market import Market  # NOQA # isort:skip
 from .market_history import MarketHistory  # NOQA # isort:skip
 from .market_macd import MarketMACD  # NOQA # isort:skip
+from .price_window import PriceWindow  # NOQA # isort:skip
+from .market_snapshot_table import MarketSnapshotTable  # NOQA # isort:skip
+from .history_batch import HistoryBatch  # NOQA # isort:skip
 from .position import Position  # NOQA # isort:skip
@@ -0,0 +1,66 @@
+from typing import Any, Optional
+
+import numpy
+import pandas
+
+
+def as_column(values: Any) -> numpy.ndarray:
+    """
+    Return the values as a contiguous float64 array, without copying them
+    if they already are one
+    """
+    return numpy.ascontiguousarray(values, dtype=numpy.float64)
+
+
+def as_dates(values: Any) -> numpy.ndarray:
+    """
+    Return the dates as a contiguous datetime64 array. Numeric values are
+    positional indexes and are kept as they are
+    """
+    array = numpy.asarray(values)
+    if array.dtype.kind in "iuf" or array.dtype.kind == "M":
+        return numpy.ascontiguousarray(array)
+    return numpy.ascontiguousarray(pandas.to_datetime(values).values)
+
+
+def chronological_order(dates: numpy.ndarray) -> Optional[numpy.ndarray]:
+    """
+    Return the indexes sorting the dates from the oldest to the most recent,
+    or None if they already are in that order
+    """
+    if len(dates) < 2 or bool(numpy.all(dates[1:] >= dates[:-1])):
+        return None
+    return numpy.argsort(dates, kind="stable")
+
+
+def latest_rows(length: int, n: int) -> slice:
+    """
+    Return the slice of the n most recent rows of a column of the given length
+    """
+    return slice(max(length - max(n, 0), 0), length)
+
+
+def date_rows(dates: numpy.ndarray, start: Any = None, end: Any = None) -> slice:
+    """
+    Return the slice of the rows dated between start and end included, found
+    with a binary search of the chronologically ordered dates. None leaves
+    the range open on that side
+    """
+    first = 0 if start is None else _search(dates, start, False)
+    last = len(dates) if end is None else _search(dates, end, True)
+    return slice(first, max(first, last))
+
+
+def _search(dates: numpy.ndarray, value: Any, after: bool) -> int:
+    """
+    Return the index of the first date after the value, or from the value
+    when after is False
+    """
+    if dates.dtype.kind == "M":
+        target = pandas.Timestamp(value).to_datetime64()
+        value = target.astype(dates.dtype)
+        # The value falls between two dates at the resolution of the column
+        after = after or value < target
+    if after:
+        return int(numpy.searchsorted(dates, value, side="right"))
+    return int(numpy.searchsorted(dates, value, side="left"))
@@ -0,0 +1,145 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy
+
+from ..indicators import kernels
+from . import Market, MarketHistory, MarketMACD
+
+
+class HistoryBatch:
+    """
+    Price histories of a universe of markets stacked in (markets x bars)
+    arrays, so that an indicator is computed for all the markets in a single
+    call of its kernel. Each row holds the most recent bars of a market
+    aligned on the last column: the older bars of the shorter histories are
+    NaN, and NaT for the dates. The indicators are returned by epic as views
+    of the rows without the padding
+    """
+
+    markets: List[Market]
+    epics: List[str]
+    lengths: numpy.ndarray
+    dates: numpy.ndarray
+    high: numpy.ndarray
+    low: numpy.ndarray
+    close: numpy.ndarray
+    volume: numpy.ndarray
+
+    def __init__(
+        self, histories: Iterable[MarketHistory], bars: Optional[int] = None
+    ) -> None:
+        """
+        - **histories**: price histories of the markets
+        - **bars**: amount of most recent bars kept of each history, by
+          default as many as the longest history
+        """
+        histories = list(histories)
+        if bars is None:
+            bars = max((len(h) for h in histories), default=0)
+        histories = [h.latest(bars) for h in histories]
+        self.markets = [h.market for h in histories]
+        self.epics = [m.epic for m in self.markets]
+        self._rows = {epic: row for row, epic in enumerate(self.epics)}
+        self.lengths = numpy.array([len(h) for h in histories], dtype=numpy.int64)
+        shape = (len(histories), bars)
+        self.dates = numpy.full(shape, numpy.datetime64("NaT"), "datetime64[ns]")
+        self.high = numpy.full(shape, numpy.nan)
+        self.low = numpy.full(shape, numpy.nan)
+        self.close = numpy.full(shape, numpy.nan)
+        self.volume = numpy.full(shape, numpy.nan)
+        for row, history in enumerate(histories):
+            start = bars - len(history)
+            self.dates[row, start:] = history.dates
+            self.high[row, start:] = history.high
+            self.low[row, start:] = history.low
+            self.close[row, start:] = history.close
+            self.volume[row, start:] = history.volume
+
+    def __len__(self) -> int:
+        return len(self.epics)
+
+    def __contains__(self, epic: object) -> bool:
+        return epic in self._rows
+
+    @property
+    def bars(self) -> int:
+        return self.close.shape[1]
+
+    def row(self, epic: str) -> int:
+        """
+        Return the row of the market
+
+            - Raise a KeyError if the market is not stored
+        """
+        return self._rows[epic]
+
+    def series(self, values: numpy.ndarray, epic: str) -> numpy.ndarray:
+        """
+        Return a view of the bars of the market in a (markets x bars) array
+        computed from the batch, without the padding
+        """
+        row = self._rows[epic]
+        start = self.bars - int(self.lengths[row])
+        return values[row, start:]
+
+    def split(self, values: numpy.ndarray) -> Dict[str, numpy.ndarray]:
+        """
+        Return the views of the bars of each market in a (markets x bars)
+        array computed from the batch, by epic
+        """
+        return {epic: self.series(values, epic) for epic in self.epics}
+
+    def history(self, epic: str) -> MarketHistory:
+        """
+        Return the price history of the market sharing the batch arrays
+        """
+        market = self.markets[self._rows[epic]]
+        return MarketHistory.from_columns(
+            market,
+            self.series(self.dates, epic),
+            self.series(self.high, epic),
+            self.series(self.low, epic),
+            self.series(self.close, epic),
+            self.series(self.volume, epic),
+        )
+
+    def macd(
+        self, fast: int = 12, slow: int = 26, signal: int = 9
+    ) -> Dict[str, MarketMACD]:
+        """
+        Return the MACD of all the markets, as Utils.macd_df_from_list, by epic
+        """
+        line, signal_line, hist = kernels.macd(self.close, fast, slow, signal)
+        return {
+            epic: MarketMACD.from_columns(
+                market,
+                self.series(self.dates, epic),
+                self.series(line, epic),
+                self.series(signal_line, epic),
+                self.series(hist, epic),
+            )
+            for epic, market in zip(self.epics, self.markets)
+        }
+
+    def bollinger(
+        self, window: int, k: float = 2.0, ddof: int = 1
+    ) -> Dict[str, kernels.Bands]:
+        """
+        Return the moving average of the close prices and the bands k standard
+        deviations above and below it of all the markets, by epic
+        """
+        average, upper, lower = kernels.bollinger(self.close, window, k, ddof)
+        return {
+            epic: (
+                self.series(average, epic),
+                self.series(upper, epic),
+                self.series(lower, epic),
+            )
+            for epic in self.epics
+        }
+
+    def atr(self, period: int = 14) -> Dict[str, numpy.ndarray]:
+        """
+        Return the average true range of all the markets, by epic
+        """
+        return self.split(kernels.atr(self.high, self.low, self.close, period))
@@ -1,17 +1,60 @@
+from typing import Any, Dict
+
+
 class Market:
     """
     Represent a tradable market with latest price information
     """
 
-    epic: str = "unknown"
-    id: str = "unknown"
-    name: str = "unknown"
-    bid: float = 0.0
-    offer: float = 0.0
-    high: float = 0.0
-    low: float = 0.0
-    stop_distance_min: float = 0.0
-    expiry: str = "unknown"
+    __slots__ = (
+        "epic",
+        "id",
+        "name",
+        "bid",
+        "offer",
+        "high",
+        "low",
+        "stop_distance_min",
+        "expiry",
+    )
+
+    epic: str
+    id: str
+    name: str
+    bid: float
+    offer: float
+    high: float
+    low: float
+    stop_distance_min: float
+    expiry: str
+
+    def __init__(
+        self,
+        epic: str = "unknown",
+        id: str = "unknown",
+        name: str = "unknown",
+        bid: float = 0.0,
+        offer: float = 0.0,
+        high: float = 0.0,
+        low: float = 0.0,
+        stop_distance_min: float = 0.0,
+        expiry: str = "unknown",
+    ) -> None:
+        self.epic = epic
+        self.id = id
+        self.name = name
+        self.bid = bid
+        self.offer = offer
+        self.high = high
+        self.low = low
+        self.stop_distance_min = stop_distance_min
+        self.expiry = expiry
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
 
-    def __init__(self) -> None:
-        pass
+    def replace(self, **changes: Any) -> "Market":
+        """
+        Return a copy of the market with the given attributes changed
+        """
+        return Market(**dict(self.to_dict(), **changes))
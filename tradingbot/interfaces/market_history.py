@@ -1,11 +1,19 @@
-from typing import List
+from typing import Any, List, Optional, Union
 
+import numpy
 import pandas
 
 from . import Market
+from .columns import as_column, as_dates, chronological_order, date_rows, latest_rows
 
 
 class MarketHistory:
+    """
+    Price history of a market stored as contiguous NumPy columns, ordered from the
+    oldest to the most recent row. The pandas dataframe is only built when
+    first accessed
+    """
+
     DATE_COLUMN: str = "date"
     HIGH_COLUMN: str = "high"
     LOW_COLUMN: str = "low"
@@ -13,30 +21,94 @@ class MarketHistory:
     VOLUME_COLUMN: str = "volume"
 
     market: Market
-    dataframe: pandas.DataFrame
+    dates: numpy.ndarray
+    high: numpy.ndarray
+    low: numpy.ndarray
+    close: numpy.ndarray
+    volume: numpy.ndarray
 
     def __init__(
         self,
         market: Market,
-        date: List[str],
-        high: List[float],
-        low: List[float],
-        close: List[float],
-        volume: List[float],
+        date: Union[List[str], numpy.ndarray],
+        high: Union[List[float], numpy.ndarray],
+        low: Union[List[float], numpy.ndarray],
+        close: Union[List[float], numpy.ndarray],
+        volume: Union[List[float], numpy.ndarray],
     ) -> None:
         self.market = market
-        self.dataframe = pandas.DataFrame(
-            columns=[
-                self.DATE_COLUMN,
-                self.HIGH_COLUMN,
-                self.LOW_COLUMN,
-                self.CLOSE_COLUMN,
-                self.VOLUME_COLUMN,
-            ]
+        self.dates = as_dates(date)
+        columns = [as_column(c) for c in (high, low, close, volume)]
+        # Rows are kept from the oldest to the most recent whatever the
+        # order the provider returned them in
+        order = chronological_order(self.dates)
+        if order is not None:
+            self.dates = self.dates[order]
+            columns = [c[order] for c in columns]
+        self.high, self.low, self.close, self.volume = columns
+        self._dataframe: Optional[pandas.DataFrame] = None
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def latest(self, n: int) -> "MarketHistory":
+        """
+        Return a view of the n most recent rows, without copying the columns
+        """
+        return self._rows(latest_rows(len(self), n))
+
+    def between(self, start: Any = None, end: Any = None) -> "MarketHistory":
+        """
+        Return a view of the rows dated between start and end included.
+        None leaves the range open on that side
+        """
+        return self._rows(date_rows(self.dates, start, end))
+
+    @classmethod
+    def from_columns(
+        cls,
+        market: Market,
+        dates: numpy.ndarray,
+        high: numpy.ndarray,
+        low: numpy.ndarray,
+        close: numpy.ndarray,
+        volume: numpy.ndarray,
+    ) -> "MarketHistory":
+        """
+        Return a history sharing the given columns, without converting or
+        sorting them. Columns must be contiguous float64 arrays and dates
+        must be in chronological order
+        """
+        history = cls.__new__(cls)
+        history.market = market
+        history.dates = dates
+        history.high = high
+        history.low = low
+        history.close = close
+        history.volume = volume
+        history._dataframe = None
+        return history
+
+    def _rows(self, rows: slice) -> "MarketHistory":
+        return MarketHistory.from_columns(
+            self.market,
+            self.dates[rows],
+            self.high[rows],
+            self.low[rows],
+            self.close[rows],
+            self.volume[rows],
         )
-        # TODO if date is None or empty use index
-        self.dataframe[self.DATE_COLUMN] = date
-        self.dataframe[self.HIGH_COLUMN] = high
-        self.dataframe[self.LOW_COLUMN] = low
-        self.dataframe[self.CLOSE_COLUMN] = close
-        self.dataframe[self.VOLUME_COLUMN] = volume
+
+    @property
+    def dataframe(self) -> pandas.DataFrame:
+        if self._dataframe is None:
+            self._dataframe = pandas.DataFrame(
+                {
+                    self.DATE_COLUMN: self.dates,
+                    self.HIGH_COLUMN: self.high,
+                    self.LOW_COLUMN: self.low,
+                    self.CLOSE_COLUMN: self.close,
+                    self.VOLUME_COLUMN: self.volume,
+                }
+            )
+        return self._dataframe
@@ -1,38 +1,107 @@
-from typing import List
+from typing import Any, List, Optional, Union
 
+import numpy
 import pandas
 
 from . import Market
+from .columns import as_column, as_dates, chronological_order, date_rows, latest_rows
 
 
 class MarketMACD:
+    """
+    MACD indicator of a market stored as contiguous NumPy columns, ordered from the
+    oldest to the most recent row. The pandas dataframe is only built when
+    first accessed
+    """
+
     DATE_COLUMN: str = "Date"
     MACD_COLUMN: str = "MACD"
     SIGNAL_COLUMN: str = "Signal"
     HIST_COLUMN: str = "Hist"
 
     market: Market
-    dataframe: pandas.DataFrame
+    dates: numpy.ndarray
+    macd: numpy.ndarray
+    signal: numpy.ndarray
+    hist: numpy.ndarray
 
     def __init__(
         self,
         market: Market,
-        date: List[str],
-        macd: List[float],
-        signal: List[float],
-        hist: List[float],
+        date: Union[List[str], numpy.ndarray],
+        macd: Union[List[float], numpy.ndarray],
+        signal: Union[List[float], numpy.ndarray],
+        hist: Union[List[float], numpy.ndarray],
     ) -> None:
         self.market = market
-        self.dataframe = pandas.DataFrame(
-            columns=[
-                self.DATE_COLUMN,
-                self.MACD_COLUMN,
-                self.SIGNAL_COLUMN,
-                self.HIST_COLUMN,
-            ]
+        self.dates = as_dates(date)
+        columns = [as_column(c) for c in (macd, signal, hist)]
+        # Rows are kept from the oldest to the most recent whatever the
+        # order the provider returned them in
+        order = chronological_order(self.dates)
+        if order is not None:
+            self.dates = self.dates[order]
+            columns = [c[order] for c in columns]
+        self.macd, self.signal, self.hist = columns
+        self._dataframe: Optional[pandas.DataFrame] = None
+
+    def __len__(self) -> int:
+        return len(self.hist)
+
+    def latest(self, n: int) -> "MarketMACD":
+        """
+        Return a view of the n most recent rows, without copying the columns
+        """
+        return self._rows(latest_rows(len(self), n))
+
+    def between(self, start: Any = None, end: Any = None) -> "MarketMACD":
+        """
+        Return a view of the rows dated between start and end included.
+        None leaves the range open on that side
+        """
+        return self._rows(date_rows(self.dates, start, end))
+
+    @classmethod
+    def from_columns(
+        cls,
+        market: Market,
+        dates: numpy.ndarray,
+        macd: numpy.ndarray,
+        signal: numpy.ndarray,
+        hist: numpy.ndarray,
+    ) -> "MarketMACD":
+        """
+        Return a MACD sharing the given columns, without converting or
+        sorting them. Columns must be contiguous float64 arrays and dates
+        must be in chronological order
+        """
+        view = cls.__new__(cls)
+        view.market = market
+        view.dates = dates
+        view.macd = macd
+        view.signal = signal
+        view.hist = hist
+        view._dataframe = None
+        return view
+
+    def _rows(self, rows: slice) -> "MarketMACD":
+        return MarketMACD.from_columns(
+            self.market,
+            self.dates[rows],
+            self.macd[rows],
+            self.signal[rows],
+            self.hist[rows],
         )
-        # TODO if date is None or empty use index
-        self.dataframe[self.DATE_COLUMN] = date
-        self.dataframe[self.MACD_COLUMN] = macd
-        self.dataframe[self.SIGNAL_COLUMN] = signal
-        self.dataframe[self.HIST_COLUMN] = hist
+
+    @property
+    def dataframe(self) -> pandas.DataFrame:
+        if self._dataframe is None:
+            self._dataframe = pandas.DataFrame(
+                {
+                    self.DATE_COLUMN: self.dates,
+                    self.MACD_COLUMN: self.macd,
+                    self.SIGNAL_COLUMN: self.signal,
+                    self.HIST_COLUMN: self.hist,
+                }
+            )
+        return self._dataframe
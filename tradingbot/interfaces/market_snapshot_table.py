@@ -0,0 +1,170 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy
+
+from . import Market
+
+# Rows of the price columns
+BID, OFFER, HIGH, LOW, STOP_DISTANCE_MIN = range(5)
+
+
+class MarketSnapshotTable:
+    """
+    Latest price snapshots of a universe of markets stored as NumPy columns,
+    one row per market indexed by epic, for the operations over all the
+    markets. Rows are kept in the order the markets are first added and
+    the storage doubles when full, so that adding a market is amortised O(1)
+    """
+
+    epics: List[str]
+
+    def __init__(self, capacity: int = 64) -> None:
+        """
+        - **capacity**: amount of markets stored before growing the columns
+        """
+        self.epics = []
+        self._rows: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._expiries: List[str] = []
+        self._prices = numpy.zeros((5, max(capacity, 1)), dtype=numpy.float64)
+
+    @classmethod
+    def from_markets(cls, markets: Iterable[Market]) -> "MarketSnapshotTable":
+        markets = list(markets)
+        table = cls(len(markets))
+        table.update_many(markets)
+        return table
+
+    @classmethod
+    def from_columns(
+        cls,
+        epics: List[str],
+        ids: List[str],
+        names: List[str],
+        expiries: List[str],
+        prices: numpy.ndarray,
+    ) -> "MarketSnapshotTable":
+        """
+        Return a table sharing the given price columns without copying them
+
+            - **prices**: float64 array with the bid, offer, high, low and
+              minimum stop distance rows of the markets
+        """
+        table = cls.__new__(cls)
+        table.epics = list(epics)
+        table._rows = {epic: row for row, epic in enumerate(epics)}
+        table._ids = list(ids)
+        table._names = list(names)
+        table._expiries = list(expiries)
+        table._prices = prices
+        return table
+
+    def columns(self) -> Tuple[List[str], List[str], List[str], numpy.ndarray]:
+        """
+        Return the ids, names, expiries and price columns of the markets,
+        the arguments of from_columns after the epics
+        """
+        return self._ids, self._names, self._expiries, self._prices[:, : len(self)]
+
+    def __len__(self) -> int:
+        return len(self.epics)
+
+    def __contains__(self, epic: object) -> bool:
+        return epic in self._rows
+
+    def row(self, epic: str) -> int:
+        """
+        Return the row of the market
+
+            - Raise a KeyError if the market is not stored
+        """
+        return self._rows[epic]
+
+    @property
+    def bid(self) -> numpy.ndarray:
+        return self._prices[BID, : len(self)]
+
+    @property
+    def offer(self) -> numpy.ndarray:
+        return self._prices[OFFER, : len(self)]
+
+    @property
+    def high(self) -> numpy.ndarray:
+        return self._prices[HIGH, : len(self)]
+
+    @property
+    def low(self) -> numpy.ndarray:
+        return self._prices[LOW, : len(self)]
+
+    @property
+    def stop_distance_min(self) -> numpy.ndarray:
+        return self._prices[STOP_DISTANCE_MIN, : len(self)]
+
+    def spread(self) -> numpy.ndarray:
+        return self.offer - self.bid
+
+    def mid(self) -> numpy.ndarray:
+        return (self.offer + self.bid) / 2
+
+    def update(self, market: Market) -> int:
+        """
+        Store the snapshot of the market, replacing the previous one, and
+        return its row
+        """
+        row = self._rows.get(market.epic)
+        if row is None:
+            row = len(self.epics)
+            if row == self._prices.shape[1]:
+                self._grow()
+            self._rows[market.epic] = row
+            self.epics.append(market.epic)
+            self._ids.append(market.id)
+            self._names.append(market.name)
+            self._expiries.append(market.expiry)
+        else:
+            self._ids[row] = market.id
+            self._names[row] = market.name
+            self._expiries[row] = market.expiry
+        self._prices[:, row] = (
+            market.bid,
+            market.offer,
+            market.high,
+            market.low,
+            market.stop_distance_min,
+        )
+        return row
+
+    def update_many(self, markets: Iterable[Market]) -> None:
+        for market in markets:
+            self.update(market)
+
+    def _grow(self) -> None:
+        prices = numpy.zeros((5, 2 * self._prices.shape[1]), dtype=numpy.float64)
+        prices[:, : self._prices.shape[1]] = self._prices
+        self._prices = prices
+
+    def market(self, epic: str) -> Market:
+        """
+        Return the snapshot of the market as a Market
+
+            - Raise a KeyError if the market is not stored
+        """
+        return self._market(self._rows[epic])
+
+    def to_markets(self) -> List[Market]:
+        return [self._market(row) for row in range(len(self))]
+
+    def _market(self, row: int) -> Market:
+        bid, offer, high, low, stop_distance_min = self._prices[:, row].tolist()
+        return Market(
+            epic=self.epics[row],
+            id=self._ids[row],
+            name=self._names[row],
+            bid=bid,
+            offer=offer,
+            high=high,
+            low=low,
+            stop_distance_min=stop_distance_min,
+            expiry=self._expiries[row],
+        )
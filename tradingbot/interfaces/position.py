@@ -1,10 +1,23 @@
-from typing import Any
+from typing import Any, Dict
 
 from ..components import TradeDirection
 
 
 class Position:
 
+    __slots__ = (
+        "deal_id",
+        "size",
+        "create_date",
+        "direction",
+        "level",
+        "limit",
+        "stop",
+        "currency",
+        "epic",
+        "market_id",
+    )
+
     deal_id: str
     size: int
     create_date: str
@@ -27,3 +40,12 @@ class Position:
         self.currency = kargs["currency"]
         self.epic = kargs["epic"]
         self.market_id = kargs["market_id"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def replace(self, **changes: Any) -> "Position":
+        """
+        Return a copy of the position with the given attributes changed
+        """
+        return Position(**dict(self.to_dict(), **changes))
@@ -0,0 +1,112 @@
+from typing import Any, Optional
+
+import numpy
+
+from . import Market, MarketHistory
+from .columns import as_column, as_dates, latest_rows
+
+# Rows of the price columns in the ring buffer
+HIGH, LOW, CLOSE, VOLUME = range(4)
+
+
+class PriceWindow:
+    """
+    Fixed capacity ring buffer of the most recent bars of a market, oldest
+    first.
+
+    Each bar is written twice, capacity slots apart, so that the most recent
+    bars always are a contiguous slice of the buffer: appending a bar is O(1)
+    and the histories returned are views that are never copied. A view of n
+    bars stays valid for capacity - n appends, except for its most recent bar
+    that is updated in place when a bar with the same date is appended
+    """
+
+    capacity: int
+
+    def __init__(self, capacity: int) -> None:
+        """
+        - **capacity**: maximum amount of bars kept
+        """
+        if capacity < 1:
+            raise ValueError("Window capacity must be positive")
+        self.capacity = capacity
+        self._dates = numpy.zeros(2 * capacity, dtype="datetime64[ns]")
+        self._columns = numpy.zeros((4, 2 * capacity), dtype=numpy.float64)
+        self._slot = capacity - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def last_date(self) -> Optional[numpy.datetime64]:
+        """
+        Return the date of the most recent bar, None if the window is empty
+        """
+        if self._count == 0:
+            return None
+        return self._dates[self._slot]
+
+    def append(
+        self, date: Any, high: float, low: float, close: float, volume: float
+    ) -> None:
+        """
+        Append a bar, or replace the most recent one if it has the same date
+
+            - Raise a ValueError if the bar is older than the most recent one
+        """
+        date = as_dates([date]).astype("datetime64[ns]")[0]
+        self._append(date, high, low, close, volume)
+
+    def extend(self, dates: Any, high: Any, low: Any, close: Any, volume: Any) -> None:
+        """
+        Append the bars of the given columns, oldest first
+        """
+        dates = as_dates(dates).astype("datetime64[ns]")
+        columns = [as_column(c) for c in (high, low, close, volume)]
+        # The older bars would be overwritten anyway
+        first = max(len(dates) - self.capacity, 0)
+        for i in range(first, len(dates)):
+            self._append(dates[i], *[c[i] for c in columns])
+
+    def _append(
+        self,
+        date: numpy.datetime64,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+    ) -> None:
+        last_date = self.last_date()
+        if last_date is None or date > last_date:
+            self._slot = (self._slot + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        elif date < last_date:
+            raise ValueError(
+                "Bar of {} older than the last one of {}".format(date, last_date)
+            )
+        for slot in (self._slot, self._slot + self.capacity):
+            self._dates[slot] = date
+            self._columns[HIGH, slot] = high
+            self._columns[LOW, slot] = low
+            self._columns[CLOSE, slot] = close
+            self._columns[VOLUME, slot] = volume
+
+    def clear(self) -> None:
+        self._slot = self.capacity - 1
+        self._count = 0
+
+    def history(self, market: Market, n: Optional[int] = None) -> MarketHistory:
+        """
+        Return a view of the n most recent bars, all of them if None
+        """
+        # The most recent bars end at the second copy of the last slot
+        end = self._slot + self.capacity + 1
+        rows = latest_rows(end, self._count if n is None else min(n, self._count))
+        return MarketHistory.from_columns(
+            market,
+            self._dates[rows],
+            self._columns[HIGH, rows],
+            self._columns[LOW, rows],
+            self._columns[CLOSE, rows],
+            self._columns[VOLUME, rows],
+        )
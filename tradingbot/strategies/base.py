@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 from ..components import Configuration, TradeDirection
 from ..components.broker import Broker
+from ..indicators import IndicatorGraph
 from ..interfaces import Market, Position
 
 DataPoints = Any
@@ -19,10 +20,13 @@ class Strategy(ABC):
 
     positions: Optional[List[Position]] = None
     broker: Broker
+    indicators: IndicatorGraph
 
     def __init__(self, config: Configuration, broker: Broker) -> None:
         self.positions = None
         self.broker = broker
+        # Replaced by the graph shared by the strategies of the same factory
+        self.indicators = IndicatorGraph()
         # Read configuration of derived Strategy
         self.read_configuration(config)
         # Initialise derived Strategy
@@ -3,6 +3,7 @@ from typing import Union
 
 from ..components import Configuration
 from ..components.broker import Broker
+from ..indicators import IndicatorGraph
 from . import SimpleBollingerBands, SimpleMACD, WeightedAvgPeak
 
 StrategyImpl = Union[SimpleMACD, WeightedAvgPeak, SimpleBollingerBands]
@@ -22,6 +23,7 @@ class StrategyFactory:
 
     config: Configuration
     broker: Broker
+    indicators: IndicatorGraph
 
     def __init__(self, config: Configuration, broker: Broker) -> None:
         """
@@ -34,6 +36,8 @@ class StrategyFactory:
         """
         self.config = config
         self.broker = broker
+        # Strategies share the indicators they have in common
+        self.indicators = IndicatorGraph()
 
     def make_strategy(self, strategy_name: str) -> StrategyImpl:
         """
@@ -45,14 +49,17 @@ class StrategyFactory:
             - Returns an instance of the requested Strategy or None if an
               error occurres
         """
+        strategy: StrategyImpl
         if strategy_name == StrategyNames.SIMPLE_MACD.value:
-            return SimpleMACD(self.config, self.broker)
+            strategy = SimpleMACD(self.config, self.broker)
         elif strategy_name == StrategyNames.WEIGHTED_AVG_PEAK.value:
-            return WeightedAvgPeak(self.config, self.broker)
+            strategy = WeightedAvgPeak(self.config, self.broker)
         elif strategy_name == StrategyNames.SIMPLE_BOLL_BANDS.value:
-            return SimpleBollingerBands(self.config, self.broker)
+            strategy = SimpleBollingerBands(self.config, self.broker)
         else:
             raise ValueError("Strategy {} does not exist".format(strategy_name))
+        strategy.indicators = self.indicators
+        return strategy
 
     def make_from_configuration(self) -> StrategyImpl:
         """
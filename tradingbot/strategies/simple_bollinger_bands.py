@@ -1,14 +1,14 @@
 import logging
 from datetime import datetime
 
-# import matplotlib.pyplot as plt
-import pandas
-
 from ..components import Configuration, Interval, TradeDirection, Utils
 from ..components.broker import Broker
+from ..indicators import crossover
 from ..interfaces import Market, MarketHistory
 from . import BacktestResult, Strategy, TradeSignal
 
+# import matplotlib.pyplot as plt
+
 
 class SimpleBollingerBands(Strategy):
     """Simple strategy that calculate the Bollinger Bands of the given market using
@@ -44,28 +44,17 @@ class SimpleBollingerBands(Strategy):
     def find_trade_signal(
         self, market: Market, datapoints: MarketHistory
     ) -> TradeSignal:
-        # Copy only the required amount of data
-        df = datapoints.dataframe[: self.window * 2].copy()
-        indexer = pandas.api.indexers.FixedForwardWindowIndexer(window_size=self.window)
-        # Compute the price moving averate
-        df["MA"] = df[MarketHistory.CLOSE_COLUMN].rolling(window=indexer).mean()
-        # Compute the prices standard deviation
-        # set .std(ddof=0) for population std instead of sample
-        df["STD"] = df[MarketHistory.CLOSE_COLUMN].rolling(window=indexer).std()
-        # Compute upper band
-        df["Upper_Band"] = df["MA"] + (df["STD"] * 2)
-        # Compute lower band
-        df["Lower_Band"] = df["MA"] - (df["STD"] * 2)
-
-        # self._plot(df)
+        datapoints = datapoints.latest(self.window * 2)
+        close = datapoints.close
+        # Compute the price moving average and the bands two sample standard
+        # deviations above and below it
+        ma, _upper_band, lower_band = self.indicators.compute(
+            datapoints, "bollinger", window=self.window
+        )
 
         # Compare the last price with the band boundaries and trigger signals
-        cross_lower_band_and_back = (
-            df[MarketHistory.CLOSE_COLUMN].iloc[0] > df["Lower_Band"].iloc[0]
-        ) and (df[MarketHistory.CLOSE_COLUMN].iloc[1] <= df["Lower_Band"].iloc[1])
-        stable_below_ma = (
-            df[MarketHistory.CLOSE_COLUMN].iloc[0:5] < df["MA"].iloc[0:5]
-        ).all()
+        cross_lower_band_and_back = crossover(close, lower_band)[-1] > 0
+        stable_below_ma = bool((close[-5:] < ma[-5:]).all())
 
         if any([cross_lower_band_and_back, stable_below_ma]):
             return self._buy_signal(market)
@@ -63,6 +63,8 @@ class SimpleMACD(Strategy):
         # Find where macd and signal cross each other
         macd = datapoints
         px = self.generate_signals_from_dataframe(macd.dataframe)
+        # Keep the market prices fresh when the MACD is about to cross its signal
+        self.broker.set_market_priority(market.epic, self.signal_proximity(px))
 
         # Identify the trade direction looking at the last signal
         tradeDirection = self.get_trade_direction_from_signals(px)
@@ -113,14 +115,28 @@ class SimpleMACD(Strategy):
         dataframe.loc[:, "signals"] = dataframe["positions"].diff()
         return dataframe
 
+    def signal_proximity(self, dataframe: pandas.DataFrame) -> float:
+        """
+        Return 1.0 if the MACD histogram of the most recent bar is close to zero
+        compared to its average magnitude, meaning a cross is likely, 0.0
+        otherwise
+        """
+        hist = dataframe[MarketMACD.HIST_COLUMN].dropna()
+        if len(hist) < 2:
+            return 0.0
+        scale = hist.abs().mean()
+        if scale > 0 and abs(hist.iloc[-1]) <= 0.25 * scale:
+            return 1.0
+        return 0.0
+
     def get_trade_direction_from_signals(
         self, dataframe: pandas.DataFrame
     ) -> TradeDirection:
         tradeDirection = TradeDirection.NONE
         if len(dataframe["signals"]) > 0:
-            if dataframe["signals"].iloc[1] < 0:
+            if dataframe["signals"].iloc[-1] > 0:
                 tradeDirection = TradeDirection.BUY
-            elif dataframe["signals"].iloc[1] > 0:
+            elif dataframe["signals"].iloc[-1] < 0:
                 tradeDirection = TradeDirection.SELL
         return tradeDirection
 
@@ -11,6 +11,7 @@ from scipy import stats
 
 from ..components import Configuration, Interval, TradeDirection, Utils
 from ..components.broker import Broker
+from ..indicators import true_range
 from ..interfaces import Market, MarketHistory
 from . import BacktestResult, Strategy, TradeSignal
 
@@ -68,10 +69,10 @@ class WeightedAvgPeak(Strategy):
         # Compute mid price
         current_mid = Utils.midpoint(market.bid, market.offer)
 
-        high_prices = datapoints.dataframe[MarketHistory.HIGH_COLUMN].values
-        low_prices = datapoints.dataframe[MarketHistory.LOW_COLUMN].values
-        close_prices = datapoints.dataframe[MarketHistory.CLOSE_COLUMN].values
-        ltv = datapoints.dataframe[MarketHistory.VOLUME_COLUMN].values
+        high_prices = datapoints.high
+        low_prices = datapoints.low
+        close_prices = datapoints.close
+        ltv = datapoints.volume
 
         # Check dataset integrity
         array_len_check = []
@@ -128,17 +129,10 @@ class WeightedAvgPeak(Strategy):
             maxtab_high_a_hi_slope,
         ) = stats.mstats.theilslopes(maxtab_high_a, xc, 0.99)
 
-        peak_count_high = 0
-        peak_count_low = 0
         # how may "peaks" are BELOW the threshold
-        for a in mintab_low_a:
-            if float(a) < float(tmp_low_weight_var):
-                peak_count_low += 1
-
+        peak_count_low = numpy.count_nonzero(mintab_low_a < tmp_low_weight_var)
         # how may "peaks" are ABOVE the threshold
-        for a in maxtab_high_a:
-            if float(a) > float(tmp_high_weight_var):
-                peak_count_high += 1
+        peak_count_high = numpy.count_nonzero(maxtab_high_a > tmp_high_weight_var)
 
         additional_checks_sell = [
             int(peak_count_low) > int(peak_count_high),
@@ -217,62 +211,13 @@ class WeightedAvgPeak(Strategy):
         high_prices: numpy.ndarray,
         low_prices: numpy.ndarray,
     ) -> str:
-        price_ranges = []
-        closing_prices = []
-        first_time_round_loop = True
-        TR_prices = []
         # They should be all the same length but just in case to be safe
         length = min(len(close_prices), len(high_prices), len(low_prices))
-
-        for index in range(length):
-            if first_time_round_loop:
-                # First time round loop cannot get previous
-                closePrice = close_prices[index]
-                closing_prices.append(closePrice)
-                high_price = high_prices[index]
-                low_price = low_prices[index]
-                price_range = float(high_price - closePrice)
-                price_ranges.append(price_range)
-                first_time_round_loop = False
-            else:
-                prev_close = closing_prices[-1]
-                closePrice = close_prices[index]
-                closing_prices.append(closePrice)
-                high_price = high_prices[index]
-                low_price = low_prices[index]
-                price_range = float(high_price - closePrice)
-                price_ranges.append(price_range)
-                TR = max(
-                    high_price - low_price,
-                    abs(high_price - prev_close),
-                    abs(low_price - prev_close),
-                )
-                TR_prices.append(TR)
-
-        # for i in prices['prices']:
-        #     if first_time_round_loop:
-        #         # First time round loop cannot get previous
-        #         closePrice = i['closePrice'][price_compare]
-        #         closing_prices.append(closePrice)
-        #         high_price = i['highPrice'][price_compare]
-        #         low_price = i['lowPrice'][price_compare]
-        #         price_range = float(high_price - closePrice)
-        #         price_ranges.append(price_range)
-        #         first_time_round_loop = False
-        #     else:
-        #         prev_close = closing_prices[-1]
-        #         closePrice = i['closePrice'][price_compare]
-        #         closing_prices.append(closePrice)
-        #         high_price = i['highPrice'][price_compare]
-        #         low_price = i['lowPrice'][price_compare]
-        #         price_range = float(high_price - closePrice)
-        #         price_ranges.append(price_range)
-        #         TR = max(high_price - low_price,
-        #                 abs(high_price - prev_close),
-        #                 abs(low_price - prev_close))
-        #         TR_prices.append(TR)
-
-        return str(int(float(max(TR_prices))))
+        # The first bar has no previous close
+        TR_prices = true_range(
+            high_prices[:length], low_prices[:length], close_prices[:length]
+        )[1:]
+        return str(int(float(numpy.max(TR_prices))))
 
     def weighted_avg_and_std(
         self, values: numpy.ndarray, weights: numpy.ndarray
@@ -1,8 +1,9 @@
+import asyncio
 import logging
 import traceback
 from datetime import datetime as dt
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, TypeVar
 
 import pytz
 
@@ -20,6 +21,8 @@ from .components.broker import Broker, BrokerFactory
 from .interfaces import Market, Position
 from .strategies import StrategyFactory, StrategyImpl
 
+T = TypeVar("T")
+
 
 class TradingBot:
     """
@@ -88,23 +91,36 @@ class TradingBot:
 
     def start(self, single_pass=False) -> None:
         """
-        Starts the TradingBot main loop
+        Starts the TradingBot main loop on an asyncio event loop
         - process open positions
         - process markets from market source
         - wait for configured wait time
         - start over
         """
+        asyncio.run(self.start_async(single_pass))
+
+    async def start_async(self, single_pass=False) -> None:
+        """
+        TradingBot main loop. The markets of each spin are processed
+        concurrently, up to the configured amount of requests in flight
+        """
         if single_pass:
             logging.info("Performing a single iteration of the market source")
         while True:
             try:
+                self.broker.start_spin()
                 # Process current open positions
-                self.process_open_positions()
+                await self.process_open_positions_async()
                 # Now process markets from the configured market source
-                self.process_market_source()
+                await self.process_market_source_async()
+                # Collect the confirmations of the deals submitted in this spin
+                await self._run_blocking(self.broker.wait_for_confirmations)
+                self.broker.dump_metrics()
                 # Wait for the next spin before starting over
-                self.time_provider.wait_for(
-                    TimeAmount.SECONDS, self.config.get_spin_interval()
+                await self._run_blocking(
+                    self.time_provider.wait_for,
+                    TimeAmount.SECONDS,
+                    self.config.get_spin_interval(),
                 )
                 if single_pass:
                     break
@@ -112,18 +128,16 @@ class TradingBot:
                 logging.warning("Market is closed: stop processing")
                 if single_pass:
                     break
-                self.time_provider.wait_for(TimeAmount.NEXT_MARKET_OPENING)
-            except NotSafeToTradeException:
-                if single_pass:
-                    break
-                self.time_provider.wait_for(
-                    TimeAmount.SECONDS, self.config.get_spin_interval()
+                await self._run_blocking(
+                    self.time_provider.wait_for, TimeAmount.NEXT_MARKET_OPENING
                 )
-            except StopIteration:
+            except NotSafeToTradeException:
                 if single_pass:
                     break
-                self.time_provider.wait_for(
-                    TimeAmount.SECONDS, self.config.get_spin_interval()
+                await self._run_blocking(
+                    self.time_provider.wait_for,
+                    TimeAmount.SECONDS,
+                    self.config.get_spin_interval(),
                 )
             except Exception as e:
                 logging.error("Generic exception caught: {}".format(e))
@@ -131,6 +145,75 @@ class TradingBot:
                 if single_pass:
                     break
 
+    async def _run_blocking(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking function without blocking the event loop
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def process_open_positions_async(self) -> None:
+        """
+        Asyncio version of process_open_positions() processing all the
+        markets with an open position concurrently
+        """
+        positions = await self.broker.async_broker.get_open_positions()
+        # Do not run until we know the current open positions
+        if positions is None:
+            logging.warning("Unable to fetch open positions! Will try again...")
+            raise RuntimeError("Unable to fetch open positions")
+        markets = [
+            await self._run_blocking(self.market_provider.get_market_from_epic, epic)
+            for epic in [item.epic for item in positions]
+        ]
+        await self._process_markets_async(markets, positions)
+
+    async def process_market_source_async(self) -> None:
+        """
+        Asyncio version of process_market_source() processing all the markets
+        of the market source concurrently
+        """
+        markets = await self._run_blocking(self._market_source_markets)
+        await self._process_markets_async(markets)
+
+    def _market_source_markets(self) -> List[Market]:
+        """
+        Return the markets left in the market source. StopIteration can't be
+        raised through an asyncio future hence it is handled here
+        """
+        markets = []
+        while True:
+            try:
+                markets.append(self.market_provider.next())
+            except StopIteration:
+                return markets
+
+    async def _process_markets_async(
+        self, markets: List[Market], positions: Optional[List[Position]] = None
+    ) -> None:
+        """
+        Run process_market() on each market concurrently. The open positions
+        are fetched for each market unless given. The first error cancels
+        the markets not processed yet and is raised
+        """
+        semaphore = asyncio.Semaphore(self.config.get_max_concurrent_requests())
+
+        async def process(market: Market) -> None:
+            async with semaphore:
+                open_positions = positions
+                if open_positions is None:
+                    open_positions = await self.broker.async_broker.get_open_positions()
+                if open_positions is None:
+                    logging.warning("Unable to fetch open positions! Will try again...")
+                    raise RuntimeError("Unable to fetch open positions")
+                await self._run_blocking(self.process_market, market, open_positions)
+
+        tasks = [asyncio.ensure_future(process(market)) for market in markets]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
     def process_open_positions(self) -> None:
         """
         Fetch open positions markets and run the strategy against them closing the
@@ -227,7 +310,10 @@ class TradingBot:
             elif item.epic == market.epic and direction is not item.direction:
                 self.broker.close_position(item)
                 return
-        self.broker.trade(market.epic, direction, limit, stop)
+        if self.broker.has_unsettled_deal(market.epic):
+            logging.info("A deal for this epic is waiting to be settled, skip trade")
+            return
+        self.broker.submit_trade(market.epic, direction, limit, stop)
 
     def backtest(
         self,